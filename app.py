@@ -1,14 +1,25 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, send_file, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, flash, send_file, jsonify, g, Response, stream_with_context, abort
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, DDL
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.orm import Session as DbSession
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timedelta, date, time
+from datetime import datetime, timedelta, date, time, timezone
+from markupsafe import Markup
 import io
-from functools import wraps
+import os
+from functools import wraps, lru_cache
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import secrets
+import hmac
+import hashlib
+import base64
 import csv
+import json
 from io import StringIO, BytesIO
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
@@ -16,12 +27,48 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
 import random
+import re
+import atexit
+import queue
+import threading
+from collections import OrderedDict, defaultdict, namedtuple
+import click
+import qrcode
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = secrets.token_hex(16)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///sams.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('SAMS_DATABASE_URI', 'sqlite:///sams.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(minutes=30)  # 30-minute timeout
+app.config['AUDIT_LOG_ASYNC'] = True  # Write audit logs from a background thread
+app.config['AUDIT_LOG_BATCH_SIZE'] = 100
+app.config['AUDIT_LOG_FLUSH_INTERVAL'] = 2.0  # seconds
+app.config['REPORT_CACHE_TTL'] = 300  # seconds
+app.config['REPORT_CACHE_MAX_ENTRIES'] = 32
+app.config['REPORT_CACHE_MAX_ROWS'] = 50000  # Larger reports are streamed but not cached
+app.config['FINALIZED_CACHE_MAX_ENTRIES'] = 5000  # Finalized sessions whose attendance is held in memory
+app.config['ADMIN_USERS_PAGE_SIZE'] = 50  # Rows (or student sections) per page in the admin user directory
+app.config['USER_SEARCH_MAX_RESULTS'] = 50
+app.config['CASCADE_DELETE_BACKGROUND_ROWS'] = 50000  # Larger deletes run in a background thread (None disables)
+app.config['QR_TOKEN_TTL'] = 30  # seconds each check-in QR code is shown before it rotates
+app.config['QR_SIGNING_KEY'] = None  # defaults to SECRET_KEY; set a shared key when running several workers
+app.config['CHECKIN_QUEUE_ASYNC'] = True  # Accept check-ins immediately and write them in batches
+app.config['CHECKIN_BATCH_SIZE'] = 500
+app.config['CHECKIN_FLUSH_INTERVAL'] = 0.25  # seconds
+app.config['CHECKIN_STATUS_MAX_ENTRIES'] = 20000  # Recent check-in states kept for status lookups
+app.config['DEVICE_BATCH_SIZE'] = 1000  # Device events matched and written per batch
+app.config['DEVICE_EARLY_MINUTES'] = 15  # Swipes this long before a session starts still count
+app.config['DEVICE_LATE_AFTER_MINUTES'] = 10  # Swipes this long after the start are marked late
+app.config['DEVICE_JSON_MAX_BYTES'] = 1024 * 1024  # JSON bodies are parsed whole; larger uploads must use NDJSON
+app.config['ATTENDANCE_EDIT_WINDOW_HOURS'] = 24  # Attendance locks this long after a session ends
+app.config['FINALIZE_SWEEP_ENABLED'] = True  # Finalize sessions past their edit window from a background thread
+app.config['FINALIZE_SWEEP_INTERVAL'] = 300  # seconds between sweeps
+app.config['SYNC_OP_RETENTION_DAYS'] = 7  # Offline-sync idempotency keys older than this are pruned by the sweeper
+app.config['REPORT_WORKER_ENABLED'] = True  # Run a report worker thread in each web process (off when using report-worker)
+app.config['REPORT_JOB_POLL_INTERVAL'] = 2.0  # seconds an idle worker waits before checking for queued jobs
+app.config['REPORT_JOB_TIMEOUT'] = 600  # seconds before a running job whose worker died is queued again
+app.config['REPORT_JOB_MAX_ATTEMPTS'] = 3
+app.config['REPORT_JOB_RETENTION_HOURS'] = 24  # Finished jobs and their files are kept this long
 
 db = SQLAlchemy(app)
 
@@ -53,15 +100,19 @@ class User(db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(200), nullable=False)
-    role = db.Column(db.String(20), nullable=False)
+    role = db.Column(db.String(20), nullable=False, index=True)
     full_name = db.Column(db.String(100), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
 
 class Student(db.Model):
     __tablename__ = 'students'
+    __table_args__ = (
+        # Groups the user directory by section and pages each section by student_id
+        db.Index('ix_students_section', 'department', 'year', 'section', 'student_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     student_id = db.Column(db.String(20), unique=True, nullable=False)
     department = db.Column(db.String(100))
     year = db.Column(db.Integer)
@@ -73,7 +124,7 @@ class Student(db.Model):
 class Faculty(db.Model):
     __tablename__ = 'faculty'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     faculty_id = db.Column(db.String(20), unique=True, nullable=False)
     department = db.Column(db.String(100))
     designation = db.Column(db.String(50))
@@ -93,24 +144,66 @@ class Class(db.Model):
     __tablename__ = 'classes'
     id = db.Column(db.Integer, primary_key=True)
     course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False)
-    faculty_id = db.Column(db.Integer, db.ForeignKey('faculty.id'), nullable=False)
+    faculty_id = db.Column(db.Integer, db.ForeignKey('faculty.id'), nullable=False, index=True)
     section = db.Column(db.String(10))
     schedule = db.Column(db.String(100))
-    room = db.Column(db.String(20))
+    room = db.Column(db.String(20), index=True)
     course = db.relationship('Course', backref='classes')
     faculty = db.relationship('Faculty', backref='classes')
 
+class ClassMeeting(db.Model):
+    # One weekly meeting parsed from Class.schedule; section, room and faculty
+    # are copied in so each has its own (key, weekday, start) interval index
+    __tablename__ = 'class_meetings'
+    __table_args__ = (
+        db.Index('ix_class_meetings_section_slot', 'section', 'weekday', 'start_minute'),
+        db.Index('ix_class_meetings_room_slot', 'room', 'weekday', 'start_minute'),
+        db.Index('ix_class_meetings_faculty_slot', 'faculty_id', 'weekday', 'start_minute'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False, index=True)
+    weekday = db.Column(db.Integer, nullable=False)  # 0 = Monday
+    start_minute = db.Column(db.Integer, nullable=False)
+    end_minute = db.Column(db.Integer, nullable=False)
+    section = db.Column(db.String(10))
+    room = db.Column(db.String(20))
+    faculty_id = db.Column(db.Integer)
+    class_obj = db.relationship('Class')
+
+class AttendanceSyncOp(db.Model):
+    # Idempotency keys of offline-sync changes already processed, so replays are no-ops
+    __tablename__ = 'attendance_sync_ops'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    key = db.Column(db.String(64), primary_key=True)
+    result = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class AttendanceDevice(db.Model):
+    # A door reader (RFID or biometric) installed in a room; it authenticates with an API key
+    __tablename__ = 'attendance_devices'
+    id = db.Column(db.Integer, primary_key=True)
+    reader_id = db.Column(db.String(50), unique=True, nullable=False)
+    room = db.Column(db.String(20), nullable=False)
+    kind = db.Column(db.String(20), nullable=False, default='rfid')
+    key_hash = db.Column(db.String(64), unique=True, nullable=False)
+    is_active = db.Column(db.Boolean, default=True)
+    last_seen_at = db.Column(db.DateTime)
+
 class Enrollment(db.Model):
     __tablename__ = 'enrollments'
     id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
-    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False, index=True)
+    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False, index=True)
     enrollment_date = db.Column(db.DateTime, default=datetime.utcnow)
     student = db.relationship('Student', backref='enrollments')
     class_ref = db.relationship('Class', backref='enrollments')
 
 class AttendanceSession(db.Model):
     __tablename__ = 'attendance_sessions'
+    __table_args__ = (
+        db.Index('uq_attendance_sessions_class_date', 'class_id', 'date', unique=True),
+        db.Index('ix_attendance_sessions_open', 'is_finalized', 'date'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False)
     date = db.Column(db.Date, nullable=False)
@@ -126,15 +219,25 @@ class AttendanceSession(db.Model):
 
 class Attendance(db.Model):
     __tablename__ = 'attendance'
+    __table_args__ = (
+        db.Index('uq_attendance_session_student', 'session_id', 'student_id', unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    session_id = db.Column(db.Integer, db.ForeignKey('attendance_sessions.id'), nullable=False)
-    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
-    status = db.Column(db.String(20), nullable=False)
+    # active_history keeps the previous values for the rollup listener to subtract
+    session_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('attendance_sessions.id'), nullable=False), active_history=True)
+    student_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False, index=True), active_history=True)
+    status = db.column_property(db.Column(db.String(20), nullable=False), active_history=True)
     marked_at = db.Column(db.DateTime, default=datetime.utcnow)
     marked_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     method = db.Column(db.String(20))
+    # Bumped on every ORM update, which then only matches the version it read
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     session = db.relationship('AttendanceSession', backref='attendance_records')
     student = db.relationship('Student', backref='attendance_records')
+    
+    __mapper_args__ = {'version_id_col': version}
 
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
@@ -145,101 +248,2384 @@ class AuditLog(db.Model):
     entity_id = db.Column(db.Integer)
     details = db.Column(db.Text)
     ip_address = db.Column(db.String(50))
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class AttendanceRollup(db.Model):
+    # Running counters per (student, class), kept in step with attendance writes
+    __tablename__ = 'attendance_rollups'
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), primary_key=True)
+    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), primary_key=True, index=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    present = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+
+class EntityCount(db.Model):
+    # Row totals shown on the admin dashboard, kept in step with inserts and deletes
+    __tablename__ = 'entity_counts'
+    name = db.Column(db.String(50), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+class ReportJob(db.Model):
+    # A report generated off the request path; the finished file is stored on the row
+    __tablename__ = 'report_jobs'
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.Text, nullable=False)  # JSON
+    dedupe_key = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    requested_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker = db.Column(db.String(100))
+    error = db.Column(db.Text)
+    filename = db.Column(db.String(200))
+    mimetype = db.Column(db.String(100))
+    result = db.Column(db.LargeBinary)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_report_jobs_status', 'status', 'id'),
+        # At most one queued or running job per identical request
+        db.Index('ux_report_jobs_in_flight', 'dedupe_key', unique=True,
+                 sqlite_where=db.text("status IN ('queued', 'running')")),
+    )
+
+# ==================== AUDIT LOG WRITER ====================
+
+class QueuedBatchWriter:
+    """Buffers items on an in-process queue and hands them to _write in batches.
+
+    A daemon thread flushes whenever the batch size is reached or the flush
+    interval elapses, so request handlers never pay for a second commit.
+    Subclasses name their thread and config keys and implement _write.
+    """
+    thread_name = 'batch-writer'
+    batch_size_key = None
+    flush_interval_key = None
+    
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+    
+    def enqueue(self, item):
+        self.start()
+        self.queue.put(item)
+    
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+                self._thread.start()
+    
+    def stop(self):
+        """Stop the background thread and write anything still queued"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()
+    
+    def flush(self):
+        """Drain the queue synchronously in the calling thread"""
+        items = self._drain(self.app.config[self.batch_size_key])
+        while items:
+            self._write(items)
+            items = self._drain(self.app.config[self.batch_size_key])
+    
+    def _drain(self, limit):
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+    
+    def _run(self):
+        while not self._stopping.is_set():
+            batch_size = self.app.config[self.batch_size_key]
+            deadline = datetime.now() + timedelta(seconds=self.app.config[self.flush_interval_key])
+            items = []
+            
+            while len(items) < batch_size and not self._stopping.is_set():
+                remaining = (deadline - datetime.now()).total_seconds()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self.queue.get(timeout=min(remaining, 0.5)))
+                except queue.Empty:
+                    continue
+            
+            if items:
+                self._write(items)
+    
+    def _write(self, items):
+        raise NotImplementedError
+
+
+class AuditLogWriter(QueuedBatchWriter):
+    """Writes queued audit events with one bulk insert per batch"""
+    thread_name = 'audit-log-writer'
+    batch_size_key = 'AUDIT_LOG_BATCH_SIZE'
+    flush_interval_key = 'AUDIT_LOG_FLUSH_INTERVAL'
+    
+    def _write(self, events):
+        try:
+            with self.app.app_context():
+                db.session.execute(AuditLog.__table__.insert(), events)
+                db.session.commit()
+        except Exception as e:
+            self.app.logger.exception(f'Error writing {len(events)} audit log entries: {e}')
+
+
+audit_writer = AuditLogWriter(app)
+atexit.register(audit_writer.stop)
+
+# ==================== HELPER FUNCTIONS ====================
+
+ATTENDANCE_STATUSES = ('present', 'late', 'absent')
+
+def load_current_identity():
+    """Resolve the logged-in user and their faculty/student profile once per request.
+
+    One outer-joined query fills the cache on flask.g; later calls in the same
+    request reuse it as long as the session still points at the same user.
+    """
+    user_id = session.get('user_id')
+    identity = g.get('identity')
+    
+    if identity is None or identity['user_id'] != user_id:
+        identity = {'user_id': user_id, 'user': None, 'faculty': None, 'student': None}
+        if user_id is not None:
+            row = db.session.query(User, Faculty, Student)\
+                .outerjoin(Faculty, Faculty.user_id == User.id)\
+                .outerjoin(Student, Student.user_id == User.id)\
+                .filter(User.id == user_id).first()
+            if row:
+                identity['user'], identity['faculty'], identity['student'] = row
+        g.identity = identity
+    
+    return identity
+
+def get_current_user():
+    return load_current_identity()['user']
+
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            flash('Please log in to access this page.', 'warning')
+            return redirect(url_for('login'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def role_required(*roles):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if 'user_id' not in session:
+                flash('Please log in to access this page.', 'warning')
+                return redirect(url_for('login'))
+            
+            user = get_current_user()
+            if not user:
+                session.clear()
+                flash('Please log in to access this page.', 'warning')
+                return redirect(url_for('login'))
+            if user.role not in roles:
+                flash('You do not have permission to access this page.', 'danger')
+                return redirect(url_for('dashboard'))
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def log_audit(action, entity_type=None, entity_id=None, details=None):  # pragma: no cover
+    try:
+        event = {
+            'user_id': session.get('user_id'),
+            'action': action,
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'details': details,
+            'ip_address': request.remote_addr,
+            'timestamp': datetime.utcnow()
+        }
+        
+        if app.config.get('AUDIT_LOG_ASYNC'):
+            audit_writer.enqueue(event)
+        else:
+            db.session.add(AuditLog(**event))
+            db.session.commit()
+    except:
+        pass
+
+def send_email(to_email, subject, body):  # pragma: no cover
+    try:
+        SMTP_SERVER = "smtp.gmail.com"
+        SMTP_PORT = 587
+        SMTP_USERNAME = "your_email@gmail.com"
+        SMTP_PASSWORD = "your_app_password"
+        
+        msg = MIMEMultipart()
+        msg['From'] = SMTP_USERNAME
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'html'))
+        
+        return True
+    except Exception as e:
+        print(f"Email error: {str(e)}")
+        return False
+
+def calculate_attendance_percentage(student_id, class_id=None):
+    query = db.session.query(
+        db.func.coalesce(db.func.sum(AttendanceRollup.total), 0),
+        db.func.coalesce(db.func.sum(AttendanceRollup.present + AttendanceRollup.late), 0)
+    ).filter(AttendanceRollup.student_id == student_id)
+    
+    if class_id:
+        query = query.filter(AttendanceRollup.class_id == class_id)
+    
+    total_sessions, present_sessions = query.one()
+    
+    if total_sessions == 0:
+        return 0
+    
+    return round((present_sessions / total_sessions) * 100, 2)
+
+def empty_attendance_summary():
+    return {'total': 0, 'present': 0, 'late': 0, 'absent': 0, 'attended': 0, 'percentage': 0}
+
+def get_attendance_summary(class_id=None, student_id=None):
+    """Read attendance counts per (student, class) from the rollup table.
+
+    Returns a dict keyed by (student_id, class_id). 'attended' counts present
+    and late marks, and 'percentage' matches calculate_attendance_percentage.
+    """
+    query = AttendanceRollup.query.filter(AttendanceRollup.total > 0)
+    
+    if class_id:
+        query = query.filter(AttendanceRollup.class_id == class_id)
+    if student_id:
+        query = query.filter(AttendanceRollup.student_id == student_id)
+    
+    summary = {}
+    for row in query.all():
+        attended = row.present + row.late
+        summary[(row.student_id, row.class_id)] = {
+            'total': row.total,
+            'present': row.present,
+            'late': row.late,
+            'absent': row.total - attended,
+            'attended': attended,
+            'percentage': round((attended / row.total) * 100, 2)
+        }
+    return summary
+
+CSV_STREAM_CHUNK_ROWS = 500
+
+def stream_csv_response(header, rows, filename):
+    """Stream CSV rows to the client as they are produced.
+
+    The header goes out before the first row is fetched, and rows are
+    flushed in small chunks so memory stays flat whatever the report size.
+    """
+    def generate():
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if count % CSV_STREAM_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        
+        yield buffer.getvalue()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+def load_class_roster(class_id, session_id=None):
+    """Return a class's enrollments with students and users loaded, and the session's marks.
+
+    Enrollments, students and users come back in one joined query and the
+    {student_id: Attendance} map for session_id, when given, in a second,
+    so roster templates can walk enrollment.student.user without lazy loads.
+    """
+    enrollments = Enrollment.query.filter_by(class_id=class_id)\
+        .options(db.joinedload(Enrollment.student).joinedload(Student.user))\
+        .order_by(Enrollment.id).all()
+    
+    attendance_records = {}
+    if session_id is not None:
+        attendance_records = {
+            record.student_id: record
+            for record in Attendance.query.filter_by(session_id=session_id)
+        }
+    return enrollments, attendance_records
+
+def attendance_edit_deadline(session_obj):
+    """Local time after which a session's attendance is locked"""
+    return datetime.combine(session_obj.date, session_obj.end_time) + \
+        timedelta(hours=app.config['ATTENDANCE_EDIT_WINDOW_HOURS'])
+
+def can_edit_attendance(session_obj):
+    """Check if attendance can be edited for this session"""
+    # The sweeper finalizes sessions once their window passes; the deadline
+    # check only covers the few minutes between sweeps
+    if session_obj.is_finalized:
+        return False
+    return datetime.now() <= attendance_edit_deadline(session_obj)
+
+def attendance_snapshot(record):
+    """Client-facing view of a mark, including the version to send back with edits"""
+    return {
+        'attendance_id': record.id,
+        'student_id': record.student_id,
+        'status': record.status,
+        'version': record.version,
+        'marked_at': record.marked_at.isoformat() if record.marked_at else None,
+        'marked_by': record.marked_by
+    }
+
+def parse_expected_version(value):
+    """Return the version a client edited from (0 means not marked yet), or None if it sent none"""
+    if value is None or value == '':
+        return None
+    return int(value)
+
+def attendance_conflict_response(session_id, student_id):
+    """409 response carrying the mark as it is now, after a failed conditional write"""
+    db.session.rollback()
+    current = Attendance.query.filter_by(session_id=session_id, student_id=student_id).first()
+    return jsonify({
+        'success': False,
+        'conflict': True,
+        'message': 'This mark was changed by someone else. Review the current value and try again.',
+        'current': attendance_snapshot(current) if current else None
+    }), 409
+
+# ==================== FINALIZATION SWEEPER ====================
+
+def finalize_expired_sessions(now=None):
+    """Finalize every open session past its edit window with one bulk UPDATE.
+
+    The WHERE clause is a range on the (is_finalized, date) index, so a sweep
+    only touches open sessions. Returns the number of sessions finalized.
+    """
+    now = now or datetime.now()
+    cutoff = now - timedelta(hours=app.config['ATTENDANCE_EDIT_WINDOW_HOURS'])
+    stmt = db.update(AttendanceSession).where(
+        db.or_(AttendanceSession.is_finalized == False, AttendanceSession.is_finalized.is_(None)),
+        db.or_(AttendanceSession.date < cutoff.date(),
+               db.and_(AttendanceSession.date == cutoff.date(), AttendanceSession.end_time < cutoff.time()))
+    ).values(is_finalized=True, is_active=False, finalized_at=datetime.utcnow())\
+     .execution_options(synchronize_session=False, skip_report_invalidation=True)
+    
+    # An idle sweep matches nothing and must not clear the report cache
+    count = db.session.execute(stmt).rowcount
+    if count:
+        _pending_report_invalidation(db.session)['clear'] = True
+        db.session.add(AuditLog(action='Auto-finalize Sessions', entity_type='AttendanceSession',
+                                details=f'Finalized {count} sessions past their edit window'))
+    db.session.commit()
+    return count
+
+def prune_sync_ops(now=None):
+    """Delete offline-sync idempotency keys past SYNC_OP_RETENTION_DAYS and return how many.
+
+    Replays arrive within minutes of the original upload, and a change
+    replayed after its key is gone is still checked against the edit window
+    and the newer-mark rule.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=app.config['SYNC_OP_RETENTION_DAYS'])
+    count = db.session.execute(db.delete(AttendanceSyncOp).where(AttendanceSyncOp.created_at < cutoff)
+                               .execution_options(synchronize_session=False)).rowcount
+    db.session.commit()
+    return count
+
+class FinalizationSweeper:
+    """Daemon thread that runs finalize_expired_sessions and prune_sync_ops every FINALIZE_SWEEP_INTERVAL seconds"""
+    
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+    
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name='finalization-sweeper', daemon=True)
+                self._thread.start()
+    
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+    
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                with self.app.app_context():
+                    finalize_expired_sessions()
+                    prune_sync_ops()
+            except Exception as e:
+                self.app.logger.exception(f'Error finalizing expired sessions: {e}')
+            self._stopping.wait(self.app.config['FINALIZE_SWEEP_INTERVAL'])
+
+finalization_sweeper = FinalizationSweeper(app)
+atexit.register(finalization_sweeper.stop)
+
+@app.before_request
+def start_finalization_sweeper():
+    if app.config['FINALIZE_SWEEP_ENABLED']:
+        finalization_sweeper.start()
+
+@app.cli.command('finalize-expired')
+def finalize_expired_command():  # pragma: no cover
+    """Finalize every session whose edit window has passed and prune old offline-sync keys."""
+    click.echo(f'Finalized {finalize_expired_sessions()} sessions')
+    click.echo(f'Pruned {prune_sync_ops()} offline-sync keys')
+
+# ==================== REPORT SERVICE ====================
+
+class ReportCache:
+    """Size-bounded LRU cache of report rows keyed by normalized filters.
+
+    Entries expire after the TTL and are dropped early, once the writing
+    transaction commits, when attendance in their date range changes. Every
+    invalidation bumps a generation, and set() skips rows computed under an
+    older one, so a reader that queried before a commit cannot cache them
+    after it.
+
+    The cache is per process: under gunicorn each worker only invalidates its
+    own copy, so another worker can serve a stale report for up to
+    REPORT_CACHE_TTL after a change.
+    """
+    
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, rows = entry
+            if (datetime.now() - stored_at).total_seconds() > self.app.config['REPORT_CACHE_TTL']:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return rows
+    
+    def set(self, key, rows, generation=None):
+        """Store rows, unless the cache was invalidated since generation was read"""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (datetime.now(), rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.app.config['REPORT_CACHE_MAX_ENTRIES']:
+                self._entries.popitem(last=False)
+    
+    def invalidate_dates(self, changed_dates):
+        """Drop every entry whose date range covers one of the changed dates"""
+        with self._lock:
+            self.generation += 1
+            for key in list(self._entries):
+                start_date, end_date = key[2], key[3]
+                if any((start_date is None or start_date <= d) and (end_date is None or d <= end_date)
+                       for d in changed_dates):
+                    del self._entries[key]
+    
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+report_cache = ReportCache(app)
+
+def normalize_report_filters(args):
+    """Turn request args into a hashable (course_id, department, start_date, end_date) key"""
+    def parse_date(value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return None
+    
+    return (
+        args.get('course_id', type=int) or None,
+        (args.get('department') or '').strip() or None,
+        parse_date(args.get('start_date')),
+        parse_date(args.get('end_date'))
+    )
+
+def build_attendance_report_query(filters):
+    course_id, department, start_date, end_date = filters
+    
+    if not start_date and not end_date:
+        # Without a date range the per-(student, class) rollups hold the totals
+        query = db.session.query(
+            Student.student_id,
+            User.full_name,
+            Student.department,
+            Student.section,
+            Course.course_name,
+            db.func.sum(AttendanceRollup.total).label('total_sessions'),
+            db.func.sum(AttendanceRollup.present + AttendanceRollup.late).label('present_count')
+        ).join(User, Student.user_id == User.id)\
+         .join(Enrollment, Enrollment.student_id == Student.id)\
+         .join(Class, Class.id == Enrollment.class_id)\
+         .join(Course, Course.id == Class.course_id)\
+         .join(AttendanceRollup, db.and_(AttendanceRollup.student_id == Student.id,
+                                         AttendanceRollup.class_id == Class.id))
+        
+        if course_id:
+            query = query.filter(Course.id == course_id)
+        if department:
+            query = query.filter(Student.department == department)
+        
+        return query.group_by(Student.id, Course.id).having(db.func.sum(AttendanceRollup.total) > 0)
+    
+    query = db.session.query(
+        Student.student_id,
+        User.full_name,
+        Student.department,
+        Student.section,
+        Course.course_name,
+        db.func.count(Attendance.id).label('total_sessions'),
+        db.func.sum(db.case((Attendance.status.in_(['present', 'late']), 1), else_=0)).label('present_count')
+    ).join(User, Student.user_id == User.id)\
+     .join(Enrollment, Enrollment.student_id == Student.id)\
+     .join(Class, Class.id == Enrollment.class_id)\
+     .join(Course, Course.id == Class.course_id)\
+     .join(AttendanceSession, AttendanceSession.class_id == Class.id)\
+     .join(Attendance, db.and_(Attendance.session_id == AttendanceSession.id,
+                               Attendance.student_id == Student.id))
+    
+    if course_id:
+        query = query.filter(Course.id == course_id)
+    if department:
+        query = query.filter(Student.department == department)
+    if start_date:
+        query = query.filter(AttendanceSession.date >= start_date)
+    if end_date:
+        query = query.filter(AttendanceSession.date <= end_date)
+    
+    return query.group_by(Student.id, Course.id)
+
+def _report_row(row):
+    percentage = round((row.present_count / row.total_sessions * 100), 2) if row.total_sessions > 0 else 0
+    return {
+        'student_id': row.student_id,
+        'name': row.full_name,
+        'department': row.department,
+        'section': row.section,
+        'course': row.course_name,
+        'total_sessions': row.total_sessions,
+        'present': row.present_count,
+        'percentage': percentage
+    }
+
+def get_attendance_report(filters):
+    """Return the report rows for a filter key, computing them at most once per TTL"""
+    generation = report_cache.generation
+    rows = report_cache.get(filters)
+    if rows is None:
+        rows = [_report_row(row) for row in build_attendance_report_query(filters).all()]
+        report_cache.set(filters, rows, generation)
+    return rows
+
+def iter_attendance_report(filters):
+    """Yield report rows from the cache, or stream them from the database.
+
+    Streamed results are cached afterwards unless they exceed
+    REPORT_CACHE_MAX_ROWS, so large downloads keep flat memory.
+    """
+    generation = report_cache.generation
+    rows = report_cache.get(filters)
+    if rows is not None:
+        yield from rows
+        return
+    
+    collected = []
+    max_rows = app.config['REPORT_CACHE_MAX_ROWS']
+    for row in build_attendance_report_query(filters).yield_per(1000):
+        report_row = _report_row(row)
+        if collected is not None:
+            collected.append(report_row)
+            if len(collected) > max_rows:
+                collected = None
+        yield report_row
+    
+    if collected is not None:
+        report_cache.set(filters, collected, generation)
+
+# Models whose changes can alter any report row (names, enrollments, sessions)
+REPORT_SOURCE_MODELS = (User, Student, Course, Class, Enrollment, AttendanceSession)
+
+def _pending_report_invalidation(db_session):
+    """Invalidation collected during the current transaction, applied once it commits"""
+    return db_session.info.setdefault('report_invalidation', {'clear': False, 'dates': set()})
+
+@event.listens_for(DbSession, 'after_flush')
+def collect_report_invalidation_on_flush(db_session, flush_context):
+    changed = list(db_session.new) + list(db_session.dirty) + list(db_session.deleted)
+    if any(isinstance(obj, REPORT_SOURCE_MODELS) for obj in changed):
+        _pending_report_invalidation(db_session)['clear'] = True
+        return
+    
+    session_ids = {int(obj.session_id) for obj in changed if isinstance(obj, Attendance) and obj.session_id}
+    if session_ids:
+        with db_session.no_autoflush:
+            changed_dates = {
+                row[0] for row in db_session.execute(
+                    db.select(AttendanceSession.date).where(AttendanceSession.id.in_(session_ids))
+                )
+            }
+        _pending_report_invalidation(db_session)['dates'].update(changed_dates)
+
+@event.listens_for(DbSession, 'do_orm_execute')
+def collect_report_invalidation_on_bulk_write(orm_execute_state):
+    """Writers that invalidate by row count themselves opt out with skip_report_invalidation"""
+    if orm_execute_state.execution_options.get('skip_report_invalidation'):
+        return
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        if any(mapper.class_ in REPORT_SOURCE_MODELS + (Attendance,) for mapper in orm_execute_state.all_mappers):
+            _pending_report_invalidation(orm_execute_state.session)['clear'] = True
+
+@event.listens_for(DbSession, 'after_commit')
+def invalidate_report_cache_on_commit(db_session):
+    pending = db_session.info.pop('report_invalidation', None)
+    if pending is None:
+        return
+    if pending['clear']:
+        report_cache.clear()
+    elif pending['dates']:
+        report_cache.invalidate_dates(pending['dates'])
+
+@event.listens_for(DbSession, 'after_rollback')
+def discard_report_invalidation_on_rollback(db_session):
+    db_session.info.pop('report_invalidation', None)
+
+# ==================== FINALIZED SESSION CACHE ====================
+
+CachedMark = namedtuple('CachedMark', ['status', 'marked_at'])
+
+class FinalizedSessionCache:
+    """Size-bounded LRU cache of attendance for finalized sessions.
+
+    Attendance in a finalized session never changes, so entries have no TTL
+    and are never invalidated. Keys include the session's created_at, so a
+    session id reused after a delete cannot hit an old entry. Each entry
+    holds only the session's marks as {student_id: CachedMark}; rosters and
+    names can still change and are loaded by callers on every request.
+    """
+    
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(session_obj):
+        return session_obj.id, session_obj.created_at
+    
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+    
+    def _set(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.app.config['FINALIZED_CACHE_MAX_ENTRIES']:
+            self._entries.popitem(last=False)
+    
+    def marks(self, sessions):
+        """Return {session_id: {student_id: CachedMark}} for finalized sessions, loading misses in one query"""
+        found, missing = {}, {}
+        with self._lock:
+            for session_obj in sessions:
+                entry = self._get(self.key(session_obj))
+                if entry is None:
+                    missing[session_obj.id] = session_obj
+                else:
+                    found[session_obj.id] = entry
+        
+        if missing:
+            loaded = {session_id: {} for session_id in missing}
+            rows = db.session.query(Attendance.session_id, Attendance.student_id,
+                                    Attendance.status, Attendance.marked_at)\
+                .filter(Attendance.session_id.in_(list(missing)))
+            for session_id, student_id, status, marked_at in rows:
+                loaded[session_id][student_id] = CachedMark(status, marked_at)
+            with self._lock:
+                for session_id, marks in loaded.items():
+                    self._set(self.key(missing[session_id]), marks)
+            found.update(loaded)
+        return found
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+finalized_session_cache = FinalizedSessionCache(app)
+
+# ==================== ATTENDANCE ROLLUPS ====================
+
+ROLLUP_COUNTERS = ('total', 'present', 'late', 'absent')
+
+def _rollup_delta(status, sign):
+    return {
+        'total': sign,
+        'present': sign if status == 'present' else 0,
+        'late': sign if status == 'late' else 0,
+        'absent': sign if status == 'absent' else 0
+    }
+
+def apply_rollup_deltas(db_session, deltas):
+    """Add counter deltas keyed by (student_id, class_id) with one upsert"""
+    rows = [
+        {'student_id': student_id, 'class_id': class_id, **counts}
+        for (student_id, class_id), counts in deltas.items()
+        if any(counts.values())
+    ]
+    if not rows:
+        return
+    
+    table = AttendanceRollup.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['student_id', 'class_id'],
+        set_={name: table.c[name] + stmt.excluded[name] for name in ROLLUP_COUNTERS}
+    )
+    db_session.execute(stmt, rows)
+
+def _rollup_source_select():
+    return db.select(
+        Attendance.student_id,
+        AttendanceSession.class_id,
+        db.func.count(Attendance.id),
+        db.func.sum(db.case((Attendance.status == 'present', 1), else_=0)),
+        db.func.sum(db.case((Attendance.status == 'late', 1), else_=0)),
+        db.func.sum(db.case((Attendance.status == 'absent', 1), else_=0))
+    ).join(AttendanceSession, Attendance.session_id == AttendanceSession.id)\
+     .group_by(Attendance.student_id, AttendanceSession.class_id)
+
+def recompute_attendance_rollups(db_session, pairs, chunk_size=500):
+    """Recompute the rollup rows for the given (student_id, class_id) pairs from raw attendance"""
+    pairs = list({(student_id, class_id) for student_id, class_id in pairs})
+    table = AttendanceRollup.__table__
+    columns = ['student_id', 'class_id'] + list(ROLLUP_COUNTERS)
+    
+    for start in range(0, len(pairs), chunk_size):
+        chunk = pairs[start:start + chunk_size]
+        db_session.execute(table.delete().where(db.tuple_(table.c.student_id, table.c.class_id).in_(chunk)))
+        db_session.execute(table.insert().from_select(columns, _rollup_source_select().where(
+            db.tuple_(Attendance.student_id, AttendanceSession.class_id).in_(chunk)
+        )))
+
+def rebuild_attendance_rollups():
+    """Recompute every rollup row from scratch and return the number of rows"""
+    table = AttendanceRollup.__table__
+    db.session.execute(table.delete())
+    db.session.execute(table.insert().from_select(
+        ['student_id', 'class_id'] + list(ROLLUP_COUNTERS), _rollup_source_select()
+    ))
+    db.session.commit()
+    return AttendanceRollup.query.count()
+
+def _history_values(obj, key):
+    """Return (old, new) values of an attribute as seen by the current flush"""
+    history = db.inspect(obj).attrs[key].history
+    new = history.added[0] if history.added else (history.unchanged[0] if history.unchanged else None)
+    old = history.deleted[0] if history.deleted else new
+    return old, new
+
+@event.listens_for(DbSession, 'after_flush')
+def maintain_rollups_on_flush(db_session, flush_context):
+    # (session_id, student_id, status, +1/-1) for every attendance change in this flush
+    changes = []
+    for obj in db_session.new:
+        if isinstance(obj, Attendance):
+            changes.append((obj.session_id, obj.student_id, obj.status, 1))
+    for obj in db_session.deleted:
+        if isinstance(obj, Attendance):
+            changes.append((_history_values(obj, 'session_id')[0], _history_values(obj, 'student_id')[0],
+                            _history_values(obj, 'status')[0], -1))
+    for obj in db_session.dirty:
+        if isinstance(obj, Attendance):
+            old_session, new_session = _history_values(obj, 'session_id')
+            old_student, new_student = _history_values(obj, 'student_id')
+            old_status, new_status = _history_values(obj, 'status')
+            if (old_session, old_student, old_status) != (new_session, new_student, new_status):
+                changes.append((old_session, old_student, old_status, -1))
+                changes.append((new_session, new_student, new_status, 1))
+    
+    if not changes:
+        return
+    
+    session_ids = {int(change[0]) for change in changes}
+    with db_session.no_autoflush:
+        class_by_session = dict(db_session.execute(
+            db.select(AttendanceSession.id, AttendanceSession.class_id).where(AttendanceSession.id.in_(session_ids))
+        ).all())
+    
+    deltas = {}
+    for session_id, student_id, status, sign in changes:
+        class_id = class_by_session.get(int(session_id))
+        if class_id is None:
+            continue
+        counts = deltas.setdefault((int(student_id), class_id), dict.fromkeys(ROLLUP_COUNTERS, 0))
+        for name, value in _rollup_delta(status, sign).items():
+            counts[name] += value
+    
+    apply_rollup_deltas(db_session, deltas)
+
+@event.listens_for(DbSession, 'do_orm_execute')
+def maintain_rollups_on_bulk_write(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if not any(mapper.class_ is Attendance for mapper in orm_execute_state.all_mappers):
+        return
+    
+    # Capture the pairs the statement touches, run it, then recompute them
+    affected = db.select(Attendance.student_id, AttendanceSession.class_id)\
+        .join(AttendanceSession, Attendance.session_id == AttendanceSession.id).distinct()
+    if orm_execute_state.statement.whereclause is not None:
+        affected = affected.where(orm_execute_state.statement.whereclause)
+    pairs = orm_execute_state.session.execute(affected).all()
+    
+    result = orm_execute_state.invoke_statement()
+    recompute_attendance_rollups(orm_execute_state.session, pairs)
+    return result
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():  # pragma: no cover
+    """Recompute the attendance rollup table from raw attendance."""
+    click.echo(f'Rebuilt {rebuild_attendance_rollups()} attendance rollup rows')
+
+# ==================== SCHEDULE INDEX ====================
+
+SCHEDULE_PATTERN = re.compile(r'^([A-Z]+)\s(\d{2}):(\d{2})-(\d{2}):(\d{2})$')
+WEEKDAY_CODES = {'M': 0, 'T': 1, 'W': 2, 'TH': 3, 'R': 3, 'F': 4, 'S': 5, 'SA': 5, 'SU': 6, 'U': 6}
+SCHEDULE_INDEX_FIELDS = ('schedule', 'section', 'room', 'faculty_id')
+
+@lru_cache(maxsize=1024)
+def parse_schedule(schedule):
+    """Parse 'MWF 10:00-11:00' into (weekdays, start_minute, end_minute).
+
+    A second T stands for Thursday, so 'TTH', 'TR' and 'TTS' all include
+    Tuesday and Thursday. Raises ValueError for anything unparseable.
+    """
+    match = SCHEDULE_PATTERN.match(schedule or '')
+    if not match:
+        raise ValueError('Schedule must be in format: MWF 10:00-11:00')
+    
+    days_part, start_hour, start_min, end_hour, end_min = match.groups()
+    weekdays = []
+    position = 0
+    while position < len(days_part):
+        code = days_part[position:position + 2]
+        if code not in WEEKDAY_CODES:
+            code = days_part[position]
+        if code not in WEEKDAY_CODES:
+            raise ValueError(f'Unknown day "{code}" in schedule.')
+        day = WEEKDAY_CODES[code]
+        if code == 'T' and 1 in weekdays:
+            day = 3
+        if day not in weekdays:
+            weekdays.append(day)
+        position += len(code)
+    
+    if int(start_hour) > 23 or int(end_hour) > 23 or int(start_min) > 59 or int(end_min) > 59:
+        raise ValueError('Invalid time format in schedule.')
+    
+    start_minute = int(start_hour) * 60 + int(start_min)
+    end_minute = int(end_hour) * 60 + int(end_min)
+    return tuple(sorted(weekdays)), start_minute, end_minute
+
+CLASS_DAY_START = 8 * 60
+CLASS_DAY_END = 17 * 60
+SCHEDULE_FORMAT_PATTERN = re.compile(r'^[A-Z]+\s\d{2}:\d{2}-\d{2}:\d{2}$')
+ROOM_PATTERN = re.compile(r'^(Lab|Room)\s\d{3}$')
+
+def check_class_schedule(schedule):
+    """Parse a schedule for a new class, enforcing the format and the 8am-5pm window"""
+    if not SCHEDULE_FORMAT_PATTERN.match(schedule or ''):
+        raise ValueError('Schedule must be in format: MWF 10:00-11:00 (Days in UPPERCASE, space, time range with no spaces)')
+    
+    weekdays, start_minute, end_minute = parse_schedule(schedule)
+    if start_minute < CLASS_DAY_START or end_minute > CLASS_DAY_END:
+        raise ValueError('Classes must be scheduled between 08:00 and 17:00 (8am-5pm).')
+    if start_minute >= end_minute:
+        raise ValueError('Start time must be before end time.')
+    return weekdays, start_minute, end_minute
+
+def check_class_room(room):
+    if not ROOM_PATTERN.match(room or ''):
+        raise ValueError('Room must be in format: Lab 101 or Room 202 (Lab/Room, space, exactly 3 digits)')
+
+def class_meeting_rows(class_id, schedule, section, room, faculty_id):
+    """Rows for class_meetings; classes without a valid schedule have none"""
+    try:
+        weekdays, start_minute, end_minute = parse_schedule(schedule)
+    except ValueError:
+        return []
+    
+    return [{
+        'class_id': class_id, 'weekday': weekday,
+        'start_minute': start_minute, 'end_minute': end_minute,
+        'section': section, 'room': room,
+        'faculty_id': int(faculty_id) if faculty_id is not None else None
+    } for weekday in weekdays]
+
+@event.listens_for(DbSession, 'after_flush')
+def maintain_schedule_index_on_flush(db_session, flush_context):
+    stale_class_ids, rows = set(), []
+    for obj in db_session.new:
+        if isinstance(obj, Class):
+            rows.extend(class_meeting_rows(obj.id, obj.schedule, obj.section, obj.room, obj.faculty_id))
+    for obj in db_session.dirty:
+        if isinstance(obj, Class) and any(db.inspect(obj).attrs[field].history.has_changes()
+                                          for field in SCHEDULE_INDEX_FIELDS):
+            stale_class_ids.add(obj.id)
+            rows.extend(class_meeting_rows(obj.id, obj.schedule, obj.section, obj.room, obj.faculty_id))
+    for obj in db_session.deleted:
+        if isinstance(obj, Class):
+            stale_class_ids.add(obj.id)
+    
+    meetings = ClassMeeting.__table__
+    if stale_class_ids:
+        db_session.execute(meetings.delete().where(meetings.c.class_id.in_(stale_class_ids)))
+    if rows:
+        db_session.execute(meetings.insert(), rows)
+
+def rebuild_schedule_index():
+    """Re-derive every class meeting from Class.schedule and return the number of rows"""
+    meetings = ClassMeeting.__table__
+    db.session.execute(meetings.delete())
+    rows = []
+    for class_row in db.session.execute(db.select(
+            Class.id, Class.schedule, Class.section, Class.room, Class.faculty_id)):
+        rows.extend(class_meeting_rows(*class_row))
+    if rows:
+        db.session.execute(meetings.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+def find_schedule_conflict(weekdays, start_minute, end_minute, exclude_class_id=None, **keys):
+    """Return (key, meeting) for the first meeting overlapping the slot, else None.
+
+    keys name the dimensions to check, e.g. section='A', room='Lab 101',
+    faculty_id=3; each lookup is a seek on that dimension's slot index.
+    """
+    for key, value in keys.items():
+        if value in (None, ''):
+            continue
+        query = ClassMeeting.query.filter(
+            getattr(ClassMeeting, key) == value,
+            ClassMeeting.weekday.in_(weekdays),
+            ClassMeeting.start_minute < end_minute,
+            ClassMeeting.end_minute > start_minute
+        )
+        if exclude_class_id is not None:
+            query = query.filter(ClassMeeting.class_id != exclude_class_id)
+        meeting = query.order_by(ClassMeeting.weekday, ClassMeeting.start_minute).first()
+        if meeting:
+            return key, meeting
+    return None
+
+def describe_schedule_conflict(key, meeting):
+    existing = meeting.class_obj
+    days, time_range = existing.schedule.split()
+    course_name = existing.course.course_name
+    if key == 'room':
+        return f'Schedule conflict! Room {meeting.room} is already booked for {course_name} on {days} at {time_range}. Cannot add overlapping class.'
+    if key == 'faculty_id':
+        return f'Schedule conflict! {existing.faculty.user.full_name} already teaches {course_name} on {days} at {time_range}. Cannot add overlapping class.'
+    return f'Schedule conflict! Section {meeting.section} already has {course_name} on {days} at {time_range}. Cannot add overlapping class.'
+
+@app.cli.command('rebuild-schedule-index')
+def rebuild_schedule_index_command():  # pragma: no cover
+    """Recompute class meetings from the class schedule strings."""
+    click.echo(f'Rebuilt {rebuild_schedule_index()} class meeting rows')
+
+# ==================== TIMETABLE IMPORT ====================
+
+TIMETABLE_COLUMNS = ('course_code', 'section', 'schedule', 'room', 'faculty_id')
+CONFLICT_LABELS = {'section': 'Section', 'room': 'Room', 'faculty_id': 'Faculty'}
+
+def parse_timetable_csv(stream):
+    """Read timetable rows from a CSV text stream; the header must name TIMETABLE_COLUMNS"""
+    reader = csv.DictReader(stream)
+    missing = [column for column in TIMETABLE_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f'Timetable CSV is missing columns: {", ".join(missing)}')
+    return [{column: (row.get(column) or '').strip() for column in TIMETABLE_COLUMNS} for row in reader]
+
+def sweep_schedule_conflicts(intervals):
+    """Yield (earlier, later) pairs of overlapping intervals.
+
+    intervals are (key, weekday, start_minute, end_minute, ref) tuples. They
+    are sorted once and swept per (key, weekday) group, keeping the set of
+    intervals still running at each start, so every overlapping pair is
+    yielded in O(n log n + pairs).
+    """
+    group, active = None, []
+    for interval in sorted(intervals, key=lambda i: i[:4]):
+        if interval[:2] != group:
+            group, active = interval[:2], []
+        active = [earlier for earlier in active if earlier[3] > interval[2]]
+        for earlier in active:
+            yield earlier, interval
+        active.append(interval)
+
+def _timetable_lookups(rows):
+    """Load the courses, faculty and populated sections a batch refers to in three queries"""
+    codes = {row['course_code'] for row in rows}
+    faculty_codes = {row['faculty_id'] for row in rows}
+    sections = {row['section'] for row in rows}
+    
+    courses = {course.course_code: course for course in Course.query.filter(Course.course_code.in_(codes))}
+    faculty = {member.faculty_id: member for member in Faculty.query.filter(Faculty.faculty_id.in_(faculty_codes))}
+    populated = set(db.session.query(Student.department, Student.year, Student.section)
+                    .filter(Student.section.in_(sections)).distinct())
+    return courses, faculty, populated
+
+def _describe_conflict_ref(ref, batch):
+    kind, value = ref
+    if kind == 'line':
+        row = batch[value]
+        return f"line {value} ({row['course_code']} {row['schedule']})"
+    class_obj = db.session.get(Class, value)
+    return f'existing class {class_obj.course.course_code} section {class_obj.section} ({class_obj.schedule})'
+
+def import_timetable(rows, dry_run=False):
+    """Validate a batch of timetable rows and create every valid class in one transaction.
+
+    Each row needs course_code, section, schedule, room and faculty_id (the
+    faculty code, e.g. FAC001). Section, room and faculty clashes within the
+    batch and against existing classes are found with one sweep. Returns a dict
+    with the number of classes created and a list of problems by CSV line.
+    """
+    courses, faculty, populated = _timetable_lookups(rows)
+    problems = []
+    batch = {}
+    
+    for line, row in enumerate(rows, 2):
+        try:
+            missing = [column for column in TIMETABLE_COLUMNS if not row.get(column)]
+            if missing:
+                raise ValueError(f'Missing {", ".join(missing)}.')
+            course = courses.get(row['course_code'])
+            if course is None:
+                raise ValueError(f"Unknown course {row['course_code']}.")
+            member = faculty.get(row['faculty_id'])
+            if member is None:
+                raise ValueError(f"Unknown faculty {row['faculty_id']}.")
+            weekdays, start_minute, end_minute = check_class_schedule(row['schedule'])
+            check_class_room(row['room'])
+            if (course.department, course.year, row['section']) not in populated:
+                raise ValueError(f"No students found in {course.department} Year {course.year} Section {row['section']}.")
+        except ValueError as e:
+            problems.append({'line': line, 'message': str(e)})
+            continue
+        
+        batch[line] = dict(row, course=course, faculty=member,
+                           slot=(weekdays, start_minute, end_minute))
+    
+    # Existing meetings that share a section, room or faculty member with the batch
+    keys = {key: {row[key] if key != 'faculty_id' else row['faculty'].id for row in batch.values()}
+            for key in CONFLICT_LABELS}
+    existing = ClassMeeting.query.filter(db.or_(
+        ClassMeeting.section.in_(keys['section']),
+        ClassMeeting.room.in_(keys['room']),
+        ClassMeeting.faculty_id.in_(keys['faculty_id'])
+    )).all() if batch else []
+    
+    intervals = []
+    for line, row in batch.items():
+        weekdays, start_minute, end_minute = row['slot']
+        values = {'section': row['section'], 'room': row['room'], 'faculty_id': row['faculty'].id}
+        for key, value in values.items():
+            intervals.extend(((key, value), weekday, start_minute, end_minute, ('line', line))
+                             for weekday in weekdays)
+    for meeting in existing:
+        for key in CONFLICT_LABELS:
+            intervals.append(((key, getattr(meeting, key)), meeting.weekday, meeting.start_minute,
+                              meeting.end_minute, ('class', meeting.class_id)))
+    
+    clashes = set()
+    for earlier, later in sweep_schedule_conflicts(intervals):
+        (key, value), refs = earlier[0], (earlier[4], later[4])
+        for ref, other in (refs, refs[::-1]):
+            if ref[0] == 'line' and ref != other:
+                clashes.add((ref[1], key, value, other))
+    
+    rejected = set()
+    for line, key, value, other in sorted(clashes, key=lambda c: (c[0], c[1], str(c[3]))):
+        label = CONFLICT_LABELS[key]
+        shown = batch[line]['faculty_id'] if key == 'faculty_id' else value
+        problems.append({'line': line, 'message': f'{label} {shown} clashes with {_describe_conflict_ref(other, batch)}.'})
+        rejected.add(line)
+    
+    valid = [row for line, row in batch.items() if line not in rejected]
+    if valid and not dry_run:
+        try:
+            db.session.add_all([Class(
+                course_id=row['course'].id,
+                faculty_id=row['faculty'].id,
+                section=row['section'],
+                schedule=row['schedule'],
+                room=row['room']
+            ) for row in valid])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    problems.sort(key=lambda problem: problem['line'])
+    return {'created': 0 if dry_run else len(valid), 'valid': len(valid), 'problems': problems}
+
+@app.cli.command('import-timetable')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dry-run', is_flag=True, help='Validate the file without creating classes.')
+def import_timetable_command(path, dry_run):  # pragma: no cover
+    """Create classes from a timetable CSV."""
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        result = import_timetable(parse_timetable_csv(handle), dry_run=dry_run)
+    for problem in result['problems']:
+        click.echo(f"Line {problem['line']}: {problem['message']}")
+    click.echo(f"{result['valid']} valid rows, {result['created']} classes created, {len(result['problems'])} problems")
+
+# ==================== SESSION GENERATOR ====================
+
+MAX_TERM_DAYS = 366
+
+def parse_term_dates(start_str, end_str, holidays_str=''):
+    """Parse a term range and holiday list (YYYY-MM-DD, separated by commas or whitespace)"""
+    try:
+        start_date = datetime.strptime((start_str or '').strip(), '%Y-%m-%d').date()
+        end_date = datetime.strptime((end_str or '').strip(), '%Y-%m-%d').date()
+        holidays = {datetime.strptime(token, '%Y-%m-%d').date()
+                    for token in re.split(r'[\s,]+', holidays_str or '') if token}
+    except ValueError:
+        raise ValueError('Dates must be in YYYY-MM-DD format.')
+    
+    if end_date < start_date:
+        raise ValueError('Term end date must be on or after the start date.')
+    if (end_date - start_date).days >= MAX_TERM_DAYS:
+        raise ValueError('A term cannot be longer than a year.')
+    return start_date, end_date, holidays
+
+def term_meeting_dates(weekday, start_date, end_date, holidays=()):
+    """Yield every date on the given weekday between two dates, skipping holidays"""
+    day = start_date + timedelta(days=(weekday - start_date.weekday()) % 7)
+    while day <= end_date:
+        if day not in holidays:
+            yield day
+        day += timedelta(days=7)
+
+def generate_term_sessions(start_date, end_date, holidays=(), class_ids=None, created_by=None):
+    """Create the sessions each class's schedule implies for a term in one transaction.
+
+    Meeting days and times come from the class_meetings index; classes without
+    a schedule are skipped. Dates that already have a session for the class
+    are left alone, so re-running over the same term is a no-op. Returns the
+    number of sessions created per class id.
+    """
+    query = ClassMeeting.query
+    if class_ids is not None:
+        query = query.filter(ClassMeeting.class_id.in_(class_ids))
+    meetings = query.all()
+    scheduled_ids = {meeting.class_id for meeting in meetings}
+    
+    existing = set(db.session.execute(
+        db.select(AttendanceSession.class_id, AttendanceSession.date)
+        .where(AttendanceSession.class_id.in_(scheduled_ids),
+               AttendanceSession.date.between(start_date, end_date))
+    ).all()) if scheduled_ids else set()
+    
+    rows = []
+    for meeting in meetings:
+        start_time = time(*divmod(meeting.start_minute, 60))
+        end_time = time(*divmod(meeting.end_minute, 60))
+        for day in term_meeting_dates(meeting.weekday, start_date, end_date, holidays):
+            if (meeting.class_id, day) not in existing:
+                existing.add((meeting.class_id, day))
+                rows.append({
+                    'class_id': meeting.class_id, 'date': day,
+                    'start_time': start_time, 'end_time': end_time,
+                    'created_by': created_by
+                })
+    
+    if rows:
+        # The conflict clause keeps concurrent runs idempotent as well
+        stmt = sqlite_insert(AttendanceSession.__table__).on_conflict_do_nothing(index_elements=['class_id', 'date'])
+        try:
+            for start in range(0, len(rows), 5000):
+                db.session.execute(stmt, rows[start:start + 5000])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    created = dict.fromkeys(scheduled_ids, 0)
+    for row in rows:
+        created[row['class_id']] += 1
+    return created
+
+@app.cli.command('generate-sessions')
+@click.option('--start', 'start_str', required=True, help='First day of term (YYYY-MM-DD).')
+@click.option('--end', 'end_str', required=True, help='Last day of term (YYYY-MM-DD).')
+@click.option('--holiday', 'holidays', multiple=True, help='A date with no classes; repeat as needed.')
+@click.option('--class-id', 'class_ids', type=int, multiple=True, help='Limit to these classes; default is every class.')
+def generate_sessions_command(start_str, end_str, holidays, class_ids):  # pragma: no cover
+    """Create attendance sessions for a term from class schedules."""
+    try:
+        start_date, end_date, holiday_dates = parse_term_dates(start_str, end_str, ' '.join(holidays))
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    created = generate_term_sessions(start_date, end_date, holiday_dates, class_ids=list(class_ids) or None)
+    click.echo(f'Created {sum(created.values())} sessions for {len(created)} scheduled classes')
+
+# ==================== QR CHECK-IN ====================
+
+def _qr_signature(payload):
+    key = (app.config.get('QR_SIGNING_KEY') or app.config['SECRET_KEY']).encode()
+    digest = hmac.new(key, payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:16]).decode().rstrip('=')
+
+def current_qr_window(now=None):
+    now = datetime.now().timestamp() if now is None else now
+    return int(now // app.config['QR_TOKEN_TTL'])
+
+def make_checkin_token(session_obj, window=None):
+    """Sign the session id, class id, date and time window into a check-in token"""
+    window = current_qr_window() if window is None else window
+    payload = f'{session_obj.id}.{session_obj.class_id}.{session_obj.date:%Y%m%d}.{window}'
+    return f'{payload}.{_qr_signature(payload)}'
+
+def verify_checkin_token(token, now=None):
+    """Return (session_id, class_id, session_date) for a valid token, else raise ValueError.
+
+    Only the signature and time window are checked, so verification needs no
+    database read. A token is accepted during its own window and the next,
+    so a code scanned just before it rotates still works.
+    """
+    try:
+        session_id, class_id, date_str, window, signature = (token or '').split('.')
+        payload = f'{session_id}.{class_id}.{date_str}.{window}'
+        valid = hmac.compare_digest(signature, _qr_signature(payload))
+        parsed = int(session_id), int(class_id), datetime.strptime(date_str, '%Y%m%d').date()
+        age = current_qr_window(now) - int(window)
+    except ValueError:
+        raise ValueError('Invalid check-in code.')
+    
+    if not valid:
+        raise ValueError('Invalid check-in code.')
+    if not 0 <= age <= 1:
+        raise ValueError('This check-in code has expired. Scan the code currently on screen.')
+    return parsed
+
+def checkin_qr_data_uri(url):
+    image = qrcode.make(url, box_size=8, border=2)
+    buffer = BytesIO()
+    image.save(buffer, format='PNG')
+    return 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode()
+
+def record_checkins(session_id, class_id, session_date, student_ids, method='qr', status='present'):
+    """Mark students in one INSERT ... SELECT and return the ids newly marked.
+
+    The SELECT only yields students enrolled in the class while the session
+    is not finalized, and students who already have a mark are left as they
+    are. Each student is recorded as marking themselves. The insert bypasses
+    the ORM, so rollups and cached reports are updated here.
+    """
+    student_ids = list(student_ids)
+    if not student_ids:
+        return []
+    
+    marked_at = datetime.utcnow()
+    source = db.select(
+        Enrollment.student_id,
+        db.literal(session_id),
+        db.literal(status),
+        db.literal(marked_at, db.DateTime),
+        Student.user_id,
+        db.literal(method)
+    ).join(Student, Student.id == Enrollment.student_id)\
+     .join(AttendanceSession, db.and_(AttendanceSession.id == session_id,
+                                      AttendanceSession.class_id == Enrollment.class_id))\
+     .where(Enrollment.class_id == class_id,
+            Enrollment.student_id.in_(student_ids),
+            db.func.coalesce(AttendanceSession.is_finalized, False) == False)\
+     .distinct()
+    
+    table = Attendance.__table__
+    stmt = sqlite_insert(table).from_select(
+        ['student_id', 'session_id', 'status', 'marked_at', 'marked_by', 'method'], source
+    ).on_conflict_do_nothing(index_elements=['session_id', 'student_id']).returning(table.c.student_id)
+    
+    try:
+        marked = [row[0] for row in db.session.execute(stmt)]
+        apply_rollup_deltas(db.session, {(student_id, class_id): _rollup_delta(status, 1) for student_id in marked})
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    if marked:
+        report_cache.invalidate_dates([session_date])
+    return marked
+
+def already_marked_students(session_id, student_ids):
+    """Return which of the students already have a mark for the session"""
+    if not student_ids:
+        return set()
+    return {row[0] for row in db.session.query(Attendance.student_id).filter(
+        Attendance.session_id == session_id, Attendance.student_id.in_(student_ids))}
+
+CHECKIN_PENDING = 'pending'
+CHECKIN_COMMITTED = 'committed'
+CHECKIN_ALREADY_MARKED = 'already_marked'
+CHECKIN_REJECTED = 'rejected'
+
+class CheckinQueue(QueuedBatchWriter):
+    """Accepts check-ins immediately and writes them in coalesced batches.
+
+    Queued check-ins are grouped per session and written with one
+    record_checkins call per group, so a lecture hall checking in at once
+    costs a few multi-row inserts instead of a write transaction per student.
+    The states of recent check-ins are kept for status lookups.
+    """
+    thread_name = 'checkin-writer'
+    batch_size_key = 'CHECKIN_BATCH_SIZE'
+    flush_interval_key = 'CHECKIN_FLUSH_INTERVAL'
+    
+    def __init__(self, flask_app):
+        super().__init__(flask_app)
+        self._states = OrderedDict()
+        self._states_lock = threading.Lock()
+    
+    def submit(self, session_id, class_id, session_date, student_id):
+        """Queue a check-in unless the same one is still pending; return its state"""
+        key = (session_id, student_id)
+        with self._states_lock:
+            if self._states.get(key) == CHECKIN_PENDING:
+                return CHECKIN_PENDING
+            self._remember(key, CHECKIN_PENDING)
+        
+        item = (session_id, class_id, session_date, student_id)
+        if self.app.config.get('CHECKIN_QUEUE_ASYNC'):
+            self.enqueue(item)
+        else:
+            self.queue.put(item)
+            self.flush()
+        return self.state(session_id, student_id)
+    
+    def state(self, session_id, student_id):
+        """Return pending, committed, already_marked, rejected, or None if nothing is known"""
+        with self._states_lock:
+            state = self._states.get((session_id, student_id))
+        if state is not None:
+            return state
+        
+        # Older check-ins have been evicted from memory; the table has the answer
+        mark = db.session.query(Attendance.method).filter_by(session_id=session_id, student_id=student_id).first()
+        if mark is None:
+            return None
+        return CHECKIN_COMMITTED if mark.method == 'qr' else CHECKIN_ALREADY_MARKED
+    
+    def _remember(self, key, state):
+        self._states[key] = state
+        self._states.move_to_end(key)
+        while len(self._states) > self.app.config['CHECKIN_STATUS_MAX_ENTRIES']:
+            self._states.popitem(last=False)
+    
+    def _write(self, items):
+        groups = {}
+        for session_id, class_id, session_date, student_id in items:
+            groups.setdefault((session_id, class_id, session_date), set()).add(student_id)
+        
+        with self.app.app_context():
+            for (session_id, class_id, session_date), student_ids in groups.items():
+                try:
+                    marked = set(record_checkins(session_id, class_id, session_date, student_ids))
+                    existing = already_marked_students(session_id, student_ids - marked)
+                except Exception as e:
+                    self.app.logger.exception(f'Error writing {len(student_ids)} check-ins for session {session_id}: {e}')
+                    marked, existing = set(), set()
+                
+                with self._states_lock:
+                    for student_id in student_ids:
+                        if student_id in marked:
+                            state = CHECKIN_COMMITTED
+                        elif student_id in existing:
+                            state = CHECKIN_ALREADY_MARKED
+                        else:
+                            state = CHECKIN_REJECTED
+                        self._remember((session_id, student_id), state)
+
+
+checkin_queue = CheckinQueue(app)
+atexit.register(checkin_queue.stop)
+
+def explain_failed_checkin(session_id, class_id, student_id):
+    """Say why record_checkins did not mark a student"""
+    if Attendance.query.filter_by(session_id=session_id, student_id=student_id).first():
+        return 'You are already checked in for this session.'
+    if not Enrollment.query.filter_by(class_id=class_id, student_id=student_id).first():
+        return 'You are not enrolled in this class.'
+    return 'This session is closed for check-in.'
+
+# ==================== DEVICE INGESTION ====================
+
+DEVICE_KINDS = ('rfid', 'biometric')
+DEVICE_RESULTS = ('received', 'marked', 'duplicate', 'rejected', 'invalid',
+                  'unknown_reader', 'unknown_student', 'no_session')
+DEVICE_EVENT_FIELDS = ('reader_id', 'card_or_student_id', 'timestamp')
+
+def hash_device_key(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+def register_device(reader_id, room, kind='rfid'):
+    """Create or re-key a device and return its new API key (only the hash is stored)"""
+    if kind not in DEVICE_KINDS:
+        raise ValueError(f'Device kind must be one of: {", ".join(DEVICE_KINDS)}')
+    check_class_room(room)
+    
+    key = secrets.token_urlsafe(32)
+    device = AttendanceDevice.query.filter_by(reader_id=reader_id).first() or AttendanceDevice(reader_id=reader_id)
+    device.room, device.kind, device.key_hash, device.is_active = room, kind, hash_device_key(key), True
+    db.session.add(device)
+    db.session.commit()
+    return key
+
+def authenticate_device(key):
+    if not key:
+        return None
+    return AttendanceDevice.query.filter_by(key_hash=hash_device_key(key), is_active=True).first()
+
+def parse_device_event(raw):
+    """Return (reader_id, identifier, local naive timestamp) or raise ValueError"""
+    try:
+        reader_id, identifier, stamp = (str(raw[field]).strip() for field in DEVICE_EVENT_FIELDS)
+        timestamp = datetime.fromisoformat(stamp)
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Events need reader_id, card_or_student_id and an ISO 8601 timestamp.')
+    if not reader_id or not identifier:
+        raise ValueError('Events need reader_id, card_or_student_id and an ISO 8601 timestamp.')
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return reader_id, identifier, timestamp
+
+class DeviceEventIngestor:
+    """Matches streamed reader events to sessions and records them batch by batch.
+
+    Each batch resolves its readers and students with one query apiece and
+    looks up the sessions held in a room on a date through the classes.room
+    and (class_id, date) indexes, caching recent rooms. Matched swipes go
+    through record_checkins, so re-sending a batch marks nobody twice. Memory
+    is bounded by DEVICE_BATCH_SIZE and the small room cache.
+    """
+    
+    ROOM_CACHE_SIZE = 256
+    
+    def __init__(self, allowed_readers=None):
+        self.allowed_readers = allowed_readers
+        self.counts = dict.fromkeys(DEVICE_RESULTS, 0)
+        self._devices = {}
+        self._room_sessions = OrderedDict()
+    
+    def ingest(self, events):
+        """Consume an iterable of raw event dicts and return the result counts"""
+        batch_size = app.config['DEVICE_BATCH_SIZE']
+        batch = []
+        for raw in events:
+            batch.append(raw)
+            if len(batch) >= batch_size:
+                self._process(batch)
+                batch = []
+        if batch:
+            self._process(batch)
+        return self.counts
+    
+    def _resolve_devices(self, reader_ids):
+        unknown = [reader_id for reader_id in reader_ids if reader_id not in self._devices]
+        if unknown:
+            found = {device.reader_id: device for device in AttendanceDevice.query.filter(
+                AttendanceDevice.reader_id.in_(unknown), AttendanceDevice.is_active == True)}
+            for reader_id in unknown:
+                device = found.get(reader_id)
+                allowed = self.allowed_readers is None or reader_id in self.allowed_readers
+                self._devices[reader_id] = (device.room, device.kind) if device and allowed else None
+    
+    def _sessions_in_room(self, room, day):
+        key = (room, day)
+        if key in self._room_sessions:
+            self._room_sessions.move_to_end(key)
+            return self._room_sessions[key]
+        
+        rows = db.session.query(AttendanceSession.id, AttendanceSession.class_id,
+                                AttendanceSession.start_time, AttendanceSession.end_time)\
+            .join(Class, Class.id == AttendanceSession.class_id)\
+            .filter(Class.room == room, AttendanceSession.date == day)\
+            .order_by(AttendanceSession.start_time).all()
+        sessions = [(session_id, class_id, datetime.combine(day, start), datetime.combine(day, end))
+                    for session_id, class_id, start, end in rows]
+        
+        self._room_sessions[key] = sessions
+        if len(self._room_sessions) > self.ROOM_CACHE_SIZE:
+            self._room_sessions.popitem(last=False)
+        return sessions
+    
+    def _match_session(self, room, timestamp):
+        early = timedelta(minutes=app.config['DEVICE_EARLY_MINUTES'])
+        for session_id, class_id, start, end in self._sessions_in_room(room, timestamp.date()):
+            if start - early <= timestamp <= end:
+                return session_id, class_id, start
+        return None
+    
+    def _process(self, batch):
+        self.counts['received'] += len(batch)
+        events = []
+        for raw in batch:
+            try:
+                events.append(parse_device_event(raw))
+            except ValueError:
+                self.counts['invalid'] += 1
+        
+        self._resolve_devices({reader_id for reader_id, _, _ in events})
+        identifiers = {identifier for _, identifier, _ in events}
+        students = dict(db.session.query(Student.student_id, Student.id)
+                        .filter(Student.student_id.in_(identifiers)).all()) if identifiers else {}
+        
+        # Keep each student's earliest swipe per session
+        first_swipes = {}
+        late_after = timedelta(minutes=app.config['DEVICE_LATE_AFTER_MINUTES'])
+        for reader_id, identifier, timestamp in events:
+            device = self._devices.get(reader_id)
+            if device is None:
+                self.counts['unknown_reader'] += 1
+                continue
+            student_id = students.get(identifier)
+            if student_id is None:
+                self.counts['unknown_student'] += 1
+                continue
+            match = self._match_session(device[0], timestamp)
+            if match is None:
+                self.counts['no_session'] += 1
+                continue
+            
+            session_id, class_id, start = match
+            status = 'late' if timestamp > start + late_after else 'present'
+            swipe = (timestamp, class_id, start.date(), status, device[1])
+            key = (session_id, student_id)
+            if key in first_swipes:
+                self.counts['duplicate'] += 1
+                if timestamp < first_swipes[key][0]:
+                    first_swipes[key] = swipe
+            else:
+                first_swipes[key] = swipe
+        
+        groups = {}
+        for (session_id, student_id), (_, class_id, day, status, method) in first_swipes.items():
+            groups.setdefault((session_id, class_id, day, status, method), set()).add(student_id)
+        
+        for (session_id, class_id, day, status, method), student_ids in groups.items():
+            marked = set(record_checkins(session_id, class_id, day, student_ids, method=method, status=status))
+            duplicates = already_marked_students(session_id, student_ids - marked)
+            self.counts['marked'] += len(marked)
+            self.counts['duplicate'] += len(duplicates)
+            self.counts['rejected'] += len(student_ids - marked - duplicates)
+
+def iter_ndjson(lines):
+    """Yield one decoded object per non-blank line; raise ValueError naming the first malformed line"""
+    for number, line in enumerate(lines, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                raise ValueError(f'Malformed NDJSON on line {number}')
+
+def iter_device_event_file(handle, name):
+    """Yield raw events from a CSV (header reader_id,card_or_student_id,timestamp) or NDJSON file"""
+    if name.endswith(('.ndjson', '.jsonl')):
+        yield from iter_ndjson(handle)
+    else:
+        yield from csv.DictReader(handle)
+
+@app.cli.command('register-device')
+@click.argument('reader_id')
+@click.option('--room', required=True, help='Room the reader is installed in, e.g. "Lab 101".')
+@click.option('--kind', type=click.Choice(DEVICE_KINDS), default='rfid')
+def register_device_command(reader_id, room, kind):  # pragma: no cover
+    """Register a reader (or rotate its key) and print its API key."""
+    try:
+        key = register_device(reader_id, room, kind)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    click.echo(f'API key for {reader_id} (shown once): {key}')
+
+@app.cli.command('ingest-device-events')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def ingest_device_events_command(path):  # pragma: no cover
+    """Match buffered reader events from a CSV or NDJSON file to sessions."""
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        counts = DeviceEventIngestor().ingest(iter_device_event_file(handle, path))
+    click.echo(', '.join(f'{count} {name}' for name, count in counts.items()))
+
+# ==================== OFFLINE SYNC ====================
+
+SYNC_KEY_MAX_LENGTH = 64
+
+def parse_sync_change(change):
+    """Return (session_id, student_id, status, marked_at as naive UTC, expected version or None) or raise ValueError"""
+    try:
+        session_id, student_id = int(change['session_id']), int(change['student_id'])
+        status = change['status']
+        marked_at = datetime.fromisoformat(str(change['marked_at']).replace('Z', '+00:00'))
+        version = parse_expected_version(change.get('version'))
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Changes need session_id, student_id, status and an ISO 8601 marked_at.')
+    if status not in ATTENDANCE_STATUSES:
+        raise ValueError(f'Invalid status: {status}')
+    if marked_at.tzinfo is not None:
+        marked_at = marked_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return session_id, student_id, status, marked_at, version
+
+def apply_sync_changes(faculty, user_id, changes):
+    """Apply a client log of status changes in one transaction and return a result per key.
+
+    Each change carries a client idempotency key; keys already processed for
+    this user return their stored result without touching attendance, so
+    the page can resend its whole outbox after any failure. New changes are
+    applied oldest first. A change that carries the version it was made
+    from (0 for an unmarked student) only applies if the mark is still at
+    that version, and is otherwise a 'conflict'; a change without one wins
+    over a mark with an older marked_at (last writer wins). Client clocks
+    running ahead are clamped to now. Results are 'applied', 'conflict',
+    'stale', 'rejected' (session not editable by this faculty member or
+    student not enrolled) or 'invalid'. Alongside them it
+    returns the resulting mark of every student touched, keyed by
+    "session_id:student_id", so the page can show the value that won.
+    """
+    now = datetime.utcnow()
+    results = {}
+    parsed = {}
+    for change in changes:
+        key = str(change.get('key') or '').strip() if isinstance(change, dict) else ''
+        if not key or len(key) > SYNC_KEY_MAX_LENGTH or key in results:
+            continue
+        try:
+            session_id, student_id, status, marked_at, version = parse_sync_change(change)
+        except ValueError:
+            results[key] = 'invalid'
+            continue
+        results[key] = None
+        parsed[key] = (session_id, student_id, status, min(marked_at, now), version)
+    
+    if parsed:
+        for op in AttendanceSyncOp.query.filter(AttendanceSyncOp.user_id == user_id,
+                                                AttendanceSyncOp.key.in_(list(parsed))):
+            results[op.key] = op.result
+            del parsed[op.key]
+    if not parsed:
+        return results, {}
+    
+    session_ids = {change[0] for change in parsed.values()}
+    student_ids = {change[1] for change in parsed.values()}
+    editable = {
+        session_obj.id: session_obj.class_id
+        for session_obj in AttendanceSession.query.join(Class).filter(
+            AttendanceSession.id.in_(session_ids), Class.faculty_id == faculty.id)
+        if can_edit_attendance(session_obj)
+    }
+    enrolled = set(db.session.query(Enrollment.class_id, Enrollment.student_id).filter(
+        Enrollment.class_id.in_(set(editable.values())), Enrollment.student_id.in_(student_ids)).all())
+    marks = {
+        (record.session_id, record.student_id): record
+        for record in Attendance.query.filter(Attendance.session_id.in_(session_ids),
+                                              Attendance.student_id.in_(student_ids))
+    }
+    
+    # Versions a change may have been made from: the stored one, plus each one
+    # this batch writes, so a client's queued edits of one student chain
+    seen_versions = {pair: {record.version} for pair, record in marks.items()}
+    for key, (session_id, student_id, status, marked_at, version) in sorted(parsed.items(),
+                                                                           key=lambda item: item[1][3]):
+        if (editable.get(session_id), student_id) not in enrolled:
+            results[key] = 'rejected'
+        else:
+            record = marks.get((session_id, student_id))
+            if version is not None and version not in seen_versions.get((session_id, student_id), {0}):
+                results[key] = 'conflict'
+            elif version is None and record is not None and record.marked_at and record.marked_at >= marked_at:
+                results[key] = 'stale'
+            else:
+                if record is None:
+                    record = marks[(session_id, student_id)] = Attendance(session_id=session_id, student_id=student_id)
+                    db.session.add(record)
+                record.status, record.marked_at = status, marked_at
+                record.marked_by, record.method = user_id, 'manual'
+                db.session.flush()
+                seen_versions.setdefault((session_id, student_id), {0}).add(record.version)
+                results[key] = 'applied'
+        db.session.add(AttendanceSyncOp(user_id=user_id, key=key, result=results[key], created_at=now))
+    
+    db.session.flush()
+    current = {
+        f'{session_id}:{student_id}': attendance_snapshot(marks[(session_id, student_id)])
+        for session_id, student_id, _, _, _ in parsed.values() if (session_id, student_id) in marks
+    }
+    db.session.commit()
+    return results, current
+
+# ==================== USER DIRECTORY ====================
+
+USER_DIRECTORY_GROUPS = ('admin', 'faculty', 'student')
+
+def _equals_or_null(column, value):
+    return column.is_(None) if value is None else column == value
+
+def _sorts_after(columns, values):
+    """Keyset condition for rows ordered after values, with NULLs first as SQLite sorts them"""
+    conditions = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        greater = column.isnot(None) if value is None else column > value
+        conditions.append(db.and_(*(_equals_or_null(c, v) for c, v in zip(columns[:i], values[:i])), greater))
+    return db.or_(*conditions)
+
+def parse_section_key(args):
+    """Return the (department, year, section) a request names; empty values mean NULL"""
+    year = args.get('year', '')
+    return (args.get('department') or None,
+            int(year) if year != '' else None,
+            args.get('section') or None)
+
+def user_directory_counts():
+    """Return {role: count} from one GROUP BY"""
+    return dict(db.session.query(User.role, db.func.count(User.id)).group_by(User.role).all())
+
+def user_directory_page(group, after=None, section_key=None):
+    """Return (rows, next_after) for one keyset page of a directory group.
+
+    Admins page by user id, faculty by faculty_id and students within one
+    section by student_id, each through an index, so deep pages cost the
+    same as the first. next_after is None on the last page.
+    """
+    limit = app.config['ADMIN_USERS_PAGE_SIZE']
+    if group == 'admin':
+        query = User.query.filter(User.role == 'admin').order_by(User.id)
+        if after:
+            query = query.filter(User.id > int(after))
+        cursor = lambda user: user.id
+    elif group == 'faculty':
+        query = Faculty.query.options(db.joinedload(Faculty.user)).order_by(Faculty.faculty_id)
+        if after:
+            query = query.filter(Faculty.faculty_id > after)
+        cursor = lambda faculty: faculty.faculty_id
+    elif group == 'student':
+        department, year, section = section_key
+        query = Student.query.options(db.joinedload(Student.user)).filter(
+            _equals_or_null(Student.department, department),
+            _equals_or_null(Student.year, year),
+            _equals_or_null(Student.section, section)
+        ).order_by(Student.student_id)
+        if after:
+            query = query.filter(Student.student_id > after)
+        cursor = lambda student: student.student_id
+    else:
+        raise ValueError(f'Unknown user group: {group}')
+    
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], cursor(rows[limit - 1])
+    return rows, None
+
+def student_section_page(after=None):
+    """Return ([(department, year, section, count)], next_after) for one page of student sections.
+
+    Grouping and counting happen in SQL over the section index; after is
+    the last (department, year, section) of the previous page.
+    """
+    limit = app.config['ADMIN_USERS_PAGE_SIZE']
+    key = (Student.department, Student.year, Student.section)
+    query = db.session.query(*key, db.func.count(Student.id)).group_by(*key).order_by(*key)
+    if after is not None:
+        query = query.filter(_sorts_after(key, after))
+    
+    groups = [tuple(row) for row in query.limit(limit + 1).all()]
+    if len(groups) > limit:
+        return groups[:limit], list(groups[limit - 1][:3])
+    return groups, None
+
+# ==================== USER SEARCH ====================
+
+# FTS5 table keyed by user id (its rowid). It lives outside db.metadata, so
+# it is created and dropped alongside the users table by the DDL hooks below.
+user_search_table = db.Table(
+    'user_search', db.MetaData(),
+    db.Column('rowid', db.Integer, primary_key=True),
+    db.Column('username', db.Text),
+    db.Column('full_name', db.Text),
+    db.Column('email', db.Text),
+    db.Column('student_id', db.Text)
+)
+USER_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS user_search USING fts5("
+    "username, full_name, email, student_id, prefix='2 3', tokenize='unicode61')"
+)
+USER_SEARCH_FIELDS = {User: ('username', 'full_name', 'email'), Student: ('student_id', 'user_id')}
+SEARCH_TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+event.listen(User.__table__, 'after_create', DDL(USER_SEARCH_DDL))
+event.listen(User.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS user_search'))
+
+def reindex_users(db_session, user_ids, chunk_size=500):
+    """Replace the search rows of the given users with their current values"""
+    user_ids = list(user_ids)
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        db_session.execute(user_search_table.delete().where(user_search_table.c.rowid.in_(chunk)))
+        source = db.select(User.id, User.username, User.full_name, User.email, Student.student_id)\
+            .outerjoin(Student, Student.user_id == User.id).where(User.id.in_(chunk))
+        db_session.execute(user_search_table.insert().from_select(
+            ['rowid', 'username', 'full_name', 'email', 'student_id'], source))
+
+def rebuild_user_search():
+    """Create the search table if needed, re-index every user and return the row count"""
+    db.session.execute(db.text(USER_SEARCH_DDL))
+    db.session.execute(user_search_table.delete())
+    reindex_users(db.session, [row[0] for row in db.session.execute(db.select(User.id))])
+    db.session.commit()
+    return db.session.execute(db.select(db.func.count()).select_from(user_search_table)).scalar()
+
+@event.listens_for(DbSession, 'after_flush')
+def maintain_user_search_on_flush(db_session, flush_context):
+    user_ids = set()
+    for obj in list(db_session.new) + list(db_session.deleted):
+        if isinstance(obj, User):
+            user_ids.add(obj.id)
+        elif isinstance(obj, Student):
+            user_ids.add(obj.user_id)
+    for obj in db_session.dirty:
+        fields = USER_SEARCH_FIELDS.get(type(obj))
+        if fields and any(db.inspect(obj).attrs[field].history.has_changes() for field in fields):
+            user_ids.add(obj.id if isinstance(obj, User) else obj.user_id)
+            if isinstance(obj, Student):
+                user_ids.update(db.inspect(obj).attrs['user_id'].history.deleted)
+    user_ids.discard(None)
+    if user_ids:
+        reindex_users(db_session, user_ids)
+
+@event.listens_for(DbSession, 'do_orm_execute')
+def maintain_user_search_on_bulk_write(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper_classes = {mapper.class_ for mapper in orm_execute_state.all_mappers}
+    if not mapper_classes & {User, Student}:
+        return
+    
+    # Capture the users the statement touches, run it, then re-index them
+    id_column = User.id if User in mapper_classes else Student.user_id
+    affected = db.select(id_column)
+    if orm_execute_state.statement.whereclause is not None:
+        affected = affected.where(orm_execute_state.statement.whereclause)
+    user_ids = {row[0] for row in orm_execute_state.session.execute(affected)}
+    
+    result = orm_execute_state.invoke_statement()
+    reindex_users(orm_execute_state.session, user_ids)
+    return result
+
+def search_users(text_query, limit=20):
+    """Return up to limit users whose username, name, email or student ID match every query token.
+
+    Each token matches as a prefix of a word, so "jo smi" finds "John
+    Smith" and "ST00" finds student ST001. Results come back best match
+    first, ranked by FTS5's bm25.
+    """
+    tokens = SEARCH_TOKEN_PATTERN.findall(text_query.lower())[:8]
+    if not tokens:
+        return []
+    match = ' '.join(f'"{token}"*' for token in tokens)
+    user_ids = [row[0] for row in db.session.execute(
+        db.text("SELECT rowid FROM user_search WHERE user_search MATCH :match ORDER BY rank LIMIT :limit"),
+        {'match': match, 'limit': limit})]
+    if not user_ids:
+        return []
+    
+    found = {
+        user.id: (user, student_id)
+        for user, student_id in db.session.query(User, Student.student_id)
+            .outerjoin(Student, Student.user_id == User.id).filter(User.id.in_(user_ids))
+    }
+    return [
+        {'id': user.id, 'username': user.username, 'full_name': user.full_name,
+         'email': user.email, 'role': user.role, 'student_id': student_id}
+        for user, student_id in (found[user_id] for user_id in user_ids if user_id in found)
+    ]
+
+@app.cli.command('rebuild-user-search')
+def rebuild_user_search_command():  # pragma: no cover
+    """Rebuild the full-text user search index."""
+    click.echo(f'Indexed {rebuild_user_search()} users')
+
+# ==================== DASHBOARD COUNTERS ====================
+
+COUNTED_MODELS = (Student, Faculty, Course, Class)
+COUNTED_TABLES = tuple(model.__tablename__ for model in COUNTED_MODELS)
+
+def apply_entity_count_deltas(db_session, deltas):
+    """Add row-count deltas keyed by table name with one upsert"""
+    rows = [{'name': name, 'total': delta} for name, delta in deltas.items() if delta and name in COUNTED_TABLES]
+    if not rows:
+        return
+    
+    table = EntityCount.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(index_elements=['name'], set_={'total': table.c.total + stmt.excluded.total})
+    db_session.execute(stmt, rows)
+
+def rebuild_entity_counts():
+    """Recount every counted table from scratch and return the totals"""
+    table = EntityCount.__table__
+    totals = {
+        model.__tablename__: db.session.execute(db.select(db.func.count()).select_from(model)).scalar()
+        for model in COUNTED_MODELS
+    }
+    db.session.execute(table.delete())
+    db.session.execute(table.insert(), [{'name': name, 'total': total} for name, total in totals.items()])
+    db.session.commit()
+    return totals
+
+def entity_counts():
+    """Return the stored totals of every counted table, read from one small table"""
+    totals = dict.fromkeys(COUNTED_TABLES, 0)
+    totals.update(db.session.execute(db.select(EntityCount.name, EntityCount.total)).all())
+    return totals
+
+@event.listens_for(DbSession, 'after_flush')
+def maintain_entity_counts_on_flush(db_session, flush_context):
+    deltas = {}
+    for objects, sign in ((db_session.new, 1), (db_session.deleted, -1)):
+        for obj in objects:
+            if isinstance(obj, COUNTED_MODELS):
+                deltas[obj.__tablename__] = deltas.get(obj.__tablename__, 0) + sign
+    apply_entity_count_deltas(db_session, deltas)
+
+@event.listens_for(DbSession, 'do_orm_execute')
+def maintain_entity_counts_on_bulk_delete(orm_execute_state):
+    if not orm_execute_state.is_delete:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ not in COUNTED_MODELS:
+        return
+    
+    result = orm_execute_state.invoke_statement()
+    apply_entity_count_deltas(orm_execute_state.session, {mapper.class_.__tablename__: -result.rowcount})
+    return result
+
+@app.cli.command('rebuild-counts')
+def rebuild_counts_command():  # pragma: no cover
+    """Recount the totals shown on the admin dashboard."""
+    for name, total in rebuild_entity_counts().items():
+        click.echo(f'{name}: {total}')
+
+# ==================== REPORT JOBS ====================
+
+REPORT_JOB_ACTIVE = ('queued', 'running')
+
+def build_class_pdf(class_id):
+    """Render the attendance PDF of a class; return (content, filename, mimetype)"""
+    class_obj = db.session.get(Class, class_id)
+    if class_obj is None:
+        raise ValueError(f'Class {class_id} no longer exists')
+    enrollments, _ = load_class_roster(class_id)
+    
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+    styles = getSampleStyleSheet()
+    
+    # FIXED: Better heading with course and section info
+    title = Paragraph(f"Attendance Report - {class_obj.course.course_name} (Section {class_obj.section})", styles['Title'])
+    elements.append(title)
+    elements.append(Spacer(1, 0.3*inch))
+    
+    subtitle = Paragraph(f"Course Code: {class_obj.course.course_code} | Faculty: {class_obj.faculty.user.full_name}", styles['Normal'])
+    elements.append(subtitle)
+    elements.append(Spacer(1, 0.3*inch))
+    
+    data = [['Student ID', 'Name', 'Total', 'Present', 'Absent', 'Percentage']]
+    
+    summary = get_attendance_summary(class_id=class_id)
+    
+    for enrollment in enrollments:
+        student = enrollment.student
+        stats = summary.get((student.id, class_id), empty_attendance_summary())
+        
+        data.append([
+            student.student_id,
+            student.user.full_name,
+            str(stats['total']),
+            str(stats['attended']),
+            str(stats['total'] - stats['attended']),
+            f"{stats['percentage']}%"
+        ])
+    
+    table = Table(data)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    
+    elements.append(table)
+    doc.build(elements)
+    
+    filename = f'attendance_report_{class_obj.course.course_code}_Section{class_obj.section}.pdf'
+    return buffer.getvalue(), filename, 'application/pdf'
 
-# ==================== HELPER FUNCTIONS ====================
+# Builders by job kind; each takes the job's params as keyword arguments
+REPORT_JOB_KINDS = {
+    'class_pdf': build_class_pdf
+}
 
-def login_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
-            flash('Please log in to access this page.', 'warning')
-            return redirect(url_for('login'))
-        return f(*args, **kwargs)
-    return decorated_function
+def report_job_dedupe_key(kind, params):
+    return hashlib.sha256(f'{kind}:{json.dumps(params, sort_keys=True)}'.encode()).hexdigest()
 
-def role_required(*roles):
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            if 'user_id' not in session:
-                flash('Please log in to access this page.', 'warning')
-                return redirect(url_for('login'))
-            
-            user = User.query.get(session['user_id'])
-            if user.role not in roles:
-                flash('You do not have permission to access this page.', 'danger')
-                return redirect(url_for('dashboard'))
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
+def enqueue_report_job(kind, params, requested_by=None):
+    """Queue a report job, or return the identical job already queued or running.
 
-def log_audit(action, entity_type=None, entity_id=None, details=None):  # pragma: no cover
+    A partial unique index on dedupe_key guards in-flight jobs, so two
+    processes enqueueing the same request at once still share one job.
+    """
+    key = report_job_dedupe_key(kind, params)
+    in_flight = db.select(ReportJob).where(ReportJob.dedupe_key == key, ReportJob.status.in_(REPORT_JOB_ACTIVE))
+    job = db.session.execute(in_flight).scalar()
+    if job:
+        return job
+    
+    job = ReportJob(kind=kind, params=json.dumps(params, sort_keys=True), dedupe_key=key, requested_by=requested_by)
+    db.session.add(job)
     try:
-        log = AuditLog(
-            user_id=session.get('user_id'),
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            details=details,
-            ip_address=request.remote_addr
-        )
-        db.session.add(log)
         db.session.commit()
-    except:
-        pass
+    except IntegrityError:
+        db.session.rollback()
+        job = db.session.execute(in_flight).scalar()
+        if job is None:
+            raise
+        return job
+    
+    report_worker.notify()
+    return job
 
-def send_email(to_email, subject, body):  # pragma: no cover
+def claim_report_job(worker_name):
+    """Mark the oldest queued job as running for this worker and return it, or None.
+
+    The conditional UPDATE only succeeds for one claimant, so any number of
+    worker threads and processes can share the table.
+    """
+    while True:
+        job_id = db.session.execute(
+            db.select(ReportJob.id).where(ReportJob.status == 'queued').order_by(ReportJob.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            return None
+        claimed = db.session.execute(
+            db.update(ReportJob).where(ReportJob.id == job_id, ReportJob.status == 'queued')
+            .values(status='running', worker=worker_name, started_at=datetime.utcnow(),
+                    attempts=ReportJob.attempts + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(ReportJob, job_id, populate_existing=True)
+
+def run_report_job(job):
+    """Build a claimed job's file and store it, or record why it failed"""
     try:
-        SMTP_SERVER = "smtp.gmail.com"
-        SMTP_PORT = 587
-        SMTP_USERNAME = "your_email@gmail.com"
-        SMTP_PASSWORD = "your_app_password"
-        
-        msg = MIMEMultipart()
-        msg['From'] = SMTP_USERNAME
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'html'))
-        
-        return True
+        content, filename, mimetype = REPORT_JOB_KINDS[job.kind](**json.loads(job.params))
+        job.result, job.filename, job.mimetype, job.status = content, filename, mimetype, 'done'
     except Exception as e:
-        print(f"Email error: {str(e)}")
+        db.session.rollback()
+        app.logger.exception(f'Report job {job.id} failed: {e}')
+        job.status, job.error = 'failed', str(e)
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+def recover_report_jobs(now=None):
+    """Requeue jobs whose worker stopped mid-run and delete expired finished jobs.
+
+    Idle workers call this on every poll, so a read-only EXISTS check comes
+    first and the write statements, which take SQLite's write lock, only run
+    when there is something to recover. Returns whether anything was.
+    """
+    now = now or datetime.utcnow()
+    stale = db.and_(ReportJob.status == 'running',
+                    ReportJob.started_at < now - timedelta(seconds=app.config['REPORT_JOB_TIMEOUT']))
+    expired = db.and_(ReportJob.status.in_(('done', 'failed')),
+                      ReportJob.finished_at < now - timedelta(hours=app.config['REPORT_JOB_RETENTION_HOURS']))
+    
+    if not db.session.execute(db.select(db.exists().where(db.or_(stale, expired)))).scalar():
         return False
+    
+    db.session.execute(db.update(ReportJob).where(stale, ReportJob.attempts >= app.config['REPORT_JOB_MAX_ATTEMPTS'])
+                       .values(status='failed', error='Worker stopped responding', finished_at=now)
+                       .execution_options(synchronize_session=False))
+    db.session.execute(db.update(ReportJob).where(stale).values(status='queued', worker=None)
+                       .execution_options(synchronize_session=False))
+    db.session.execute(db.delete(ReportJob).where(expired).execution_options(synchronize_session=False))
+    db.session.commit()
+    return True
 
-def calculate_attendance_percentage(student_id, class_id=None):
-    query = Attendance.query.join(AttendanceSession).filter(
-        Attendance.student_id == student_id
-    )
+def process_report_jobs(worker_name):
+    """Run queued jobs until none are left and return the number processed"""
+    recover_report_jobs()
+    processed = 0
+    while (job := claim_report_job(worker_name)) is not None:
+        run_report_job(job)
+        processed += 1
+    return processed
+
+class ReportWorker:
+    """Daemon thread that drains the report job table, waking on enqueue or every poll interval"""
     
-    if class_id:
-        query = query.filter(AttendanceSession.class_id == class_id)
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._wake = threading.Event()
     
-    total_sessions = query.count()
-    present_sessions = query.filter(Attendance.status.in_(['present', 'late'])).count()
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name='report-worker', daemon=True)
+                self._thread.start()
     
-    if total_sessions == 0:
-        return 0
+    def notify(self):
+        self._wake.set()
     
-    return round((present_sessions / total_sessions) * 100, 2)
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+    
+    def _run(self):
+        worker_name = f'{os.getpid()}:{threading.current_thread().name}'
+        while not self._stopping.is_set():
+            self._wake.clear()
+            try:
+                with self.app.app_context():
+                    process_report_jobs(worker_name)
+            except Exception as e:
+                self.app.logger.exception(f'Error processing report jobs: {e}')
+            self._wake.wait(self.app.config['REPORT_JOB_POLL_INTERVAL'])
 
-def can_edit_attendance(session_obj):
-    """Check if attendance can be edited for this session"""
-    # If already finalized, cannot edit
-    if session_obj.is_finalized:
-        return False
+report_worker = ReportWorker(app)
+atexit.register(report_worker.stop)
+
+@app.before_request
+def start_report_worker():
+    if app.config['REPORT_WORKER_ENABLED']:
+        report_worker.start()
+
+@app.cli.command('report-worker')
+@click.option('--burst', is_flag=True, help='Exit once the queue is empty.')
+def report_worker_command(burst):  # pragma: no cover
+    """Generate queued reports; run several of these alongside the web server."""
+    worker_name = f'{os.getpid()}:cli'
+    idle = threading.Event()
+    while True:
+        processed = process_report_jobs(worker_name)
+        if processed:
+            click.echo(f'Processed {processed} report jobs')
+        if burst:
+            return
+        idle.wait(app.config['REPORT_JOB_POLL_INTERVAL'])
+
+# ==================== CASCADE DELETE ====================
+# Deletes run as Core table statements with subquery conditions, so removing an
+# object costs a fixed number of statements however many sessions it has. Core
+# statements bypass the ORM listeners, so rollups and the report cache are
+# handled here explicitly.
+
+def _class_cascade_plan(class_ids):
+    attendance = Attendance.__table__
+    rollups = AttendanceRollup.__table__
+    sessions = AttendanceSession.__table__
+    enrollments = Enrollment.__table__
+    meetings = ClassMeeting.__table__
+    classes = Class.__table__
     
-    # Calculate session end datetime
-    session_end = datetime.combine(session_obj.date, session_obj.end_time)
+    session_ids = db.select(sessions.c.id).where(sessions.c.class_id.in_(class_ids))
+    return [
+        (attendance, attendance.c.session_id.in_(session_ids)),
+        (rollups, rollups.c.class_id.in_(class_ids)),
+        (sessions, sessions.c.class_id.in_(class_ids)),
+        (enrollments, enrollments.c.class_id.in_(class_ids)),
+        (meetings, meetings.c.class_id.in_(class_ids)),
+        (classes, classes.c.id.in_(class_ids))
+    ]
+
+def _course_cascade_plan(course_id):
+    classes = Class.__table__
+    courses = Course.__table__
+    class_ids = db.select(classes.c.id).where(classes.c.course_id == course_id)
+    return _class_cascade_plan(class_ids) + [(courses, courses.c.id == course_id)]
+
+def _single_class_cascade_plan(class_id):
+    classes = Class.__table__
+    return _class_cascade_plan(db.select(classes.c.id).where(classes.c.id == class_id))
+
+def _user_cascade_plan(user_id):
+    attendance = Attendance.__table__
+    rollups = AttendanceRollup.__table__
+    enrollments = Enrollment.__table__
+    students = Student.__table__
+    faculty = Faculty.__table__
+    audit_logs = AuditLog.__table__
+    sync_ops = AttendanceSyncOp.__table__
+    report_jobs = ReportJob.__table__
+    users = User.__table__
     
-    # If session hasn't ended yet, can edit
-    if datetime.now() < session_end:
-        return True
+    # Faculty who still teach classes are refused by cascade_delete_blocker
+    student_ids = db.select(students.c.id).where(students.c.user_id == user_id)
+    return [
+        (attendance, attendance.c.student_id.in_(student_ids)),
+        (rollups, rollups.c.student_id.in_(student_ids)),
+        (enrollments, enrollments.c.student_id.in_(student_ids)),
+        (students, students.c.user_id == user_id),
+        (faculty, faculty.c.user_id == user_id),
+        (audit_logs, audit_logs.c.user_id == user_id),
+        (sync_ops, sync_ops.c.user_id == user_id),
+        (report_jobs, report_jobs.c.requested_by == user_id),
+        (user_search_table, user_search_table.c.rowid == user_id),
+        (users, users.c.id == user_id)
+    ]
+
+def _user_detach_plan(user_id):
+    """Columns that record who did something; they are cleared so the history outlives the user"""
+    attendance = Attendance.__table__
+    sessions = AttendanceSession.__table__
+    return [attendance.c.marked_by, sessions.c.created_by, sessions.c.finalized_by]
+
+CASCADE_PLANS = {
+    'course': _course_cascade_plan,
+    'class': _single_class_cascade_plan,
+    'user': _user_cascade_plan
+}
+
+CASCADE_DETACH_PLANS = {
+    'user': _user_detach_plan
+}
+
+def cascade_delete_blocker(kind, object_id):
+    """Return why the object cannot be deleted yet, or None.
+
+    Classes need a faculty member, so a faculty user who still teaches
+    classes is kept until they are reassigned or deleted.
+    """
+    if kind == 'user':
+        teaches = db.session.execute(db.select(
+            db.exists().where(Class.faculty_id == Faculty.id, Faculty.user_id == object_id)
+        )).scalar()
+        if teaches:
+            return 'This faculty member still teaches classes. Reassign or delete them first.'
+    return None
+
+def cascade_delete_size(kind, object_id):
+    """Return the number of rows cascade_delete would remove"""
+    return sum(
+        db.session.execute(db.select(db.func.count()).select_from(table).where(condition)).scalar()
+        for table, condition in CASCADE_PLANS[kind](object_id)
+    )
+
+def cascade_delete(kind, object_id):
+    """Delete a course, class or user with all dependent rows; return rows removed per table"""
+    blocker = cascade_delete_blocker(kind, object_id)
+    if blocker:
+        raise ValueError(blocker)
     
-    # If session has ended, check if within 24 hours
-    hours_passed = (datetime.now() - session_end).total_seconds() / 3600
+    counts = {}
+    try:
+        for column in CASCADE_DETACH_PLANS.get(kind, lambda object_id: [])(object_id):
+            db.session.execute(column.table.update().where(column == object_id).values({column.name: None}))
+        for table, condition in CASCADE_PLANS[kind](object_id):
+            counts[table.name] = db.session.execute(table.delete().where(condition)).rowcount
+        apply_entity_count_deltas(db.session, {name: -rows for name, rows in counts.items()})
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    # Deleting a student removes marks from finalized sessions too
+    report_cache.clear()
+    finalized_session_cache.clear()
+    return counts
+
+def should_delete_in_background(kind, object_id):
+    threshold = app.config.get('CASCADE_DELETE_BACKGROUND_ROWS')
+    return bool(threshold) and cascade_delete_size(kind, object_id) > threshold
+
+def start_cascade_delete_job(kind, object_id):
+    """Run cascade_delete in a daemon thread with its own app context"""
+    def run():
+        with app.app_context():
+            try:
+                counts = cascade_delete(kind, object_id)
+                app.logger.info(f'Background delete of {kind} {object_id} finished: {format_delete_counts(counts)}')
+            except Exception as e:
+                app.logger.exception(f'Background delete of {kind} {object_id} failed: {e}')
     
-    return hours_passed <= 24
+    thread = threading.Thread(target=run, name=f'cascade-delete-{kind}-{object_id}', daemon=True)
+    thread.start()
+    return thread
+
+def format_delete_counts(counts):
+    return ', '.join(f'{rows} {table}' for table, rows in counts.items() if rows) or 'no rows'
 
 # ==================== ROUTES ====================
 
@@ -292,7 +2678,7 @@ def change_password():
         new_password = request.form.get('new_password')
         confirm_password = request.form.get('confirm_password')
         
-        user = User.query.get(session['user_id'])
+        user = get_current_user()
         
         if not check_password_hash(user.password_hash, current_password):
             flash('Current password is incorrect', 'danger')
@@ -312,7 +2698,10 @@ def change_password():
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    user = User.query.get(session['user_id'])
+    user = get_current_user()
+    if not user:
+        session.clear()
+        return redirect(url_for('login'))
     
     if user.role == 'admin':
         return redirect(url_for('admin_dashboard'))
@@ -328,40 +2717,72 @@ def dashboard():
 @app.route('/admin/dashboard')
 @role_required('admin')
 def admin_dashboard():
-    total_students = Student.query.count()
-    total_faculty = Faculty.query.count()
-    total_courses = Course.query.count()
-    total_classes = Class.query.count()
-    
+    totals = entity_counts()
     recent_logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).limit(10).all()
     
     return render_template('admin/dashboard.html',
-                         total_students=total_students,
-                         total_faculty=total_faculty,
-                         total_courses=total_courses,
-                         total_classes=total_classes,
+                         total_students=totals['students'],
+                         total_faculty=totals['faculty'],
+                         total_courses=totals['courses'],
+                         total_classes=totals['classes'],
                          recent_logs=recent_logs)
 
 @app.route('/admin/users')
 @role_required('admin')
 def admin_users():
-    # Group users by role
-    admins = User.query.filter_by(role='admin').all()
-    faculty_users = User.query.filter_by(role='faculty').all()
-    
-    # Group students by section
-    students_by_section = {}
-    students = Student.query.join(User).all()
-    for student in students:
-        key = f"{student.department} - Year {student.year} - Section {student.section}"
-        if key not in students_by_section:
-            students_by_section[key] = []
-        students_by_section[key].append(student)
-    
-    return render_template('admin/users.html', 
+    # Only counts, the first page of each role and the first page of
+    # collapsed student sections are rendered; the rest loads on demand
+    admins, admins_after = user_directory_page('admin')
+    faculty_members, faculty_after = user_directory_page('faculty')
+    sections, sections_after = student_section_page()
+    
+    return render_template('admin/users.html',
+                         counts=user_directory_counts(),
                          admins=admins,
-                         faculty_users=faculty_users,
-                         students_by_section=students_by_section)
+                         admins_after=admins_after,
+                         faculty_members=faculty_members,
+                         faculty_after=faculty_after,
+                         sections=sections,
+                         sections_after=sections_after)
+
+@app.route('/admin/users/rows')
+@role_required('admin')
+def admin_user_rows():
+    """Next page of table rows for one directory group (admins, faculty or a student section)"""
+    group = request.args.get('group')
+    if group not in USER_DIRECTORY_GROUPS:
+        return jsonify({'success': False, 'message': 'Unknown user group'}), 400
+    try:
+        section_key = parse_section_key(request.args) if group == 'student' else None
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid year'}), 400
+    
+    rows, next_after = user_directory_page(group, request.args.get('after') or None, section_key)
+    html = render_template('admin/_user_rows.html', group=group, rows=rows)
+    return jsonify({'success': True, 'html': html, 'next_after': next_after})
+
+@app.route('/admin/users/search')
+@role_required('admin')
+def admin_user_search():
+    """Prefix search over username, full name, email and student ID"""
+    query = (request.args.get('q') or '').strip()
+    limit = min(request.args.get('limit', 20, type=int) or 20, app.config['USER_SEARCH_MAX_RESULTS'])
+    return jsonify({'success': True, 'results': search_users(query, limit)})
+
+@app.route('/admin/users/sections')
+@role_required('admin')
+def admin_user_sections():
+    """Next page of collapsed student section cards"""
+    try:
+        after = json.loads(request.args['after']) if request.args.get('after') else None
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+    if after is not None and (not isinstance(after, list) or len(after) != 3):
+        return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+    
+    sections, next_after = student_section_page(after)
+    html = render_template('admin/_student_sections.html', sections=sections)
+    return jsonify({'success': True, 'html': html, 'next_after': next_after})
 
 @app.route('/admin/users/add', methods=['GET', 'POST'])
 @role_required('admin')
@@ -446,38 +2867,20 @@ def admin_delete_user(user_id):
         
         username = user.username
         
-        # Manual cascade delete for SQLite compatibility
-        # Delete in the correct order to avoid foreign key constraint violations
+        blocker = cascade_delete_blocker('user', user_id)
+        if blocker:
+            flash(blocker, 'danger')
+            return redirect(url_for('admin_users'))
         
-        # Delete student-related records if user is a student
-        if user.role == 'student':
-            student = Student.query.filter_by(user_id=user_id).first()
-            if student:
-                # Delete attendance records first (references student_id)
-                Attendance.query.filter_by(student_id=student.id).delete()
-                
-                # Delete enrollments (references student_id)
-                Enrollment.query.filter_by(student_id=student.id).delete()
-                
-                # Delete student profile
-                db.session.delete(student)
-        
-        # Delete faculty-related records if user is a faculty
-        elif user.role == 'faculty':
-            faculty = Faculty.query.filter_by(user_id=user_id).first()
-            if faculty:
-                # Note: We don't delete classes, just the faculty profile
-                # Classes will need to be reassigned to another faculty manually
-                db.session.delete(faculty)
-        
-        # Delete audit logs for this user (references user_id)
-        AuditLog.query.filter_by(user_id=user_id).delete()
-        
-        # Finally, delete the user
-        db.session.delete(user)
-        db.session.commit()
+        if should_delete_in_background('user', user_id):
+            start_cascade_delete_job('user', user_id)
+            log_audit('Delete User', 'User', user_id, f'Started background deletion of user {username}')
+            flash(f'User {username} is being deleted in the background.', 'info')
+            return redirect(url_for('admin_users'))
+        
+        counts = cascade_delete('user', user_id)
         
-        log_audit('Delete User', 'User', user_id, f'Deleted user {username} and all related records')
+        log_audit('Delete User', 'User', user_id, f'Deleted user {username} ({format_delete_counts(counts)})')
         flash(f'User {username} and all related records deleted successfully.', 'success')
         return redirect(url_for('admin_users'))
     
@@ -545,29 +2948,15 @@ def admin_delete_course(course_id):
         course_code = course.course_code
         course_name = course.course_name
         
-        # Get all classes using this course
-        classes = Class.query.filter_by(course_id=course_id).all()
-        
-        # Delete enrollments for each class
-        for class_obj in classes:
-            Enrollment.query.filter_by(class_id=class_obj.id).delete()
-            
-            # Delete attendance records for sessions in this class
-            sessions = AttendanceSession.query.filter_by(class_id=class_obj.id).all()
-            for session in sessions:
-                Attendance.query.filter_by(session_id=session.id).delete()
-            
-            # Delete attendance sessions
-            AttendanceSession.query.filter_by(class_id=class_obj.id).delete()
-            
-            # Delete the class
-            db.session.delete(class_obj)
+        if should_delete_in_background('course', course_id):
+            start_cascade_delete_job('course', course_id)
+            log_audit('Delete Course', 'Course', course_id, f'Started background deletion of course {course_code}')
+            flash(f'Course {course_code} ({course_name}) is being deleted in the background.', 'info')
+            return redirect(url_for('admin_courses'))
         
-        # Delete the course
-        db.session.delete(course)
-        db.session.commit()
+        counts = cascade_delete('course', course_id)
         
-        log_audit('Delete Course', 'Course', course_id, f'Deleted course {course_code} and all related records')
+        log_audit('Delete Course', 'Course', course_id, f'Deleted course {course_code} ({format_delete_counts(counts)})')
         flash(f'Course {course_code} ({course_name}) and all related classes deleted successfully.', 'success')
         return redirect(url_for('admin_courses'))
     
@@ -583,14 +2972,84 @@ def admin_classes():
     classes = Class.query.all()
     return render_template('admin/classes.html', classes=classes)
 
+@app.route('/admin/classes/import', methods=['GET', 'POST'])
+@role_required('admin')
+def admin_import_classes():
+    result = None
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a timetable CSV file.', 'danger')
+            return render_template('admin/import_classes.html', columns=TIMETABLE_COLUMNS, result=None)
+        
+        try:
+            rows = parse_timetable_csv(io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline=''))
+            result = import_timetable(rows, dry_run=bool(request.form.get('dry_run')))
+        except (ValueError, UnicodeDecodeError) as e:
+            flash(f'Could not read timetable: {str(e)}', 'danger')
+            return render_template('admin/import_classes.html', columns=TIMETABLE_COLUMNS, result=None)
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error importing timetable: {str(e)}', 'danger')
+            return render_template('admin/import_classes.html', columns=TIMETABLE_COLUMNS, result=None)
+        
+        if result['created']:
+            log_audit('Import Timetable', 'Class', None, f"Imported {result['created']} classes from {upload.filename}")
+        category = 'warning' if result['problems'] else 'success'
+        flash(f"{result['valid']} valid rows, {result['created']} classes created, {len(result['problems'])} problems.", category)
+    
+    return render_template('admin/import_classes.html', columns=TIMETABLE_COLUMNS, result=result)
+
+@app.route('/admin/sessions/generate', methods=['GET', 'POST'])
+@role_required('admin')
+def admin_generate_sessions():
+    if request.method == 'POST':
+        try:
+            start_date, end_date, holidays = parse_term_dates(
+                request.form.get('term_start'), request.form.get('term_end'), request.form.get('holidays'))
+            created = generate_term_sessions(start_date, end_date, holidays, created_by=session['user_id'])
+        except ValueError as e:
+            flash(str(e), 'danger')
+            return render_template('admin/generate_sessions.html')
+        
+        total = sum(created.values())
+        log_audit('Generate Sessions', 'AttendanceSession', None,
+                  f'Generated {total} sessions for {len(created)} classes from {start_date} to {end_date}')
+        flash(f'Generated {total} sessions for {len(created)} scheduled classes.', 'success')
+        return redirect(url_for('admin_classes'))
+    
+    return render_template('admin/generate_sessions.html')
+
+@app.route('/admin/classes/<int:class_id>/delete', methods=['POST'])
+@role_required('admin')
+def admin_delete_class(class_id):
+    try:
+        class_obj = Class.query.get_or_404(class_id)
+        label = f'{class_obj.course.course_code} section {class_obj.section}'
+        
+        if should_delete_in_background('class', class_id):
+            start_cascade_delete_job('class', class_id)
+            log_audit('Delete Class', 'Class', class_id, f'Started background deletion of class {label}')
+            flash(f'Class {label} is being deleted in the background.', 'info')
+            return redirect(url_for('admin_classes'))
+        
+        counts = cascade_delete('class', class_id)
+        
+        log_audit('Delete Class', 'Class', class_id, f'Deleted class {label} ({format_delete_counts(counts)})')
+        flash(f'Class {label} and all related records deleted successfully.', 'success')
+        return redirect(url_for('admin_classes'))
+    
+    except Exception as e:
+        db.session.rollback()
+        app.logger.exception(f'Error deleting class {class_id}: {e}')
+        flash(f'Error deleting class: {str(e)}', 'danger')
+        return redirect(url_for('admin_classes'))
+
 @app.route('/admin/classes/add', methods=['GET', 'POST'])
 @role_required('admin')
 def admin_add_class():
     if request.method == 'POST':
         try:
-            import re
-            from datetime import datetime as dt
-            
             course_id = request.form.get('course_id')
             faculty_id = request.form.get('faculty_id')
             section = request.form.get('section', '').strip()
@@ -604,45 +3063,12 @@ def admin_add_class():
                 faculty = Faculty.query.all()
                 return render_template('admin/add_class.html', courses=courses, faculty=faculty)
             
-            # Validate schedule format: MWF 10:00-11:00
-            schedule_pattern = r'^[A-Z]+\s\d{2}:\d{2}-\d{2}:\d{2}$'
-            if not re.match(schedule_pattern, schedule):
-                flash('Schedule must be in format: MWF 10:00-11:00 (Days in UPPERCASE, space, time range with no spaces)', 'danger')
-                courses = Course.query.all()
-                faculty = Faculty.query.all()
-                return render_template('admin/add_class.html', courses=courses, faculty=faculty)
-            
-            # Parse and validate time range (8am-5pm constraint)
+            # Validate schedule (MWF 10:00-11:00 within 8am-5pm) and room (Lab 101 / Room 202)
             try:
-                time_part = schedule.split()[1]
-                start_time_str, end_time_str = time_part.split('-')
-                start_time = dt.strptime(start_time_str, '%H:%M').time()
-                end_time = dt.strptime(end_time_str, '%H:%M').time()
-                
-                min_time = dt.strptime('08:00', '%H:%M').time()
-                max_time = dt.strptime('17:00', '%H:%M').time()
-                
-                if start_time < min_time or end_time > max_time:
-                    flash('Classes must be scheduled between 08:00 and 17:00 (8am-5pm).', 'danger')
-                    courses = Course.query.all()
-                    faculty = Faculty.query.all()
-                    return render_template('admin/add_class.html', courses=courses, faculty=faculty)
-                
-                if start_time >= end_time:
-                    flash('Start time must be before end time.', 'danger')
-                    courses = Course.query.all()
-                    faculty = Faculty.query.all()
-                    return render_template('admin/add_class.html', courses=courses, faculty=faculty)
-            except Exception:
-                flash('Invalid time format in schedule.', 'danger')
-                courses = Course.query.all()
-                faculty = Faculty.query.all()
-                return render_template('admin/add_class.html', courses=courses, faculty=faculty)
-            
-            # Validate room format: Lab 101 or Room 202
-            room_pattern = r'^(Lab|Room)\s\d{3}$'
-            if not re.match(room_pattern, room):
-                flash('Room must be in format: Lab 101 or Room 202 (Lab/Room, space, exactly 3 digits)', 'danger')
+                weekdays, start_minute, end_minute = check_class_schedule(schedule)
+                check_class_room(room)
+            except ValueError as e:
+                flash(str(e), 'danger')
                 courses = Course.query.all()
                 faculty = Faculty.query.all()
                 return render_template('admin/add_class.html', courses=courses, faculty=faculty)
@@ -662,31 +3088,14 @@ def admin_add_class():
                     faculty = Faculty.query.all()
                     return render_template('admin/add_class.html', courses=courses, faculty=faculty)
             
-            # Check for schedule conflicts with existing classes in the same section
-            days_part = schedule.split()[0]
-            existing_classes = Class.query.filter_by(section=section).all()
-            
-            for existing_class in existing_classes:
-                existing_schedule = existing_class.schedule
-                existing_days = existing_schedule.split()[0]
-                existing_time_part = existing_schedule.split()[1]
-                existing_start_str, existing_end_str = existing_time_part.split('-')
-                existing_start = dt.strptime(existing_start_str, '%H:%M').time()
-                existing_end = dt.strptime(existing_end_str, '%H:%M').time()
-                
-                # Check if days overlap
-                days_overlap = any(day in existing_days for day in days_part)
-                
-                if days_overlap:
-                    # Check if times overlap
-                    times_overlap = not (end_time <= existing_start or start_time >= existing_end)
-                    
-                    if times_overlap:
-                        conflicting_course = existing_class.course.course_name
-                        flash(f'Schedule conflict! Section {section} already has {conflicting_course} on {existing_days} at {existing_time_part}. Cannot add overlapping class.', 'danger')
-                        courses = Course.query.all()
-                        faculty = Faculty.query.all()
-                        return render_template('admin/add_class.html', courses=courses, faculty=faculty)
+            # Check the section, room and faculty slot indexes for overlapping meetings
+            conflict = find_schedule_conflict(weekdays, start_minute, end_minute,
+                                              section=section, room=room, faculty_id=faculty_id)
+            if conflict:
+                flash(describe_schedule_conflict(*conflict), 'danger')
+                courses = Course.query.all()
+                faculty = Faculty.query.all()
+                return render_template('admin/add_class.html', courses=courses, faculty=faculty)
             
             class_obj = Class(
                 course_id=course_id,
@@ -718,50 +3127,8 @@ def admin_reports():
 @app.route('/admin/reports/attendance')
 @role_required('admin')
 def admin_attendance_report():
-    course_id = request.args.get('course_id', type=int)
-    department = request.args.get('department')
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    
-    query = db.session.query(
-        Student.student_id,
-        User.full_name,
-        Student.department,
-        Student.section,
-        Course.course_name,
-        db.func.count(Attendance.id).label('total_sessions'),
-        db.func.sum(db.case((Attendance.status.in_(['present', 'late']), 1), else_=0)).label('present_count')
-    ).join(User, Student.user_id == User.id)\
-     .join(Enrollment, Enrollment.student_id == Student.id)\
-     .join(Class, Class.id == Enrollment.class_id)\
-     .join(Course, Course.id == Class.course_id)\
-     .join(AttendanceSession, AttendanceSession.class_id == Class.id)\
-     .join(Attendance, Attendance.session_id == AttendanceSession.id)
-    
-    if course_id:
-        query = query.filter(Course.id == course_id)
-    if department:
-        query = query.filter(Student.department == department)
-    if start_date:
-        query = query.filter(AttendanceSession.date >= start_date)
-    if end_date:
-        query = query.filter(AttendanceSession.date <= end_date)
-    
-    results = query.group_by(Student.id, Course.id).all()
-    
-    report_data = []
-    for row in results:
-        percentage = round((row.present_count / row.total_sessions * 100), 2) if row.total_sessions > 0 else 0
-        report_data.append({
-            'student_id': row.student_id,
-            'name': row.full_name,
-            'department': row.department,
-            'section': row.section,
-            'course': row.course_name,
-            'total_sessions': row.total_sessions,
-            'present': row.present_count,
-            'percentage': percentage
-        })
+    filters = normalize_report_filters(request.args)
+    report_data = get_attendance_report(filters)
     
     courses = Course.query.all()
     departments = db.session.query(Student.department).distinct().all()
@@ -774,66 +3141,27 @@ def admin_attendance_report():
 @app.route('/admin/reports/attendance/download')
 @role_required('admin')
 def admin_download_report():
-    course_id = request.args.get('course_id', type=int)
-    department = request.args.get('department')
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    
-    query = db.session.query(
-        Student.student_id,
-        User.full_name,
-        Student.department,
-        Student.section,
-        Course.course_name,
-        db.func.count(Attendance.id).label('total_sessions'),
-        db.func.sum(db.case((Attendance.status.in_(['present', 'late']), 1), else_=0)).label('present_count')
-    ).join(User, Student.user_id == User.id)\
-     .join(Enrollment, Enrollment.student_id == Student.id)\
-     .join(Class, Class.id == Enrollment.class_id)\
-     .join(Course, Course.id == Class.course_id)\
-     .join(AttendanceSession, AttendanceSession.class_id == Class.id)\
-     .join(Attendance, Attendance.session_id == AttendanceSession.id)
-    
-    if course_id:
-        query = query.filter(Course.id == course_id)
-    if department:
-        query = query.filter(Student.department == department)
-    if start_date:
-        query = query.filter(AttendanceSession.date >= start_date)
-    if end_date:
-        query = query.filter(AttendanceSession.date <= end_date)
-    
-    results = query.group_by(Student.id, Course.id).all()
-    
-    # Create CSV
-    si = StringIO()
-    writer = csv.writer(si)
-    writer.writerow(['Student ID', 'Name', 'Department', 'Section', 'Course', 'Total Sessions', 'Present', 'Percentage'])
-    
-    for row in results:
-        percentage = round((row.present_count / row.total_sessions * 100), 2) if row.total_sessions > 0 else 0
-        writer.writerow([
-            row.student_id,
-            row.full_name,
-            row.department,
-            row.section,
-            row.course_name,
-            row.total_sessions,
-            row.present_count,
-            f"{percentage}%"
-        ])
+    filters = normalize_report_filters(request.args)
     
-    output = BytesIO()
-    output.write(si.getvalue().encode())
-    output.seek(0)
+    def report_rows():
+        for row in iter_attendance_report(filters):
+            yield [
+                row['student_id'],
+                row['name'],
+                row['department'],
+                row['section'],
+                row['course'],
+                row['total_sessions'],
+                row['present'],
+                f"{row['percentage']}%"
+            ]
     
     filename = f'attendance_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
     
-    return send_file(
-        output,
-        mimetype='text/csv',
-        as_attachment=True,
-        download_name=filename
+    return stream_csv_response(
+        ['Student ID', 'Name', 'Department', 'Section', 'Course', 'Total Sessions', 'Present', 'Percentage'],
+        report_rows(),
+        filename
     )
 
 # ==================== FACULTY ROUTES ====================
@@ -877,7 +3205,7 @@ def faculty_class_detail(class_id):
         flash('You do not have access to this class.', 'danger')
         return redirect(url_for('faculty_classes'))
     
-    enrollments = Enrollment.query.filter_by(class_id=class_id).all()
+    enrollments, _ = load_class_roster(class_id)
     sessions = AttendanceSession.query.filter_by(class_id=class_id)\
                                      .order_by(AttendanceSession.date.desc()).all()
     
@@ -908,7 +3236,12 @@ def faculty_create_session():
                     return redirect(url_for('login'))
                 my_classes = Class.query.filter_by(faculty_id=faculty.id).all()
                 return render_template('faculty/create_session.html', classes=my_classes)
-            
+
+            existing_session = AttendanceSession.query.filter_by(class_id=class_id, date=session_date).first()
+            if existing_session:
+                flash('A session already exists for this class on that date.', 'warning')
+                return redirect(url_for('faculty_mark_attendance_page', session_id=existing_session.id))
+
             session_obj = AttendanceSession(
                 class_id=class_id,
                 date=session_date,
@@ -930,10 +3263,79 @@ def faculty_create_session():
             flash(f'Error creating session: {str(e)}', 'danger')
     
     faculty = get_current_faculty()
-    if not faculty:
-        return redirect(url_for('login'))
-    my_classes = Class.query.filter_by(faculty_id=faculty.id).all()
-    return render_template('faculty/create_session.html', classes=my_classes)
+    if not faculty:
+        return redirect(url_for('login'))
+    my_classes = Class.query.filter_by(faculty_id=faculty.id).all()
+    return render_template('faculty/create_session.html', classes=my_classes)
+
+@app.route('/faculty/sessions/generate', methods=['POST'])
+@role_required('faculty')
+def faculty_generate_sessions():
+    faculty = get_current_faculty()
+    if not faculty:
+        return redirect(url_for('login'))
+    
+    class_obj = Class.query.get_or_404(request.form.get('class_id', type=int))
+    if class_obj.faculty_id != faculty.id:
+        flash('Access denied.', 'danger')
+        return redirect(url_for('faculty_dashboard'))
+    
+    try:
+        start_date, end_date, holidays = parse_term_dates(
+            request.form.get('term_start'), request.form.get('term_end'), request.form.get('holidays'))
+        created = generate_term_sessions(start_date, end_date, holidays,
+                                         class_ids=[class_obj.id], created_by=session['user_id'])
+    except ValueError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('faculty_create_session'))
+    
+    if class_obj.id not in created:
+        flash('This class has no schedule to generate sessions from.', 'warning')
+        return redirect(url_for('faculty_create_session'))
+    
+    log_audit('Generate Sessions', 'Class', class_obj.id,
+              f'Generated {created[class_obj.id]} sessions from {start_date} to {end_date}')
+    flash(f'Generated {created[class_obj.id]} sessions for the term.', 'success')
+    return redirect(url_for('faculty_class_detail', class_id=class_obj.id))
+
+def _checkin_session_or_error(session_id):
+    """Return (session_obj, None) if the current faculty can show its QR code, else (None, response)"""
+    session_obj = AttendanceSession.query.get_or_404(session_id)
+    faculty = get_current_faculty()
+    if not faculty or session_obj.class_ref.faculty_id != faculty.id:
+        return None, (jsonify({'success': False, 'message': 'Unauthorized access to this session'}), 403)
+    if not can_edit_attendance(session_obj):
+        return None, (jsonify({'success': False, 'message': 'This session is closed for check-in.'}), 400)
+    return session_obj, None
+
+@app.route('/faculty/session/<int:session_id>/qr')
+@role_required('faculty')
+def faculty_session_qr(session_id):
+    session_obj, error = _checkin_session_or_error(session_id)
+    if error:
+        flash(error[0].get_json()['message'], 'danger')
+        return redirect(url_for('faculty_dashboard'))
+    
+    return render_template('faculty/session_qr.html', session_obj=session_obj,
+                           ttl=app.config['QR_TOKEN_TTL'])
+
+@app.route('/faculty/session/<int:session_id>/qr/token')
+@role_required('faculty')
+def faculty_session_qr_token(session_id):
+    session_obj, error = _checkin_session_or_error(session_id)
+    if error:
+        return error
+    
+    window = current_qr_window()
+    ttl = app.config['QR_TOKEN_TTL']
+    url = url_for('student_checkin', token=make_checkin_token(session_obj, window), _external=True)
+    return jsonify({
+        'success': True,
+        'url': url,
+        'image': checkin_qr_data_uri(url),
+        'refresh_in': max(1, int((window + 1) * ttl - datetime.now().timestamp())),
+        'checked_in': Attendance.query.filter_by(session_id=session_id, method='qr').count()
+    })
 
 @app.route('/faculty/session/<int:session_id>/mark')
 @role_required('faculty')
@@ -947,12 +3349,7 @@ def faculty_mark_attendance_page(session_id):
         flash('You do not have access to this session.', 'danger')
         return redirect(url_for('faculty_classes'))
     
-    enrollments = Enrollment.query.filter_by(class_id=session_obj.class_id).all()
-    
-    attendance_records = {
-        record.student_id: record 
-        for record in Attendance.query.filter_by(session_id=session_id).all()
-    }
+    enrollments, attendance_records = load_class_roster(session_obj.class_id, session_id)
     
     # Check if editing is allowed
     can_edit = can_edit_attendance(session_obj)
@@ -968,22 +3365,28 @@ def faculty_mark_attendance_page(session_id):
 def faculty_session_detail(session_id):
     session_obj = AttendanceSession.query.get_or_404(session_id)
     
-    faculty = Faculty.query.filter_by(user_id=session['user_id']).first()
+    faculty = get_current_faculty()
+    if not faculty:
+        return redirect(url_for('login'))
     if session_obj.class_ref.faculty_id != faculty.id:
         flash('You do not have access to this session.', 'danger')
         return redirect(url_for('faculty_classes'))
     
-    enrollments = Enrollment.query.filter_by(class_id=session_obj.class_id).all()
-    
-    attendance_records = {
-        record.student_id: record 
-        for record in Attendance.query.filter_by(session_id=session_id).all()
-    }
+    # A finalized session's marks come from the cache; the roster and names
+    # can still change, so they are loaded on every request
+    if session_obj.is_finalized:
+        enrollments = load_class_roster(session_obj.class_id)[0]
+        attendance_records = finalized_session_cache.marks([session_obj])[session_obj.id]
+    else:
+        enrollments, attendance_records = load_class_roster(session_obj.class_id, session_id)
     
+    rows_html = Markup(render_template('faculty/_session_rows.html',
+                                       enrollments=enrollments,
+                                       attendance_records=attendance_records))
     return render_template('faculty/session_detail.html',
                          session_obj=session_obj,
-                         enrollments=enrollments,
-                         attendance_records=attendance_records)
+                         rows_html=rows_html,
+                         student_count=len(enrollments))
 
 @app.route('/faculty/attendance/mark', methods=['POST'])
 @role_required('faculty')
@@ -992,6 +3395,7 @@ def faculty_mark_attendance():
         session_id = request.form.get('session_id')
         student_id = request.form.get('student_id')
         status = request.form.get('status')
+        expected_version = parse_expected_version(request.form.get('version'))
         
         # Get session and check permissions
         session_obj = AttendanceSession.query.get_or_404(session_id)
@@ -1002,10 +3406,10 @@ def faculty_mark_attendance():
         if not session_obj or session_obj.class_ref.faculty_id != faculty.id:
             return jsonify({'success': False, 'message': 'Unauthorized access to this session'}), 403
         
-        # Check 24-hour edit window (only if session has ended)
-        session_end_datetime = datetime.combine(session_obj.date, session_obj.end_time)
-        time_since_end = datetime.now() - session_end_datetime
-        if time_since_end > timedelta(hours=0) and time_since_end > timedelta(hours=24):
+        if session_obj.is_finalized:
+            return jsonify({'success': False, 'message': 'This session has been finalized and cannot be edited'}), 400
+        
+        if datetime.now() > attendance_edit_deadline(session_obj):
             return jsonify({'success': False, 'message': 'Edit window expired. You can only edit attendance within 24 hours of class end time.'}), 400
         
         existing = Attendance.query.filter_by(
@@ -1013,12 +3417,15 @@ def faculty_mark_attendance():
             student_id=student_id
         ).first()
         
+        if expected_version is not None and expected_version != (existing.version if existing else 0):
+            return attendance_conflict_response(session_id, student_id)
+        
         if existing:
             existing.status = status
             existing.marked_at = datetime.utcnow()
             existing.marked_by = session['user_id']
             existing.method = 'manual'
-            attendance_id = existing.id
+            attendance = existing
         else:
             attendance = Attendance(
                 session_id=session_id,
@@ -1028,15 +3435,26 @@ def faculty_mark_attendance():
                 method='manual'
             )
             db.session.add(attendance)
-            db.session.flush()  # Get the ID before commit
-            attendance_id = attendance.id
         
+        # The UPDATE only matches the version read above, and the unique index
+        # stops a second insert, so a concurrent edit surfaces here as a conflict
+        try:
+            db.session.flush()
+        except StaleDataError:
+            return attendance_conflict_response(session_id, student_id)
+        except IntegrityError:
+            db.session.rollback()
+            if not Attendance.query.filter_by(session_id=session_id, student_id=student_id).count():
+                raise  # Bad input rather than a concurrent insert
+            return attendance_conflict_response(session_id, student_id)
+        attendance_id, version = attendance.id, attendance.version
         db.session.commit()
         
         log_audit('Mark Attendance', 'Attendance', attendance_id, 
                  f'Marked {status} for student {student_id} in session {session_id}')
         
-        return jsonify({'success': True, 'message': 'Attendance marked successfully', 'attendance_id': attendance_id})
+        return jsonify({'success': True, 'message': 'Attendance marked successfully',
+                        'attendance_id': attendance_id, 'version': version})
     
     except Exception as e:
         db.session.rollback()
@@ -1063,31 +3481,22 @@ def faculty_class_report(class_id):
         flash('You do not have access to this class.', 'danger')
         return redirect(url_for('faculty_classes'))
     
-    enrollments = Enrollment.query.filter_by(class_id=class_id).all()
+    enrollments, _ = load_class_roster(class_id)
+    
+    summary = get_attendance_summary(class_id=class_id)
     
     report_data = []
     for enrollment in enrollments:
         student = enrollment.student
-        percentage = calculate_attendance_percentage(student.id, class_id)
-        
-        total = Attendance.query.join(AttendanceSession).filter(
-            AttendanceSession.class_id == class_id,
-            Attendance.student_id == student.id
-        ).count()
-        
-        present = Attendance.query.join(AttendanceSession).filter(
-            AttendanceSession.class_id == class_id,
-            Attendance.student_id == student.id,
-            Attendance.status.in_(['present', 'late'])
-        ).count()
+        stats = summary.get((student.id, class_id), empty_attendance_summary())
         
         report_data.append({
             'student_id': student.student_id,
             'name': student.user.full_name,
-            'total': total,
-            'present': present,
-            'absent': total - present,
-            'percentage': percentage
+            'total': stats['total'],
+            'present': stats['attended'],
+            'absent': stats['total'] - stats['attended'],
+            'percentage': stats['percentage']
         })
     
     return render_template('faculty/class_report.html',
@@ -1107,45 +3516,30 @@ def faculty_export_csv(class_id):
         flash('You do not have access to this class.', 'danger')
         return redirect(url_for('faculty_classes'))
     
-    enrollments = Enrollment.query.filter_by(class_id=class_id).all()
+    summary = get_attendance_summary(class_id=class_id)
     
-    si = StringIO()
-    writer = csv.writer(si)
-    writer.writerow(['Student ID', 'Name', 'Total Sessions', 'Present', 'Absent', 'Percentage'])
-    
-    for enrollment in enrollments:
-        student = enrollment.student
-        percentage = calculate_attendance_percentage(student.id, class_id)
-        
-        total = Attendance.query.join(AttendanceSession).filter(
-            AttendanceSession.class_id == class_id,
-            Attendance.student_id == student.id
-        ).count()
+    def report_rows():
+        roster = db.session.query(Student.id, Student.student_id, User.full_name)\
+            .join(Enrollment, Enrollment.student_id == Student.id)\
+            .join(User, Student.user_id == User.id)\
+            .filter(Enrollment.class_id == class_id)\
+            .order_by(Enrollment.id)
         
-        present = Attendance.query.join(AttendanceSession).filter(
-            AttendanceSession.class_id == class_id,
-            Attendance.student_id == student.id,
-            Attendance.status.in_(['present', 'late'])
-        ).count()
-        
-        writer.writerow([
-            student.student_id,
-            student.user.full_name,
-            total,
-            present,
-            total - present,
-            f"{percentage}%"
-        ])
-    
-    output = BytesIO()
-    output.write(si.getvalue().encode())
-    output.seek(0)
+        for student_pk, student_number, full_name in roster.yield_per(1000):
+            stats = summary.get((student_pk, class_id), empty_attendance_summary())
+            yield [
+                student_number,
+                full_name,
+                stats['total'],
+                stats['attended'],
+                stats['total'] - stats['attended'],
+                f"{stats['percentage']}%"
+            ]
     
-    return send_file(
-        output,
-        mimetype='text/csv',
-        as_attachment=True,
-        download_name=f'attendance_report_{class_obj.course.course_code}.csv'
+    return stream_csv_response(
+        ['Student ID', 'Name', 'Total Sessions', 'Present', 'Absent', 'Percentage'],
+        report_rows(),
+        f'attendance_report_{class_obj.course.course_code}.csv'
     )
 
 @app.route('/faculty/export/pdf/<int:class_id>')
@@ -1160,74 +3554,43 @@ def faculty_export_pdf(class_id):
         flash('You do not have access to this class.', 'danger')
         return redirect(url_for('faculty_classes'))
     
-    enrollments = Enrollment.query.filter_by(class_id=class_id).all()
-    
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # FIXED: Better heading with course and section info
-    title = Paragraph(f"Attendance Report - {class_obj.course.course_name} (Section {class_obj.section})", styles['Title'])
-    elements.append(title)
-    elements.append(Spacer(1, 0.3*inch))
-    
-    subtitle = Paragraph(f"Course Code: {class_obj.course.course_code} | Faculty: {class_obj.faculty.user.full_name}", styles['Normal'])
-    elements.append(subtitle)
-    elements.append(Spacer(1, 0.3*inch))
-    
-    data = [['Student ID', 'Name', 'Total', 'Present', 'Absent', 'Percentage']]
-    
-    for enrollment in enrollments:
-        student = enrollment.student
-        percentage = calculate_attendance_percentage(student.id, class_id)
-        
-        total = Attendance.query.join(AttendanceSession).filter(
-            AttendanceSession.class_id == class_id,
-            Attendance.student_id == student.id
-        ).count()
-        
-        present = Attendance.query.join(AttendanceSession).filter(
-            AttendanceSession.class_id == class_id,
-            Attendance.student_id == student.id,
-            Attendance.status.in_(['present', 'late'])
-        ).count()
-        
-        data.append([
-            student.student_id,
-            student.user.full_name,
-            str(total),
-            str(present),
-            str(total - present),
-            f"{percentage}%"
-        ])
-    
-    table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    elements.append(table)
-    doc.build(elements)
-    
-    buffer.seek(0)
-    return send_file(
-        buffer,
-        mimetype='application/pdf',
-        as_attachment=True,
-        download_name=f'attendance_report_{class_obj.course.course_code}_Section{class_obj.section}.pdf'
-    )
+    # The PDF is built by a report worker; the page polls until it is ready
+    job = enqueue_report_job('class_pdf', {'class_id': class_id}, session['user_id'])
+    return render_template('faculty/report_job.html', class_obj=class_obj, job=job)
+
+def get_faculty_report_job(job_id):
+    """Return a report job the current faculty member may see, or abort with 404"""
+    job = db.session.get(ReportJob, job_id)
+    faculty = load_current_identity()['faculty']
+    if job is None or faculty is None:
+        abort(404)
+    class_obj = db.session.get(Class, json.loads(job.params).get('class_id'))
+    if class_obj is None or class_obj.faculty_id != faculty.id:
+        abort(404)
+    return job
+
+@app.route('/faculty/reports/jobs/<int:job_id>')
+@role_required('faculty')
+def faculty_report_job_status(job_id):
+    job = get_faculty_report_job(job_id)
+    return jsonify({
+        'id': job.id,
+        'status': job.status,
+        'error': job.error,
+        'download_url': url_for('faculty_report_job_download', job_id=job.id) if job.status == 'done' else None
+    })
+
+@app.route('/faculty/reports/jobs/<int:job_id>/download')
+@role_required('faculty')
+def faculty_report_job_download(job_id):
+    job = get_faculty_report_job(job_id)
+    if job.status != 'done':
+        return jsonify({'success': False, 'status': job.status, 'message': 'Report is not ready yet.'}), 409
+    return send_file(BytesIO(job.result), mimetype=job.mimetype, as_attachment=True, download_name=job.filename)
 
 # Helper getters to ensure profile records exist for the logged-in user
 def get_current_faculty():
-    faculty = Faculty.query.filter_by(user_id=session.get('user_id')).first()
+    faculty = load_current_identity()['faculty']
     if not faculty:
         session.clear()
         flash('Faculty profile not found. Please contact admin.', 'danger')
@@ -1236,7 +3599,7 @@ def get_current_faculty():
 
 
 def get_current_student():
-    student = Student.query.filter_by(user_id=session.get('user_id')).first()
+    student = load_current_identity()['student']
     if not student:
         session.clear()
         flash('Student profile not found. Please contact admin.', 'danger')
@@ -1246,34 +3609,119 @@ def get_current_student():
 
 # ==================== STUDENT ROUTES ====================
 
+@app.route('/student/checkin', methods=['GET', 'POST'])
+@role_required('student')
+def student_checkin():
+    token = request.values.get('token', '')
+    try:
+        session_id, class_id, session_date = verify_checkin_token(token)
+    except ValueError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('student_dashboard'))
+    
+    if request.method == 'GET':
+        return render_template('student/checkin.html', token=token, session_date=session_date,
+                               class_obj=db.session.get(Class, class_id))
+    
+    student = get_current_student()
+    if not student:
+        return redirect(url_for('login'))
+    
+    state = checkin_queue.submit(session_id, class_id, session_date, student.id)
+    if state == CHECKIN_COMMITTED:
+        flash('Checked in. You are marked present.', 'success')
+    elif state == CHECKIN_PENDING:
+        flash('Check-in received. It will appear in your attendance in a moment.', 'success')
+    elif state == CHECKIN_ALREADY_MARKED:
+        flash('You are already checked in for this session.', 'warning')
+    else:
+        flash(explain_failed_checkin(session_id, class_id, student.id), 'warning')
+    return redirect(url_for('student_dashboard'))
+
+@app.route('/api/checkin', methods=['POST'])
+@role_required('student')
+def api_checkin():
+    data = request.get_json(silent=True) or {}
+    try:
+        session_id, class_id, session_date = verify_checkin_token(data.get('token'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    student = get_current_student()
+    if not student:
+        return jsonify({'success': False, 'message': 'Student profile not found'}), 403
+    
+    state = checkin_queue.submit(session_id, class_id, session_date, student.id)
+    return jsonify({
+        'success': state != CHECKIN_REJECTED,
+        'state': state,
+        'status_url': url_for('api_checkin_status', session_id=session_id)
+    }), 202 if state == CHECKIN_PENDING else 200
+
+@app.route('/api/checkin/<int:session_id>/status')
+@role_required('student')
+def api_checkin_status(session_id):
+    student = get_current_student()
+    if not student:
+        return jsonify({'success': False, 'message': 'Student profile not found'}), 403
+    
+    return jsonify({'success': True, 'session_id': session_id,
+                    'state': checkin_queue.state(session_id, student.id)})
+
+@app.route('/api/devices/events', methods=['POST'])
+def api_device_events():
+    device = authenticate_device(request.headers.get('X-Device-Key'))
+    if device is None:
+        return jsonify({'success': False, 'message': 'Unknown or inactive device key'}), 401
+    
+    if request.mimetype == 'application/x-ndjson':
+        # Stream line by line so large re-sends never sit in memory whole
+        events = iter_ndjson(request.stream)
+    else:
+        # JSON bodies are parsed whole, so only small ones are accepted
+        if request.content_length is None or request.content_length > app.config['DEVICE_JSON_MAX_BYTES']:
+            return jsonify({'success': False,
+                            'message': 'JSON bodies are limited in size; send large buffers as NDJSON'}), 413
+        events = (request.get_json(silent=True) or {}).get('events')
+        if not isinstance(events, list):
+            return jsonify({'success': False, 'message': 'Expected {"events": [...]} or NDJSON'}), 400
+    
+    ingestor = DeviceEventIngestor(allowed_readers={device.reader_id})
+    try:
+        ingestor.ingest(events)
+    except ValueError as e:
+        # Batches before the bad line are already committed; report them so the
+        # reader can re-send from there (re-sent events are recorded only once)
+        db.session.rollback()
+        device.last_seen_at = datetime.utcnow()
+        db.session.commit()
+        return jsonify({'success': False, 'message': str(e), 'partial': True, 'results': ingestor.counts}), 400
+    
+    device.last_seen_at = datetime.utcnow()
+    db.session.commit()
+    return jsonify({'success': True, 'results': ingestor.counts})
+
 @app.route('/student/dashboard')
 @role_required('student')
 def student_dashboard():
-    student = Student.query.filter_by(user_id=session['user_id']).first()
+    student = get_current_student()
+    if not student:
+        return redirect(url_for('login'))
     
     enrollments = Enrollment.query.filter_by(student_id=student.id).all()
     
+    summary = get_attendance_summary(student_id=student.id)
+    
     attendance_summary = []
     for enrollment in enrollments:
         class_obj = enrollment.class_ref
-        percentage = calculate_attendance_percentage(student.id, class_obj.id)
-        
-        total = Attendance.query.join(AttendanceSession).filter(
-            AttendanceSession.class_id == class_obj.id,
-            Attendance.student_id == student.id
-        ).count()
-        
-        present = Attendance.query.join(AttendanceSession).filter(
-            AttendanceSession.class_id == class_obj.id,
-            Attendance.student_id == student.id,
-            Attendance.status.in_(['present', 'late'])
-        ).count()
+        stats = summary.get((student.id, class_obj.id), empty_attendance_summary())
         
         attendance_summary.append({
             'class': class_obj,
-            'total': total,
-            'present': present,
-            'percentage': percentage
+            'total': stats['total'],
+            'present': stats['attended'],
+            'percentage': stats['percentage']
         })
     
     return render_template('student/dashboard.html',
@@ -1283,7 +3731,9 @@ def student_dashboard():
 @app.route('/student/attendance')
 @role_required('student')
 def student_attendance():
-    student = Student.query.filter_by(user_id=session['user_id']).first()
+    student = get_current_student()
+    if not student:
+        return redirect(url_for('login'))
     enrollments = Enrollment.query.filter_by(student_id=student.id).all()
     
     return render_template('student/attendance.html',
@@ -1293,7 +3743,9 @@ def student_attendance():
 @app.route('/student/attendance/<int:class_id>')
 @role_required('student')
 def student_class_attendance(class_id):
-    student = Student.query.filter_by(user_id=session['user_id']).first()
+    student = get_current_student()
+    if not student:
+        return redirect(url_for('login'))
     class_obj = Class.query.get_or_404(class_id)
     
     enrollment = Enrollment.query.filter_by(student_id=student.id, class_id=class_id).first()
@@ -1301,14 +3753,23 @@ def student_class_attendance(class_id):
         flash('You are not enrolled in this class.', 'danger')
         return redirect(url_for('student_attendance'))
     
-    records = db.session.query(AttendanceSession, Attendance)\
-        .outerjoin(Attendance, db.and_(
-            Attendance.session_id == AttendanceSession.id,
-            Attendance.student_id == student.id
-        ))\
-        .filter(AttendanceSession.class_id == class_id)\
+    sessions = AttendanceSession.query.filter_by(class_id=class_id)\
         .order_by(AttendanceSession.date.desc()).all()
     
+    # Finalized sessions come from the cache; only the open tail is queried
+    finalized_marks = finalized_session_cache.marks([s for s in sessions if s.is_finalized])
+    open_ids = [s.id for s in sessions if not s.is_finalized]
+    open_marks = {
+        record.session_id: record
+        for record in Attendance.query.filter(Attendance.session_id.in_(open_ids),
+                                              Attendance.student_id == student.id)
+    } if open_ids else {}
+    
+    records = [
+        (s, finalized_marks[s.id].get(student.id) if s.is_finalized else open_marks.get(s.id))
+        for s in sessions
+    ]
+    
     percentage = calculate_attendance_percentage(student.id, class_id)
     
     return render_template('student/class_attendance.html',
@@ -1326,11 +3787,15 @@ def api_update_attendance():
         data = request.get_json()
         attendance_id = data.get('attendance_id')
         new_status = data.get('status')
+        expected_version = parse_expected_version(data.get('version'))
         
         attendance = Attendance.query.get_or_404(attendance_id)
+        mark_key = (attendance.session_id, attendance.student_id)
         
         # Verify faculty has access to this attendance record
-        faculty = Faculty.query.filter_by(user_id=session['user_id']).first()
+        faculty = get_current_faculty()
+        if not faculty:
+            return jsonify({'success': False, 'message': 'Faculty profile not found'}), 403
         session_obj = AttendanceSession.query.get(attendance.session_id)
         
         if session_obj.class_ref.faculty_id != faculty.id:
@@ -1340,23 +3805,145 @@ def api_update_attendance():
         if session_obj.is_finalized:
             return jsonify({'success': False, 'message': 'This session has been finalized and cannot be edited'}), 403
         
-        # Check 24-hour edit window (only if session has ended)
-        session_end_datetime = datetime.combine(session_obj.date, session_obj.end_time)
-        time_since_end = datetime.now() - session_end_datetime
-        if time_since_end > timedelta(hours=0) and time_since_end > timedelta(hours=24):
+        if datetime.now() > attendance_edit_deadline(session_obj):
             return jsonify({'success': False, 'message': 'Edit window expired. You can only edit attendance within 24 hours of class end time.'}), 403
         
-        # Update the attendance
+        if expected_version is not None and expected_version != attendance.version:
+            return attendance_conflict_response(*mark_key)
+        
+        # Update the attendance; the UPDATE only matches the version read above
         attendance.status = new_status
         attendance.marked_at = datetime.utcnow()
         attendance.marked_by = session['user_id']
+        try:
+            db.session.flush()
+        except StaleDataError:
+            return attendance_conflict_response(*mark_key)
+        version = attendance.version
         db.session.commit()
         
         log_audit('Update Attendance', 'Attendance', attendance_id, 
                  f'Updated attendance status to {new_status}')
         
-        return jsonify({'success': True, 'message': 'Attendance updated successfully'})
+        return jsonify({'success': True, 'message': 'Attendance updated successfully', 'version': version})
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+@app.route('/api/attendance/sync', methods=['POST'])
+@role_required('faculty')
+def api_sync_attendance():
+    """API endpoint for the marking page to replay its offline outbox of status changes"""
+    changes = (request.get_json(silent=True) or {}).get('changes')
+    if not isinstance(changes, list):
+        return jsonify({'success': False, 'message': 'Expected {"changes": [...]}'}), 400
+    
+    faculty = get_current_faculty()
+    if not faculty:
+        return jsonify({'success': False, 'message': 'Faculty profile not found'}), 403
     
+    try:
+        results, current = apply_sync_changes(faculty, session['user_id'], changes)
+    except (IntegrityError, StaleDataError):
+        # Another request changed the same mark first; nothing was saved, so retrying is safe
+        db.session.rollback()
+        return jsonify({'success': False, 'message': 'Conflicting concurrent write, please retry'}), 409
+    
+    applied = list(results.values()).count('applied')
+    if applied:
+        log_audit('Sync Attendance', 'Attendance', None, f'Applied {applied} of {len(results)} offline changes')
+    return jsonify({'success': True, 'results': results, 'current': current})
+
+@app.route('/api/attendance/bulk', methods=['POST'])
+@role_required('faculty')
+def api_bulk_mark_attendance():
+    """API endpoint for faculty to mark a whole session roster in one request"""
+    try:
+        data = request.get_json() or {}
+        session_id = data.get('session_id')
+        records = data.get('records') or []
+
+        session_obj = AttendanceSession.query.get_or_404(session_id)
+
+        faculty = get_current_faculty()
+        if not faculty:
+            return jsonify({'success': False, 'message': 'Faculty profile not found'}), 403
+
+        if session_obj.class_ref.faculty_id != faculty.id:
+            return jsonify({'success': False, 'message': 'Unauthorized access to this session'}), 403
+
+        if not can_edit_attendance(session_obj):
+            return jsonify({'success': False, 'message': 'This session is finalized or its 24-hour edit window has expired'}), 400
+
+        if not records:
+            return jsonify({'success': False, 'message': 'No attendance records supplied'}), 400
+
+        # Last status wins if a student appears twice in the payload
+        statuses = {}
+        for record in records:
+            status = record.get('status')
+            if status not in ATTENDANCE_STATUSES:
+                return jsonify({'success': False, 'message': f'Invalid status: {status}'}), 400
+            statuses[int(record.get('student_id'))] = status
+
+        enrolled = {
+            row.student_id for row in db.session.query(Enrollment.student_id)
+            .filter(Enrollment.class_id == session_obj.class_id).all()
+        }
+        not_enrolled = sorted(set(statuses) - enrolled)
+        if not_enrolled:
+            return jsonify({'success': False, 'message': 'Students not enrolled in this class',
+                            'student_ids': not_enrolled}), 400
+
+        existing = {
+            record.student_id: record
+            for record in Attendance.query.filter(
+                Attendance.session_id == session_obj.id,
+                Attendance.student_id.in_(list(statuses))
+            ).all()
+        }
+
+        now = datetime.utcnow()
+        marked = []
+        for student_id, status in statuses.items():
+            attendance = existing.get(student_id)
+            if attendance:
+                attendance.status = status
+                attendance.marked_at = now
+                attendance.marked_by = session['user_id']
+                attendance.method = 'manual'
+            else:
+                attendance = Attendance(
+                    session_id=session_obj.id,
+                    student_id=student_id,
+                    status=status,
+                    marked_at=now,
+                    marked_by=session['user_id'],
+                    method='manual'
+                )
+                db.session.add(attendance)
+            marked.append(attendance)
+
+        db.session.flush()
+        attendance_ids = {str(record.student_id): record.id for record in marked}
+        versions = {str(record.student_id): record.version for record in marked}
+        db.session.commit()
+
+        counts = {status: list(statuses.values()).count(status) for status in ATTENDANCE_STATUSES}
+        log_audit('Bulk Mark Attendance', 'AttendanceSession', session_obj.id,
+                 f'Marked {len(marked)} students in session {session_obj.id} '
+                 f'({counts["present"]} present, {counts["late"]} late, {counts["absent"]} absent)')
+
+        return jsonify({'success': True, 'message': f'Marked attendance for {len(marked)} students',
+                        'marked': len(marked), 'attendance_ids': attendance_ids, 'versions': versions})
+
+    except (IntegrityError, StaleDataError):
+        # Someone else marked part of the roster meanwhile; nothing was saved
+        db.session.rollback()
+        return jsonify({'success': False, 'conflict': True,
+                        'message': 'Attendance changed while marking, please retry'}), 409
+
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 400
@@ -1369,7 +3956,9 @@ def api_finalize_attendance(session_id):
         session_obj = AttendanceSession.query.get_or_404(session_id)
         
         # Verify faculty has access
-        faculty = Faculty.query.filter_by(user_id=session['user_id']).first()
+        faculty = get_current_faculty()
+        if not faculty:
+            return jsonify({'success': False, 'message': 'Faculty profile not found'}), 403
         if session_obj.class_ref.faculty_id != faculty.id:
             return jsonify({'success': False, 'message': 'Unauthorized access'}), 403
         
@@ -1377,10 +3966,7 @@ def api_finalize_attendance(session_id):
         if session_obj.is_finalized:
             return jsonify({'success': False, 'message': 'Session already finalized'}), 400
         
-        # Check 24-hour window
-        session_end_datetime = datetime.combine(session_obj.date, session_obj.end_time)
-        time_since_end = datetime.now() - session_end_datetime
-        if time_since_end > timedelta(hours=24):
+        if datetime.now() > attendance_edit_deadline(session_obj):
             return jsonify({'success': False, 'message': '24-hour edit window has expired. Session automatically locked.'}), 400
         
         # Finalize the session
@@ -1399,242 +3985,335 @@ def api_finalize_attendance(session_id):
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 400
 
+# ==================== DATABASE SEEDING ====================
+
+SEED_FACULTY = [
+    {'name': 'Dr. Sarah Johnson', 'dept': 'Computer Science', 'designation': 'Professor'},
+    {'name': 'Prof. Michael Chen', 'dept': 'Computer Science', 'designation': 'Associate Professor'},
+    {'name': 'Dr. Emily Williams', 'dept': 'Information Technology', 'designation': 'Assistant Professor'},
+    {'name': 'Prof. Robert Davis', 'dept': 'Computer Science', 'designation': 'Professor'},
+    {'name': 'Dr. Lisa Anderson', 'dept': 'Information Technology', 'designation': 'Associate Professor'}
+]
+
+SEED_COURSES = [
+    # Computer Science - 7 courses
+    {'code': 'CS101', 'name': 'Introduction to Programming', 'dept': 'Computer Science', 'credits': 4, 'year': 1, 'sem': 1},
+    {'code': 'CS102', 'name': 'Data Structures', 'dept': 'Computer Science', 'credits': 4, 'year': 1, 'sem': 2},
+    {'code': 'CS201', 'name': 'Database Management Systems', 'dept': 'Computer Science', 'credits': 3, 'year': 2, 'sem': 1},
+    {'code': 'CS202', 'name': 'Operating Systems', 'dept': 'Computer Science', 'credits': 4, 'year': 2, 'sem': 2},
+    {'code': 'CS301', 'name': 'Machine Learning', 'dept': 'Computer Science', 'credits': 3, 'year': 3, 'sem': 1},
+    {'code': 'CS302', 'name': 'Artificial Intelligence', 'dept': 'Computer Science', 'credits': 4, 'year': 3, 'sem': 2},
+    {'code': 'CS303', 'name': 'Software Engineering', 'dept': 'Computer Science', 'credits': 3, 'year': 3, 'sem': 1},
+    # Information Technology - 5 courses
+    {'code': 'IT101', 'name': 'Web Technologies', 'dept': 'Information Technology', 'credits': 3, 'year': 1, 'sem': 1},
+    {'code': 'IT102', 'name': 'Computer Networks', 'dept': 'Information Technology', 'credits': 4, 'year': 1, 'sem': 2},
+    {'code': 'IT201', 'name': 'Cloud Computing', 'dept': 'Information Technology', 'credits': 3, 'year': 2, 'sem': 1},
+    {'code': 'IT202', 'name': 'Cybersecurity', 'dept': 'Information Technology', 'credits': 3, 'year': 2, 'sem': 2},
+    {'code': 'IT301', 'name': 'DevOps and CI/CD', 'dept': 'Information Technology', 'credits': 3, 'year': 3, 'sem': 1}
+]
+
+SEED_ROOMS = ['Lab 101', 'Lab 102', 'Lab 103', 'Room 201', 'Room 202', 'Room 203']
+# Morning slots first, then the rest of the 8am-5pm day
+SEED_SCHEDULES = [f'{days} {hour:02d}:00-{hour + 1:02d}:00'
+                  for hours in ((9, 10, 11), (8, 12, 13, 14, 15, 16))
+                  for days in ('MWF', 'TTS') for hour in hours]
+# Rooms handed out once the named ones are booked in a slot
+SEED_ROOM_POOL = SEED_ROOMS + [f'{prefix} {number}' for prefix in ('Room', 'Lab') for number in range(100, 1000)
+                               if f'{prefix} {number}' not in SEED_ROOMS]
+
+SEED_FIRST_NAMES = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda',
+                    'William', 'Barbara', 'David', 'Elizabeth', 'Richard', 'Susan', 'Joseph', 'Jessica',
+                    'Thomas', 'Sarah', 'Charles', 'Karen', 'Christopher', 'Nancy', 'Daniel', 'Lisa',
+                    'Matthew', 'Betty', 'Anthony', 'Margaret', 'Mark', 'Sandra', 'Donald', 'Ashley',
+                    'Steven', 'Kimberly', 'Paul', 'Emily', 'Andrew', 'Donna', 'Joshua', 'Michelle']
+
+SEED_LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+                   'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson',
+                   'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin', 'Lee', 'Perez', 'Thompson', 'White']
+
+def seed_section_name(index):
+    """Spreadsheet-style section names: A..Z, AA, AB, ..."""
+    name = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord('A') + remainder) + name
+    return name
+
+def _next_id(model):
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+def _bulk_insert(model, rows, chunk_size=5000):
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(model.__table__.insert(), rows[start:start + chunk_size])
+
+def _seed_slot_overlaps():
+    """Map each SEED_SCHEDULES index to the indexes of the slots it overlaps, itself included"""
+    parsed = [parse_schedule(schedule) for schedule in SEED_SCHEDULES]
+    return [{j for j, (other_days, other_start, other_end) in enumerate(parsed)
+             if set(days) & set(other_days) and start < other_end and other_start < end}
+            for days, start, end in parsed]
+
+def seed_database(students_per_section=40, sections=6, classes_per_section=2,
+                  faculty_count=5, days=30, seed=42, log=print):
+    """Populate the database with deterministic sample data using bulk inserts.
+
+    Primary keys are assigned up front so every table is written with
+    executemany, each role's password is hashed once, and attendance is
+    generated one day at a time from a seeded RNG to keep memory flat.
+    Sections alternate years in pairs (A, B = Year 1; C, D = Year 2; ...),
+    the first half belongs to Computer Science and the rest to IT.
+    Classes get slots and rooms that never clash by section, room or
+    faculty, adding faculty members beyond faculty_count when a department
+    runs out of free slots, and sessions follow each class's schedule.
+    """
+    rng = random.Random(seed)
+    password_hashes = {role: generate_password_hash(f'{role}123') for role in ('admin', 'faculty', 'student')}
+    counts = {}
+
+    # Admin
+    user_id = _next_id(User)
+    if not User.query.filter_by(username='admin').first():
+        _bulk_insert(User, [{
+            'id': user_id, 'username': 'admin', 'email': 'admin@sams.edu',
+            'password_hash': password_hashes['admin'], 'role': 'admin', 'full_name': 'System Administrator'
+        }])
+        user_id += 1
+
+    # Faculty
+    faculty_rows, faculty_users = [], []
+    faculty_id = _next_id(Faculty)
+    for i in range(1, faculty_count + 1):
+        template = SEED_FACULTY[(i - 1) % len(SEED_FACULTY)]
+        name = template['name'] if i <= len(SEED_FACULTY) else f"Faculty Member {i}"
+        faculty_users.append({
+            'id': user_id, 'username': f'faculty{i}', 'email': f'faculty{i}@sams.edu',
+            'password_hash': password_hashes['faculty'], 'role': 'faculty', 'full_name': name
+        })
+        faculty_rows.append({
+            'id': faculty_id, 'user_id': user_id, 'faculty_id': f'FAC{str(i).zfill(3)}',
+            'department': template['dept'], 'designation': template['designation']
+        })
+        user_id += 1
+        faculty_id += 1
+
+    # Courses
+    course_rows = []
+    course_id = _next_id(Course)
+    for course_data in SEED_COURSES:
+        course_rows.append({
+            'id': course_id, 'course_code': course_data['code'], 'course_name': course_data['name'],
+            'department': course_data['dept'], 'credits': course_data['credits'],
+            'year': course_data['year'], 'semester': course_data['sem']
+        })
+        course_id += 1
+    _bulk_insert(Course, course_rows)
+    counts['courses'] = len(course_rows)
+    log(f"✓ Created {len(course_rows)} courses")
+
+    # Sections and their classes
+    section_info = []
+    for index in range(sections):
+        dept = 'Computer Science' if index < (sections + 1) // 2 else 'Information Technology'
+        section_info.append((seed_section_name(index), dept, (index // 2) % 3 + 1))
+
+    # Booked slot indexes per ('section' | 'room' | 'faculty_id', value)
+    overlaps = _seed_slot_overlaps()
+    booked = defaultdict(set)
+    room_cursor = [0] * len(SEED_SCHEDULES)
+    
+    def is_free(key, schedule_index):
+        return not booked[key] & overlaps[schedule_index]
+    
+    def add_faculty(dept):
+        nonlocal user_id, faculty_id
+        number = len(faculty_rows) + 1
+        template = SEED_FACULTY[(number - 1) % len(SEED_FACULTY)]
+        faculty_users.append({
+            'id': user_id, 'username': f'faculty{number}', 'email': f'faculty{number}@sams.edu',
+            'password_hash': password_hashes['faculty'], 'role': 'faculty', 'full_name': f"Faculty Member {number}"
+        })
+        faculty_rows.append({
+            'id': faculty_id, 'user_id': user_id, 'faculty_id': f'FAC{str(number).zfill(3)}',
+            'department': dept, 'designation': template['designation']
+        })
+        user_id += 1
+        faculty_id += 1
+        return faculty_rows[-1]
+
+    class_rows = []
+    class_id = _next_id(Class)
+    classes_by_section = {}
+    for index, (section, dept, year) in enumerate(section_info):
+        matching = [c for c in course_rows if c['department'] == dept and c['year'] == year]
+        others = [c for c in course_rows if c['department'] == dept and c['year'] != year]
+        dept_faculty = [f for f in faculty_rows if f['department'] == dept] or faculty_rows
+        for slot, course in enumerate((matching + others)[:classes_per_section]):
+            open_slots = [i for i in range(len(SEED_SCHEDULES)) if is_free(('section', section), i)]
+            if not open_slots:
+                raise ValueError(f'Section {section} has more classes than seed time slots')
+            
+            # First slot where one of the department's faculty is free, starting the
+            # rotation where the original round-robin assignment would have
+            preferred = index * classes_per_section + slot
+            rotation = [dept_faculty[(preferred + offset) % len(dept_faculty)] for offset in range(len(dept_faculty))]
+            placement = next(((i, faculty_row) for i in open_slots for faculty_row in rotation
+                              if is_free(('faculty_id', faculty_row['id']), i)), None)
+            if placement is None:
+                placement = open_slots[0], add_faculty(dept)
+                dept_faculty = [f for f in faculty_rows if f['department'] == dept]
+            schedule_index, faculty_row = placement
+            
+            while not is_free(('room', SEED_ROOM_POOL[room_cursor[schedule_index]]), schedule_index):
+                room_cursor[schedule_index] += 1
+                if room_cursor[schedule_index] == len(SEED_ROOM_POOL):
+                    raise ValueError(f'Not enough seed rooms for {SEED_SCHEDULES[schedule_index]}')
+            room = SEED_ROOM_POOL[room_cursor[schedule_index]]
+            
+            for key in (('section', section), ('room', room), ('faculty_id', faculty_row['id'])):
+                booked[key].add(schedule_index)
+            class_rows.append({
+                'id': class_id, 'course_id': course['id'],
+                'faculty_id': faculty_row['id'],
+                'section': section,
+                'schedule': SEED_SCHEDULES[schedule_index],
+                'room': room
+            })
+            classes_by_section.setdefault(section, []).append(class_rows[-1])
+            class_id += 1
+    _bulk_insert(User, faculty_users)
+    _bulk_insert(Faculty, faculty_rows)
+    counts['faculty'] = len(faculty_rows)
+    log(f"✓ Created {len(faculty_rows)} faculty members")
+    _bulk_insert(Class, class_rows)
+    rebuild_schedule_index()
+    counts['classes'] = len(class_rows)
+    log(f"✓ Created {len(class_rows)} classes across {sections} sections")
+
+    # Students and enrollments
+    student_users, student_rows, enrollment_rows = [], [], []
+    student_pk = _next_id(Student)
+    enrollment_id = _next_id(Enrollment)
+    roster = {}
+    number = 1
+    for section, dept, year in section_info:
+        for _ in range(students_per_section):
+            student_users.append({
+                'id': user_id, 'username': f'student{number}', 'email': f'student{number}@sams.edu',
+                'password_hash': password_hashes['student'], 'role': 'student',
+                'full_name': f"{rng.choice(SEED_FIRST_NAMES)} {rng.choice(SEED_LAST_NAMES)}"
+            })
+            student_rows.append({
+                'id': student_pk, 'user_id': user_id, 'student_id': f'STU{str(number).zfill(4)}',
+                'department': dept, 'year': year, 'section': section,
+                'parent_email': f'parent{number}@example.com'
+            })
+            for class_row in classes_by_section.get(section, []):
+                enrollment_rows.append({'id': enrollment_id, 'student_id': student_pk, 'class_id': class_row['id']})
+                roster.setdefault(class_row['id'], []).append(student_pk)
+                enrollment_id += 1
+            user_id += 1
+            student_pk += 1
+            number += 1
+    _bulk_insert(User, student_users)
+    _bulk_insert(Student, student_rows)
+    _bulk_insert(Enrollment, enrollment_rows)
+    db.session.commit()
+    counts['students'] = len(student_rows)
+    counts['enrollments'] = len(enrollment_rows)
+    log(f"✓ Created {len(student_rows)} students ({students_per_section} per section)")
+    del student_users, student_rows, enrollment_rows
+
+    # Attendance, one day at a time
+    faculty_user_ids = {f['id']: f['user_id'] for f in faculty_rows}
+    session_id = _next_id(AttendanceSession)
+    attendance_id = _next_id(Attendance)
+    counts['sessions'] = counts['attendance'] = 0
+    today = datetime.now().date()
+    meetings = {class_row['id']: parse_schedule(class_row['schedule']) for class_row in class_rows}
+    for day_offset in range(days):
+        current_date = today - timedelta(days=day_offset)
+
+        # Only classes that meet on this weekday get a session
+        session_rows, attendance_rows = [], []
+        for class_row in class_rows:
+            weekdays, start_minute, end_minute = meetings[class_row['id']]
+            if current_date.weekday() not in weekdays:
+                continue
+            marked_by = faculty_user_ids[class_row['faculty_id']]
+            session_rows.append({
+                'id': session_id, 'class_id': class_row['id'], 'date': current_date,
+                'start_time': time(*divmod(start_minute, 60)), 'end_time': time(*divmod(end_minute, 60)),
+                'created_by': marked_by, 'is_active': False
+            })
+            for student_pk in roster.get(class_row['id'], []):
+                # 85% present, 10% late, 5% absent (realistic distribution)
+                rand = rng.random()
+                status = 'present' if rand < 0.85 else 'late' if rand < 0.95 else 'absent'
+                attendance_rows.append({
+                    'id': attendance_id, 'session_id': session_id, 'student_id': student_pk,
+                    'status': status, 'marked_by': marked_by, 'method': 'manual'
+                })
+                attendance_id += 1
+            session_id += 1
+
+        _bulk_insert(AttendanceSession, session_rows)
+        _bulk_insert(Attendance, attendance_rows)
+        db.session.commit()
+        counts['sessions'] += len(session_rows)
+        counts['attendance'] += len(attendance_rows)
+
+    log(f"✓ Generated {counts['sessions']} sessions and {counts['attendance']} attendance records")
+    
+    # Bulk inserts bypass the ORM, so build the rollups, search index and counters in one pass
+    counts['rollups'] = rebuild_attendance_rollups()
+    rebuild_user_search()
+    rebuild_entity_counts()
+    return counts
+
+@app.cli.command('seed-db')
+@click.option('--students-per-section', default=40, show_default=True)
+@click.option('--sections', default=6, show_default=True)
+@click.option('--classes-per-section', default=2, show_default=True)
+@click.option('--faculty', 'faculty_count', default=5, show_default=True)
+@click.option('--days', default=30, show_default=True)
+@click.option('--seed', default=42, show_default=True)
+@click.option('--reset', is_flag=True, help='Drop and recreate all tables first.')
+def seed_db_command(students_per_section, sections, classes_per_section, faculty_count, days, seed, reset):  # pragma: no cover
+    """Seed the database with deterministic sample data at any scale."""
+    if reset:
+        db.drop_all()
+    db.create_all()
+    if User.query.filter(User.role != 'admin').first():
+        click.echo('Database already contains data. Use --reset to replace it.')
+        return
+    started = datetime.now()
+    counts = seed_database(students_per_section, sections, classes_per_section,
+                           faculty_count, days, seed, log=click.echo)
+    click.echo(f"Seeded {counts['attendance']} attendance records in "
+               f"{(datetime.now() - started).total_seconds():.1f}s")
+
 # ==================== INITIALIZE DATABASE ====================
 
 def init_db():  # pragma: no cover
     with app.app_context():
         db.create_all()
         
+        # Databases created before the derived tables existed need a first build
+        if not ClassMeeting.query.first() and Class.query.filter(Class.schedule.isnot(None)).first():
+            print(f"✓ Built {rebuild_schedule_index()} class meeting rows")
+        if not AttendanceRollup.query.first() and Attendance.query.first():
+            print(f"✓ Built {rebuild_attendance_rollups()} attendance rollup rows")
+        if not db.session.execute(db.text(
+                "SELECT 1 FROM sqlite_master WHERE name = 'user_search'")).first():
+            print(f"✓ Indexed {rebuild_user_search()} users for search")
+        if not EntityCount.query.first():
+            rebuild_entity_counts()
+        
         if not User.query.filter_by(role='admin').first():
             print("\n🔄 Initializing database with organized structure...")
             
-            # Create admin
-            admin = User(
-                username='admin',
-                email='admin@sams.edu',
-                password_hash=generate_password_hash('admin123'),
-                role='admin',
-                full_name='System Administrator'
-            )
-            db.session.add(admin)
-            db.session.commit()
-            
-            # Create 5 faculty members (organized by department)
-            faculty_data = [
-                {'name': 'Dr. Sarah Johnson', 'dept': 'Computer Science', 'designation': 'Professor'},
-                {'name': 'Prof. Michael Chen', 'dept': 'Computer Science', 'designation': 'Associate Professor'},
-                {'name': 'Dr. Emily Williams', 'dept': 'Information Technology', 'designation': 'Assistant Professor'},
-                {'name': 'Prof. Robert Davis', 'dept': 'Computer Science', 'designation': 'Professor'},
-                {'name': 'Dr. Lisa Anderson', 'dept': 'Information Technology', 'designation': 'Associate Professor'}
-            ]
-            
-            faculty_list = []
-            for i, fac_data in enumerate(faculty_data, 1):
-                faculty_user = User(
-                    username=f'faculty{i}',
-                    email=f'faculty{i}@sams.edu',
-                    password_hash=generate_password_hash('faculty123'),
-                    role='faculty',
-                    full_name=fac_data['name']
-                )
-                db.session.add(faculty_user)
-                db.session.commit()
-                
-                faculty = Faculty(
-                    user_id=faculty_user.id,
-                    faculty_id=f'FAC{str(i).zfill(3)}',
-                    department=fac_data['dept'],
-                    designation=fac_data['designation']
-                )
-                db.session.add(faculty)
-                faculty_list.append(faculty)
-            
-            db.session.commit()
-            print("✓ Created 5 faculty members")
-            
-            # Create 12 courses (organized by department and year)
-            courses_data = [
-                # Computer Science - 7 courses
-                {'code': 'CS101', 'name': 'Introduction to Programming', 'dept': 'Computer Science', 'credits': 4, 'year': 1, 'sem': 1},
-                {'code': 'CS102', 'name': 'Data Structures', 'dept': 'Computer Science', 'credits': 4, 'year': 1, 'sem': 2},
-                {'code': 'CS201', 'name': 'Database Management Systems', 'dept': 'Computer Science', 'credits': 3, 'year': 2, 'sem': 1},
-                {'code': 'CS202', 'name': 'Operating Systems', 'dept': 'Computer Science', 'credits': 4, 'year': 2, 'sem': 2},
-                {'code': 'CS301', 'name': 'Machine Learning', 'dept': 'Computer Science', 'credits': 3, 'year': 3, 'sem': 1},
-                {'code': 'CS302', 'name': 'Artificial Intelligence', 'dept': 'Computer Science', 'credits': 4, 'year': 3, 'sem': 2},
-                {'code': 'CS303', 'name': 'Software Engineering', 'dept': 'Computer Science', 'credits': 3, 'year': 3, 'sem': 1},
-                # Information Technology - 5 courses
-                {'code': 'IT101', 'name': 'Web Technologies', 'dept': 'Information Technology', 'credits': 3, 'year': 1, 'sem': 1},
-                {'code': 'IT102', 'name': 'Computer Networks', 'dept': 'Information Technology', 'credits': 4, 'year': 1, 'sem': 2},
-                {'code': 'IT201', 'name': 'Cloud Computing', 'dept': 'Information Technology', 'credits': 3, 'year': 2, 'sem': 1},
-                {'code': 'IT202', 'name': 'Cybersecurity', 'dept': 'Information Technology', 'credits': 3, 'year': 2, 'sem': 2},
-                {'code': 'IT301', 'name': 'DevOps and CI/CD', 'dept': 'Information Technology', 'credits': 3, 'year': 3, 'sem': 1}
-            ]
-            
-            courses_list = []
-            for course_data in courses_data:
-                course = Course(
-                    course_code=course_data['code'],
-                    course_name=course_data['name'],
-                    department=course_data['dept'],
-                    credits=course_data['credits'],
-                    year=course_data['year'],
-                    semester=course_data['sem']
-                )
-                db.session.add(course)
-                courses_list.append(course)
-            
-            db.session.commit()
-            print("✓ Created 12 courses (7 CS + 5 IT)")
-            
-            # FIXED: Ensure each faculty gets exactly 3 classes
-            print("\n🎓 Creating organized class structure...")
-            print("   Each faculty gets exactly 3 classes (5 faculty × 3 = 15 total classes)")
-            
-            # Define sections with their respective years
-            section_year_mapping = {
-                'A': 1, 'B': 1,  # Year 1 sections
-                'C': 2, 'D': 2,  # Year 2 sections
-                'E': 3, 'F': 3   # Year 3 sections
-            }
-            
-            rooms = ['Lab 101', 'Lab 102', 'Lab 103', 'Room 201', 'Room 202', 'Room 203']
-            schedules = ['MWF 09:00-10:00', 'MWF 10:00-11:00', 'MWF 11:00-12:00', 
-                        'TTS 09:00-10:00', 'TTS 10:00-11:00', 'TTS 11:00-12:00']
-            
-            classes_list = []
-            
-            # Assign 3 classes to each faculty
-            for faculty in faculty_list:
-                # Get courses from faculty's department
-                dept_courses = [c for c in courses_list if c.department == faculty.department]
-                
-                # Randomly select 3 courses for this faculty
-                selected_courses = random.sample(dept_courses, min(3, len(dept_courses)))
-                
-                for course in selected_courses:
-                    # Randomly assign a section
-                    section = random.choice(list(section_year_mapping.keys()))
-                    
-                    class_obj = Class(
-                        course_id=course.id,
-                        faculty_id=faculty.id,
-                        section=section,
-                        schedule=random.choice(schedules),
-                        room=random.choice(rooms)
-                    )
-                    db.session.add(class_obj)
-                    classes_list.append(class_obj)
-            
-            db.session.commit()
-            print(f"✓ Created {len(classes_list)} classes")
-            print(f"✓ Each of the 5 faculty members has 3 classes")
-            
-            # Create 240 students (40 per section, 6 sections)
-            print("\n👥 Creating students...")
-            first_names = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 
-                          'William', 'Barbara', 'David', 'Elizabeth', 'Richard', 'Susan', 'Joseph', 'Jessica',
-                          'Thomas', 'Sarah', 'Charles', 'Karen', 'Christopher', 'Nancy', 'Daniel', 'Lisa',
-                          'Matthew', 'Betty', 'Anthony', 'Margaret', 'Mark', 'Sandra', 'Donald', 'Ashley',
-                          'Steven', 'Kimberly', 'Paul', 'Emily', 'Andrew', 'Donna', 'Joshua', 'Michelle']
-            
-            last_names = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
-                         'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson',
-                         'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin', 'Lee', 'Perez', 'Thompson', 'White']
-            
-            student_count = 1
-            for section, year in section_year_mapping.items():
-                print(f"   Section {section} (Year {year}): Creating 40 students...")
-                
-                for i in range(40):
-                    full_name = f"{random.choice(first_names)} {random.choice(last_names)}"
-                    student_user = User(
-                        username=f'student{student_count}',
-                        email=f'student{student_count}@sams.edu',
-                        password_hash=generate_password_hash('student123'),
-                        role='student',
-                        full_name=full_name
-                    )
-                    db.session.add(student_user)
-                    db.session.commit()
-                    
-                    # Determine department based on section
-                    dept = 'Computer Science' if section in ['A', 'B', 'C'] else 'Information Technology'
-                    
-                    student = Student(
-                        user_id=student_user.id,
-                        student_id=f'STU{str(student_count).zfill(4)}',
-                        department=dept,
-                        year=year,  # FIXED: Use the correct year based on section
-                        section=section,
-                        parent_email=f'parent{student_count}@example.com'
-                    )
-                    db.session.add(student)
-                    db.session.commit()
-                    
-                    # Enroll student in all courses of their section (matching year)
-                    section_classes = [c for c in classes_list if c.section == section]
-                    for class_obj in section_classes:
-                        enrollment = Enrollment(
-                            student_id=student.id,
-                            class_id=class_obj.id
-                        )
-                        db.session.add(enrollment)
-                    
-                    student_count += 1
-                
-                db.session.commit()
-            
-            print(f"✓ Created {student_count - 1} students (40 per section × 6 sections)")
-            print("✓ Each student enrolled in 2 courses matching their year")
-            
-            # Generate 30 days of attendance data
-            print("\n📅 Generating 30 days of attendance records...")
-            today = datetime.now().date()
-            
-            for day_offset in range(30):
-                current_date = today - timedelta(days=day_offset)
-                
-                # Skip weekends
-                if current_date.weekday() >= 5:
-                    continue
-                
-                for class_obj in classes_list:
-                    # Create session for each class
-                    session_obj = AttendanceSession(
-                        class_id=class_obj.id,
-                        date=current_date,
-                        start_time=time(9, 0),
-                        end_time=time(10, 0),
-                        created_by=class_obj.faculty.user_id,
-                        is_active=False  # Past sessions are inactive
-                    )
-                    db.session.add(session_obj)
-                    db.session.commit()
-                    
-                    # Mark attendance for all enrolled students
-                    enrollments = Enrollment.query.filter_by(class_id=class_obj.id).all()
-                    for enrollment in enrollments:
-                        # 85% present, 10% late, 5% absent (realistic distribution)
-                        rand = random.random()
-                        if rand < 0.85:
-                            status = 'present'
-                        elif rand < 0.95:
-                            status = 'late'
-                        else:
-                            status = 'absent'
-                        
-                        attendance = Attendance(
-                            session_id=session_obj.id,
-                            student_id=enrollment.student_id,
-                            status=status,
-                            marked_by=class_obj.faculty.user_id,
-                            method='manual'
-                        )
-                        db.session.add(attendance)
-                
-                db.session.commit()
-            
-            print("✓ Generated 30 days of attendance (weekdays only)")
+            seed_database()
             
             # Print summary
             print("\n" + "="*70)
@@ -1656,6 +4335,7 @@ def init_db():  # pragma: no cover
             print("  • 40 Students per section = 240 total")
             print("  • Each section takes 2 courses matching their year")
             print("  • 30 days of attendance generated")
+            print("  • Larger datasets: flask --app app seed-db --reset --sections 1250 --days 90")
             
             print("\n🔐 Login Credentials:")
             print("  Admin:")
@@ -1,5 +1,5 @@
 """Initialize database with test data for testing"""
-from app import app, db, User, Student, Faculty, Course, Class, Enrollment, AttendanceSession, Attendance
+from app import app, db, User, Student, Faculty, Course, Class, Enrollment, AttendanceSession, Attendance, rebuild_attendance_rollups, rebuild_user_search, rebuild_entity_counts
 from werkzeug.security import generate_password_hash
 from datetime import datetime, timedelta, time, date
 
@@ -11,10 +11,13 @@ def initialize_test_data():
         db.create_all()
         
         print("Creating users...")
+        # Hash each role's shared password once instead of once per user
+        password_hashes = {role: generate_password_hash(f'{role}123') for role in ('admin', 'faculty', 'student')}
+        
         # Admin
         admin_user = User(
             username='admin',
-            password_hash=generate_password_hash('admin123'),
+            password_hash=password_hashes['admin'],
             role='admin',
             email='admin@test.com',
             full_name='Administrator'
@@ -26,7 +29,7 @@ def initialize_test_data():
         for i in range(1, 4):
             user = User(
                 username=f'faculty{i}',
-                password_hash=generate_password_hash('faculty123'),
+                password_hash=password_hashes['faculty'],
                 role='faculty',
                 email=f'faculty{i}@test.com',
                 full_name=f'Faculty Member {i}'
@@ -39,7 +42,7 @@ def initialize_test_data():
         for i in range(1, 11):
             user = User(
                 username=f'student{i}',
-                password_hash=generate_password_hash('student123'),
+                password_hash=password_hashes['student'],
                 role='student',
                 email=f'student{i}@test.com',
                 full_name=f'Student {i}'
@@ -151,26 +154,30 @@ def initialize_test_data():
         # Mark attendance for all sessions
         print("Marking attendance...")
         all_sessions = AttendanceSession.query.all()
-        attendance_records = 0
+        faculty_by_class = {class_obj.id: class_obj.faculty_id for class_obj in classes}
+        roster = {}
+        for enrollment in Enrollment.query.all():
+            roster.setdefault(enrollment.class_id, []).append(enrollment.student_id)
         
+        attendance_rows = []
         for session in all_sessions:
-            class_obj = Class.query.get(session.class_id)
-            enrollments = Enrollment.query.filter_by(class_id=class_obj.id).all()
-            
-            for enrollment in enrollments:
+            for student_id in roster.get(session.class_id, []):
                 # 80% present, 20% absent
-                status = 'present' if (enrollment.student_id + session.id) % 5 != 0 else 'absent'
+                status = 'present' if (student_id + session.id) % 5 != 0 else 'absent'
                 
-                attendance = Attendance(
-                    session_id=session.id,
-                    student_id=enrollment.student_id,
-                    status=status,
-                    marked_by=class_obj.faculty_id
-                )
-                db.session.add(attendance)
-                attendance_records += 1
-        
+                attendance_rows.append({
+                    'session_id': session.id,
+                    'student_id': student_id,
+                    'status': status,
+                    'marked_by': faculty_by_class[session.class_id]
+                })
+        
+        db.session.execute(Attendance.__table__.insert(), attendance_rows)
         db.session.commit()
+        attendance_records = len(attendance_rows)
+        rebuild_attendance_rollups()
+        rebuild_user_search()
+        rebuild_entity_counts()
         print(f"Created {attendance_records} attendance records")
         
         print("\n=== Database Initialization Complete ===")
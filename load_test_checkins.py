@@ -0,0 +1,130 @@
+"""
+Check-in Load Test
+Pushes a burst of QR check-ins at a scratch SQLite database and reports the
+sustained check-ins per second through the ingestion queue, next to the
+one-transaction-per-check-in baseline
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time as clock
+from datetime import date, time, timedelta
+from werkzeug.security import generate_password_hash
+
+# The engine is created when app is imported, so point it at a scratch database first
+DB_FD, DB_PATH = tempfile.mkstemp(suffix='.db')
+os.environ['SAMS_DATABASE_URI'] = f'sqlite:///{DB_PATH}'
+
+from app import (app, db, User, Faculty, Student, Course, Class, Enrollment, AttendanceSession,
+                 Attendance, checkin_queue, record_checkins, CHECKIN_PENDING, CHECKIN_COMMITTED)
+
+
+def session_date(session_id):
+    return date.today() - timedelta(days=session_id - 1)
+
+
+def build_fixture(student_count):
+    """Create one class with student_count enrolled students and two open sessions (today, yesterday)"""
+    password_hash = generate_password_hash('loadtest')
+    db.session.execute(User.__table__.insert(), [{
+        'id': 1, 'username': 'loadfaculty', 'email': 'loadfaculty@sams.edu',
+        'password_hash': password_hash, 'role': 'faculty', 'full_name': 'Load Faculty'
+    }] + [{
+        'id': i + 2, 'username': f'load{i}', 'email': f'load{i}@sams.edu',
+        'password_hash': password_hash, 'role': 'student', 'full_name': f'Load Student {i}'
+    } for i in range(student_count)])
+    db.session.execute(Faculty.__table__.insert(), [{
+        'id': 1, 'user_id': 1, 'faculty_id': 'FAC001', 'department': 'Computer Science', 'designation': 'Professor'
+    }])
+    db.session.execute(Course.__table__.insert(), [{
+        'id': 1, 'course_code': 'CS101', 'course_name': 'Load Testing', 'department': 'Computer Science',
+        'credits': 3, 'year': 1, 'semester': 1
+    }])
+    db.session.execute(Class.__table__.insert(), [{
+        'id': 1, 'course_id': 1, 'faculty_id': 1, 'section': 'A', 'schedule': None, 'room': 'Lab 101'
+    }])
+    db.session.execute(Student.__table__.insert(), [{
+        'id': i + 1, 'user_id': i + 2, 'student_id': f'ST{i:05d}', 'department': 'Computer Science',
+        'year': 1, 'section': 'A'
+    } for i in range(student_count)])
+    db.session.execute(Enrollment.__table__.insert(), [{
+        'student_id': i + 1, 'class_id': 1
+    } for i in range(student_count)])
+    db.session.execute(AttendanceSession.__table__.insert(), [{
+        'id': session_id, 'class_id': 1, 'date': session_date(session_id), 'start_time': time(9, 0),
+        'end_time': time(23, 59), 'created_by': 1
+    } for session_id in (1, 2)])
+    db.session.commit()
+    return list(range(1, student_count + 1))
+
+
+def run_clients(student_ids, workers, check_in):
+    """Split the students across worker threads that each call check_in(student_id)"""
+    def worker(chunk):
+        with app.app_context():
+            for student_id in chunk:
+                check_in(student_id)
+
+    threads = [threading.Thread(target=worker, args=(student_ids[i::workers],)) for i in range(workers)]
+    started = clock.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return clock.perf_counter() - started
+
+
+def measure_direct(student_ids, workers):
+    """Baseline: every check-in is its own INSERT and commit"""
+    elapsed = run_clients(student_ids, workers,
+                          lambda student_id: record_checkins(1, 1, session_date(1), [student_id]))
+    return elapsed, Attendance.query.filter_by(session_id=1).count()
+
+
+def measure_queued(student_ids, workers):
+    """Check-ins are accepted onto the queue and written in coalesced batches"""
+    app.config['CHECKIN_QUEUE_ASYNC'] = True
+    started = clock.perf_counter()
+    accepted = run_clients(student_ids, workers,
+                           lambda student_id: checkin_queue.submit(2, 1, session_date(2), student_id))
+    while any(checkin_queue.state(2, student_id) == CHECKIN_PENDING for student_id in student_ids):
+        clock.sleep(0.01)
+    committed = clock.perf_counter() - started
+    states = [checkin_queue.state(2, student_id) for student_id in student_ids]
+    return accepted, committed, states.count(CHECKIN_COMMITTED)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure sustained QR check-ins per second.')
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    app.config['AUDIT_LOG_ASYNC'] = False
+    try:
+        with app.app_context():
+            db.create_all()
+            student_ids = build_fixture(args.students)
+            print(f"Checking in {args.students} students from {args.workers} client threads\n")
+
+            elapsed, written = measure_direct(student_ids, args.workers)
+            print(f"Direct (one transaction each): {written} written in {elapsed:.2f}s "
+                  f"= {written / elapsed:,.0f} check-ins/s")
+
+            accepted, committed, written = measure_queued(student_ids, args.workers)
+            print(f"Queued (coalesced batches):    {args.students} accepted in {accepted:.2f}s "
+                  f"= {args.students / accepted:,.0f} check-ins/s")
+            print(f"                               {written} committed in {committed:.2f}s "
+                  f"= {written / committed:,.0f} check-ins/s sustained")
+            checkin_queue.stop()
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        os.close(DB_FD)
+        os.unlink(DB_PATH)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+"""
+Database Migration Script
+Adds the tables, columns and hot-path indexes declared on the models to an existing database,
+rebuilds the derived tables and verifies with EXPLAIN QUERY PLAN that the hot queries use them
+"""
+
+import os
+import shutil
+from datetime import datetime
+from sqlalchemy import text
+from app import (app, db, USER_SEARCH_DDL, rebuild_schedule_index, rebuild_attendance_rollups,
+                 rebuild_user_search, rebuild_entity_counts)
+
+# Queries on the attendance hot paths, with sample parameters for EXPLAIN
+HOT_QUERIES = {
+    'attendance for a session': (
+        "SELECT * FROM attendance WHERE session_id = :session_id",
+        {'session_id': 1}
+    ),
+    'attendance upsert lookup': (
+        "SELECT * FROM attendance WHERE session_id = :session_id AND student_id = :student_id",
+        {'session_id': 1, 'student_id': 1}
+    ),
+    'attendance for a student': (
+        "SELECT * FROM attendance WHERE student_id = :student_id",
+        {'student_id': 1}
+    ),
+    'sessions for a class': (
+        "SELECT * FROM attendance_sessions WHERE class_id = :class_id ORDER BY date DESC",
+        {'class_id': 1}
+    ),
+    'sessions for a class on a date': (
+        "SELECT * FROM attendance_sessions WHERE class_id = :class_id AND date = :date",
+        {'class_id': 1, 'date': '2025-01-01'}
+    ),
+    'sessions in a room on a date': (
+        "SELECT attendance_sessions.id FROM attendance_sessions "
+        "JOIN classes ON classes.id = attendance_sessions.class_id "
+        "WHERE classes.room = :room AND attendance_sessions.date = :date",
+        {'room': 'Lab 101', 'date': '2025-01-01'}
+    ),
+    'open sessions past a date': (
+        "SELECT id FROM attendance_sessions WHERE is_finalized = 0 AND date < :date",
+        {'date': '2025-01-01'}
+    ),
+    'expired offline-sync keys': (
+        "SELECT user_id, key FROM attendance_sync_ops WHERE created_at < :cutoff",
+        {'cutoff': '2025-01-01'}
+    ),
+    'enrollments for a class': (
+        "SELECT * FROM enrollments WHERE class_id = :class_id",
+        {'class_id': 1}
+    ),
+    'enrollments for a student': (
+        "SELECT * FROM enrollments WHERE student_id = :student_id",
+        {'student_id': 1}
+    ),
+    'student profile for a user': (
+        "SELECT * FROM students WHERE user_id = :user_id",
+        {'user_id': 1}
+    ),
+    'admin users page': (
+        "SELECT * FROM users WHERE role = 'admin' AND id > :after ORDER BY id LIMIT 51",
+        {'after': 0}
+    ),
+    'students in a section page': (
+        "SELECT * FROM students WHERE department = :department AND year = :year AND section = :section "
+        "AND student_id > :after ORDER BY student_id LIMIT 51",
+        {'department': 'Computer Science', 'year': 1, 'section': 'A', 'after': ''}
+    ),
+    'student section counts': (
+        "SELECT department, year, section, COUNT(id) FROM students "
+        "GROUP BY department, year, section ORDER BY department, year, section LIMIT 51",
+        {}
+    ),
+    'faculty profile for a user': (
+        "SELECT * FROM faculty WHERE user_id = :user_id",
+        {'user_id': 1}
+    ),
+    'classes for a faculty member': (
+        "SELECT * FROM classes WHERE faculty_id = :faculty_id",
+        {'faculty_id': 1}
+    ),
+    'recent audit logs': (
+        "SELECT * FROM audit_logs ORDER BY timestamp DESC LIMIT 10",
+        {}
+    ),
+    'next queued report job': (
+        "SELECT id FROM report_jobs WHERE status = 'queued' ORDER BY id LIMIT 1",
+        {}
+    ),
+    'in-flight report job for a request': (
+        "SELECT * FROM report_jobs WHERE dedupe_key = :key AND status IN ('queued', 'running')",
+        {'key': ''}
+    ),
+    'class attendance summary': (
+        "SELECT attendance.student_id, attendance_sessions.class_id, COUNT(attendance.id) "
+        "FROM attendance JOIN attendance_sessions ON attendance.session_id = attendance_sessions.id "
+        "WHERE attendance_sessions.class_id = :class_id "
+        "GROUP BY attendance.student_id, attendance_sessions.class_id",
+        {'class_id': 1}
+    ),
+}
+
+
+def find_duplicate_sessions(conn):
+    """Return (class_id, date, count) groups that violate the session uniqueness"""
+    return conn.execute(text(
+        "SELECT class_id, date, COUNT(*) FROM attendance_sessions "
+        "GROUP BY class_id, date HAVING COUNT(*) > 1"
+    )).fetchall()
+
+
+def remove_duplicate_attendance(conn):
+    """Keep only the most recent mark for each (session_id, student_id)"""
+    result = conn.execute(text(
+        "DELETE FROM attendance WHERE id NOT IN "
+        "(SELECT MAX(id) FROM attendance GROUP BY session_id, student_id)"
+    ))
+    return result.rowcount
+
+
+def apply_tables(conn):
+    """Create tables declared on the models (and the user search table) that the database is missing"""
+    existing = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+    missing = [table for table in db.metadata.sorted_tables if table.name not in existing]
+    db.metadata.create_all(bind=conn, tables=missing)
+    created = [table.name for table in missing]
+    if 'user_search' not in existing:
+        conn.execute(text(USER_SEARCH_DDL))
+        created.append('user_search')
+    return created
+
+
+def rebuild_derived_tables():
+    """Recompute every table derived from the source data and return the rows in each"""
+    return {
+        'class_meetings': rebuild_schedule_index(),
+        'attendance_rollups': rebuild_attendance_rollups(),
+        'user_search': rebuild_user_search(),
+        'entity_counts': len(rebuild_entity_counts())
+    }
+
+
+def apply_columns(conn):
+    """Add columns declared on the models that existing tables are missing"""
+    added = []
+    for table in db.metadata.sorted_tables:
+        existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table.name})"))}
+        if not existing:
+            continue
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}"
+            if column.server_default is not None:
+                ddl += f" NOT NULL DEFAULT {column.server_default.arg}" if not column.nullable \
+                    else f" DEFAULT {column.server_default.arg}"
+            conn.execute(text(ddl))
+            added.append(f'{table.name}.{column.name}')
+    return added
+
+
+def apply_indexes(conn):
+    """Create every index declared on the models that the database is missing"""
+    created = []
+    existing = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"),
+                {'name': index.name}
+            ).first()
+            if not exists:
+                index.create(bind=conn)
+                created.append(index.name)
+    return created
+
+
+def explain_hot_queries(conn):
+    """Return the EXPLAIN QUERY PLAN detail lines for each hot query"""
+    plans = {}
+    for name, (sql, params) in HOT_QUERIES.items():
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+        plans[name] = [row[-1] for row in rows]
+    return plans
+
+
+def unindexed_queries(conn):
+    """Return the hot queries whose plan contains a full table scan"""
+    failures = {}
+    for name, details in explain_hot_queries(conn).items():
+        scans = [d for d in details if d.startswith('SCAN') and 'USING' not in d]
+        if scans:
+            failures[name] = scans
+    return failures
+
+
+def migrate_indexes():
+    with app.app_context():
+        db_path = db.engine.url.database
+        backup_path = f'{os.path.splitext(db_path)[0]}_index_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.db'
+
+        print(f"Starting index migration for {db_path}")
+
+        if not os.path.exists(db_path):
+            print("✗ Database not found!")
+            return
+
+        shutil.copy2(db_path, backup_path)
+        print(f"✓ Backup created at {backup_path}")
+
+        with db.engine.begin() as conn:
+            duplicates = find_duplicate_sessions(conn)
+            if duplicates:
+                print("\n❌ Cannot add unique (class_id, date) index. Duplicate sessions found:")
+                for class_id, session_date, count in duplicates:
+                    print(f"   class {class_id} on {session_date}: {count} sessions")
+                print("\n⚠️  Merge or delete the duplicates and run the migration again.")
+                return
+
+            print("\n1. Removing duplicate attendance marks...")
+            removed = remove_duplicate_attendance(conn)
+            print(f"   ✓ Removed {removed} duplicate rows")
+
+            print("\n2. Creating missing tables...")
+            for name in apply_tables(conn):
+                print(f"   ✓ Created {name}")
+
+            print("\n3. Adding missing columns...")
+            for name in apply_columns(conn):
+                print(f"   ✓ Added {name}")
+
+            print("\n4. Creating missing indexes...")
+            for name in apply_indexes(conn):
+                print(f"   ✓ Created {name}")
+
+        # Rollups, meetings, counters and the search index are only kept current
+        # by the app once they exist, so fill them from the upgraded data
+        print("\n5. Rebuilding derived tables...")
+        for name, rows in rebuild_derived_tables().items():
+            print(f"   ✓ {name}: {rows} rows")
+
+        with db.engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+            print("\n6. Checking query plans...")
+            failures = unindexed_queries(conn)
+            for name in HOT_QUERIES:
+                mark = '✗' if name in failures else '✓'
+                print(f"   {mark} {name}")
+
+        if failures:
+            print("\n⚠️  Some hot queries still scan a full table.")
+        else:
+            print("\n✅ Index migration completed successfully!")
+
+
+if __name__ == '__main__':
+    print("="*60)
+    print("DATABASE MIGRATION: Adding Attendance Hot-Path Indexes")
+    print("="*60)
+
+    response = input("\n⚠️  This will modify your database. A backup will be created.\nContinue? (yes/no): ")
+
+    if response.lower() in ['yes', 'y']:
+        migrate_indexes()
+    else:
+        print("Migration cancelled.")
@@ -19,6 +19,10 @@ def app():
         'SQLALCHEMY_DATABASE_URI': f'sqlite:///{test_db_path}',
         'WTF_CSRF_ENABLED': False,  # Disable CSRF for testing
         'SECRET_KEY': 'test-secret-key',
+        'AUDIT_LOG_ASYNC': False,  # Write audit logs inline so tests can assert on them
+        'CHECKIN_QUEUE_ASYNC': False,  # Write check-ins inline so tests can assert on them
+        'FINALIZE_SWEEP_ENABLED': False,  # Tests create past sessions and expect them to stay open
+        'REPORT_WORKER_ENABLED': False,  # Tests run report jobs explicitly with process_report_jobs
         'SERVER_NAME': 'localhost.localdomain'
     })
     
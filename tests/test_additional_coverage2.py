@@ -228,6 +228,8 @@ class TestAPIEndpointCoverage:
             class_obj = Class.query.first()
             
             if class_obj:
+                # Only one session per class per day is allowed
+                AttendanceSession.query.filter_by(class_id=class_obj.id, date=datetime.now().date()).delete()
                 new_session = AttendanceSession(
                     class_id=class_obj.id,
                     date=datetime.now().date(),
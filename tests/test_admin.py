@@ -297,3 +297,35 @@ class TestAdminClassManagement:
         with app.app_context():
             class_obj = Class.query.filter_by(section='Z').first()
             assert class_obj is None
+
+
+class TestAdminReportDownload:
+    """Test streaming the attendance report CSV"""
+    
+    def test_download_streams_csv(self, admin_client, app):
+        """Report download is a streamed CSV attachment with one row per student and course"""
+        from app import AttendanceSession, Attendance
+        with app.app_context():
+            session = AttendanceSession.query.first()
+            student = Student.query.first()
+            db.session.add(Attendance(session_id=session.id, student_id=student.id, status='late', marked_by=2))
+            db.session.commit()
+        
+        response = admin_client.get('/admin/reports/attendance/download')
+        
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        assert 'attachment; filename=attendance_report_' in response.headers['Content-Disposition']
+        lines = response.get_data(as_text=True).splitlines()
+        assert lines[0].startswith('Student ID,Name,Department')
+        assert lines[1] == 'ST001,Test Student,Computer Science,A,Data Structures,1,1,100.0%'
+    
+    def test_download_header_only_when_empty(self, admin_client):
+        """An empty report still streams its header row"""
+        response = admin_client.get('/admin/reports/attendance/download?start_date=1990-01-01&end_date=1990-01-02')
+        
+        assert response.status_code == 200
+        assert response.get_data(as_text=True).splitlines() == [
+            'Student ID,Name,Department,Section,Course,Total Sessions,Present,Percentage'
+        ]
@@ -7,6 +7,28 @@ from app import db, User, Student, Faculty, Attendance, AttendanceSession, Class
 from datetime import datetime, timedelta, time, date
 
 
+def _mark_in_new_sessions(class_obj, student, statuses):
+    """Mark the student in a separate past session for each status"""
+    for offset, status in enumerate(statuses, 1):
+        session = AttendanceSession(
+            class_id=class_obj.id,
+            date=date.today() - timedelta(days=offset),
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            created_by=2
+        )
+        db.session.add(session)
+        db.session.flush()
+        attendance = Attendance(
+            session_id=session.id,
+            student_id=student.id,
+            status=status,
+            marked_by=2
+        )
+        db.session.add(attendance)
+    db.session.commit()
+
+
 class TestAttendanceCalculation:
     """Test attendance percentage calculation"""
     
@@ -15,18 +37,9 @@ class TestAttendanceCalculation:
         with app.app_context():
             student = Student.query.first()
             class_obj = Class.query.first()
-            session = AttendanceSession.query.filter_by(class_id=class_obj.id).first()
             
             # Mark all as present
-            for i in range(5):
-                attendance = Attendance(
-                    session_id=session.id,
-                    student_id=student.id,
-                    status='present',
-                    marked_by=2
-                )
-                db.session.add(attendance)
-            db.session.commit()
+            _mark_in_new_sessions(class_obj, student, ['present'] * 5)
             
             percentage = calculate_attendance_percentage(student.id, class_obj.id)
             assert percentage == 100.0
@@ -36,27 +49,9 @@ class TestAttendanceCalculation:
         with app.app_context():
             student = Student.query.first()
             class_obj = Class.query.first()
-            session = AttendanceSession.query.filter_by(class_id=class_obj.id).first()
             
             # 3 present, 2 absent = 60%
-            for i in range(3):
-                attendance = Attendance(
-                    session_id=session.id,
-                    student_id=student.id,
-                    status='present',
-                    marked_by=2
-                )
-                db.session.add(attendance)
-            
-            for i in range(2):
-                attendance = Attendance(
-                    session_id=session.id,
-                    student_id=student.id,
-                    status='absent',
-                    marked_by=2
-                )
-                db.session.add(attendance)
-            db.session.commit()
+            _mark_in_new_sessions(class_obj, student, ['present'] * 3 + ['absent'] * 2)
             
             percentage = calculate_attendance_percentage(student.id, class_obj.id)
             assert percentage == 60.0
@@ -69,6 +64,8 @@ class TestAttendanceEditingLock:
         """Can edit attendance within 24 hours of session end"""
         with app.app_context():
             # Create session ending 1 hour ago
+            # Only one session per class per day is allowed
+            AttendanceSession.query.filter_by(class_id=1, date=datetime.now().date()).delete()
             session = AttendanceSession(
                 class_id=1,
                 date=datetime.now().date(),
@@ -103,6 +100,8 @@ class TestAttendanceEditingLock:
     def test_cannot_edit_finalized_session(self, app, init_database):
         """Cannot edit finalized session regardless of time"""
         with app.app_context():
+            # Only one session per class per day is allowed
+            AttendanceSession.query.filter_by(class_id=1, date=datetime.now().date()).delete()
             session = AttendanceSession(
                 class_id=1,
                 date=datetime.now().date(),
@@ -140,20 +139,11 @@ class TestAttendanceStatusTypes:
         with app.app_context():
             student = Student.query.first()
             class_obj = Class.query.first()
-            session = AttendanceSession.query.filter_by(class_id=class_obj.id).first()
             
             # 1 present, 1 late, 1 absent = 66.67%
             Attendance.query.filter_by(student_id=student.id).delete()
             
-            for status in ['present', 'late', 'absent']:
-                attendance = Attendance(
-                    session_id=session.id,
-                    student_id=student.id,
-                    status=status,
-                    marked_by=2
-                )
-                db.session.add(attendance)
-            db.session.commit()
+            _mark_in_new_sessions(class_obj, student, ['present', 'late', 'absent'])
             
             percentage = calculate_attendance_percentage(student.id, class_obj.id)
             assert percentage == 66.67
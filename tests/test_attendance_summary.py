@@ -0,0 +1,107 @@
+"""
+Test Suite for Set-Based Attendance Aggregation
+Tests: get_attendance_summary matches per-student calculation, report routes
+"""
+import pytest
+from app import (db, Student, Class, Attendance, AttendanceSession,
+                 calculate_attendance_percentage, get_attendance_summary)
+from datetime import date, time, timedelta
+
+
+def _add_sessions_with_statuses(class_obj, student, statuses):
+    """Create one session per status and mark the student with it"""
+    for offset, status in enumerate(statuses, 1):
+        session_obj = AttendanceSession(
+            class_id=class_obj.id,
+            date=date.today() - timedelta(days=offset),
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            created_by=2
+        )
+        db.session.add(session_obj)
+        db.session.flush()
+        db.session.add(Attendance(
+            session_id=session_obj.id,
+            student_id=student.id,
+            status=status,
+            marked_by=2
+        ))
+    db.session.commit()
+
+
+class TestAttendanceSummary:
+    """Test the GROUP BY aggregation helper"""
+
+    def test_summary_counts_by_status(self, app, init_database):
+        """Summary splits present, late and absent and matches percentage helper"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            _add_sessions_with_statuses(class_obj, student, ['present', 'present', 'late', 'absent'])
+
+            summary = get_attendance_summary(class_id=class_obj.id)
+            stats = summary[(student.id, class_obj.id)]
+
+            assert stats['total'] == 4
+            assert stats['present'] == 2
+            assert stats['late'] == 1
+            assert stats['absent'] == 1
+            assert stats['attended'] == 3
+            assert stats['percentage'] == calculate_attendance_percentage(student.id, class_obj.id)
+
+    def test_summary_by_student(self, app, init_database):
+        """Summary can be scoped to all classes of one student"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            _add_sessions_with_statuses(class_obj, student, ['present', 'absent'])
+
+            summary = get_attendance_summary(student_id=student.id)
+            assert list(summary.keys()) == [(student.id, class_obj.id)]
+            assert summary[(student.id, class_obj.id)]['percentage'] == 50.0
+
+    def test_summary_empty(self, app, init_database):
+        """Students without marks are absent from the summary"""
+        with app.app_context():
+            class_obj = Class.query.first()
+            assert get_attendance_summary(class_id=class_obj.id) == {}
+
+
+class TestSummaryRoutes:
+    """Test routes that render from the aggregated summary"""
+
+    def test_class_report_uses_summary(self, faculty_client, app):
+        """Class report shows aggregated totals"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            _add_sessions_with_statuses(class_obj, student, ['present', 'late', 'absent', 'absent'])
+            class_id = class_obj.id
+
+        response = faculty_client.get(f'/faculty/reports/class/{class_id}')
+        assert response.status_code == 200
+        assert b'50.0%' in response.data
+
+    def test_csv_export_uses_summary(self, faculty_client, app):
+        """CSV export rows carry total, attended, absent and percentage"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            _add_sessions_with_statuses(class_obj, student, ['present', 'late', 'absent', 'absent'])
+            class_id = class_obj.id
+
+        response = faculty_client.get(f'/faculty/export/csv/{class_id}')
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert 'ST001,Test Student,4,2,2,50.0%' in response.data.decode()
+
+    def test_student_dashboard_uses_summary(self, student_client, app):
+        """Student dashboard shows attended/total for each class"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            _add_sessions_with_statuses(class_obj, student, ['present', 'absent'])
+
+        response = student_client.get('/student/dashboard')
+        assert response.status_code == 200
+        assert b'1/2 sessions attended' in response.data
@@ -0,0 +1,167 @@
+"""
+Test Suite for Optimistic Concurrency on Attendance Edits
+Tests: version bumps, conditional updates, structured 409 conflicts, column migration
+"""
+import re
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm.exc import StaleDataError
+from app import db, Student, Attendance, AttendanceSession
+
+
+def _mark(app, status='present'):
+    with app.app_context():
+        session_obj = AttendanceSession.query.first()
+        student = Student.query.first()
+        record = Attendance(session_id=session_obj.id, student_id=student.id, status=status, marked_by=2)
+        db.session.add(record)
+        db.session.commit()
+        return record.id, session_obj.id, student.id
+
+
+class TestVersionColumn:
+    """Test the version counter on attendance rows"""
+
+    def test_version_bumps_on_update(self, app, init_database):
+        attendance_id, _, _ = _mark(app)
+        with app.app_context():
+            record = db.session.get(Attendance, attendance_id)
+            assert record.version == 1
+            record.status = 'late'
+            db.session.commit()
+            assert record.version == 2
+
+    def test_concurrent_update_raises(self, app, init_database):
+        """An UPDATE from a stale read matches no row"""
+        attendance_id, _, _ = _mark(app)
+        with app.app_context():
+            record = db.session.get(Attendance, attendance_id)
+            db.session.execute(text("UPDATE attendance SET version = version + 1, status = 'absent' WHERE id = :id"),
+                               {'id': attendance_id})
+            record.status = 'late'
+            with pytest.raises(StaleDataError):
+                db.session.commit()
+            db.session.rollback()
+
+    def test_core_inserts_start_at_one(self, faculty_client, app):
+        """Rows written outside the ORM get the server default"""
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            student = Student.query.first()
+            from app import record_checkins
+            record_checkins(session_obj.id, session_obj.class_id, session_obj.date, [student.id])
+            assert Attendance.query.one().version == 1
+
+
+class TestUpdateConflicts:
+    """Test 409 responses from the edit endpoints"""
+
+    def test_update_with_current_version(self, faculty_client, app):
+        attendance_id, _, _ = _mark(app)
+        response = faculty_client.post('/api/attendance/update',
+                                       json={'attendance_id': attendance_id, 'status': 'late', 'version': 1})
+        assert response.status_code == 200
+        assert response.get_json()['version'] == 2
+
+    def test_update_with_stale_version(self, faculty_client, app):
+        """A stale version returns the current value instead of overwriting it"""
+        attendance_id, _, _ = _mark(app)
+        faculty_client.post('/api/attendance/update',
+                            json={'attendance_id': attendance_id, 'status': 'late', 'version': 1})
+        response = faculty_client.post('/api/attendance/update',
+                                       json={'attendance_id': attendance_id, 'status': 'absent', 'version': 1})
+        assert response.status_code == 409
+        data = response.get_json()
+        assert data['conflict'] is True
+        assert data['current']['status'] == 'late'
+        assert data['current']['version'] == 2
+        with app.app_context():
+            assert db.session.get(Attendance, attendance_id).status == 'late'
+
+    def test_update_without_version_still_works(self, faculty_client, app):
+        attendance_id, _, _ = _mark(app)
+        response = faculty_client.post('/api/attendance/update',
+                                       json={'attendance_id': attendance_id, 'status': 'absent'})
+        assert response.status_code == 200
+
+    def test_mark_expecting_no_record(self, faculty_client, app):
+        """version=0 means the client saw no mark; an existing one is a conflict"""
+        _, session_id, student_id = _mark(app, status='absent')
+        response = faculty_client.post('/faculty/attendance/mark', data={
+            'session_id': session_id, 'student_id': student_id, 'status': 'present', 'version': 0})
+        assert response.status_code == 409
+        assert response.get_json()['current']['status'] == 'absent'
+
+    def test_mark_with_matching_version(self, faculty_client, app):
+        with app.app_context():
+            session_id = AttendanceSession.query.first().id
+            student_id = Student.query.first().id
+        response = faculty_client.post('/faculty/attendance/mark', data={
+            'session_id': session_id, 'student_id': student_id, 'status': 'present', 'version': 0})
+        assert response.status_code == 200
+        assert response.get_json()['version'] == 1
+        response = faculty_client.post('/faculty/attendance/mark', data={
+            'session_id': session_id, 'student_id': student_id, 'status': 'late', 'version': 1})
+        assert response.get_json()['version'] == 2
+
+
+class TestColumnMigration:
+    """Test adding the version column to an existing database"""
+
+    def test_apply_columns_adds_version(self, tmp_path):
+        from migrate_indexes import apply_columns
+        engine = create_engine(f'sqlite:///{tmp_path / "old.db"}')
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE attendance (id INTEGER PRIMARY KEY, session_id INTEGER, "
+                              "student_id INTEGER, status VARCHAR(20), marked_at DATETIME, "
+                              "marked_by INTEGER, method VARCHAR(20))"))
+            conn.execute(text("INSERT INTO attendance (session_id, student_id, status) VALUES (1, 1, 'present')"))
+            assert apply_columns(conn) == ['attendance.version']
+            assert conn.execute(text("SELECT version FROM attendance")).scalar() == 1
+            assert apply_columns(conn) == []
+
+
+class TestMarkingPageVersions:
+    """Test that the marking page's edits carry the version they were made from"""
+
+    def test_page_renders_row_versions(self, faculty_client, app):
+        attendance_id, session_id, student_id = _mark(app)
+        response = faculty_client.get(f'/faculty/session/{session_id}/mark')
+        assert re.search(rf'id="student-row-{student_id}"\s+data-version="1"'.encode(), response.data)
+
+    def test_sync_with_stale_version_conflicts(self, faculty_client, app):
+        """A queued edit made before someone else's change does not overwrite it"""
+        attendance_id, session_id, student_id = _mark(app)
+        faculty_client.post('/api/attendance/update',
+                            json={'attendance_id': attendance_id, 'status': 'late', 'version': 1})
+        response = faculty_client.post('/api/attendance/sync', json={'changes': [
+            {'key': 'k1', 'session_id': session_id, 'student_id': student_id, 'status': 'absent',
+             'marked_at': '2099-01-01T00:00:00Z', 'version': 1}]})
+        data = response.get_json()
+        assert data['results'] == {'k1': 'conflict'}
+        current = data['current'][f'{session_id}:{student_id}']
+        assert (current['status'], current['version']) == ('late', 2)
+        with app.app_context():
+            assert db.session.get(Attendance, attendance_id).status == 'late'
+
+    def test_sync_chains_queued_edits(self, faculty_client, app):
+        """Several queued edits of one student made from the same version all apply"""
+        with app.app_context():
+            session_id = AttendanceSession.query.first().id
+            student_id = Student.query.first().id
+        response = faculty_client.post('/api/attendance/sync', json={'changes': [
+            {'key': f'k{i}', 'session_id': session_id, 'student_id': student_id, 'status': status,
+             'marked_at': f'2020-01-01T00:00:0{i}Z', 'version': 0}
+            for i, status in enumerate(['present', 'late'])]})
+        data = response.get_json()
+        assert data['results'] == {'k0': 'applied', 'k1': 'applied'}
+        assert data['current'][f'{session_id}:{student_id}']['version'] == 2
+
+    def test_mark_with_stale_version(self, faculty_client, app):
+        _, session_id, student_id = _mark(app)
+        faculty_client.post('/faculty/attendance/mark', data={
+            'session_id': session_id, 'student_id': student_id, 'status': 'late', 'version': 1})
+        response = faculty_client.post('/faculty/attendance/mark', data={
+            'session_id': session_id, 'student_id': student_id, 'status': 'absent', 'version': 1})
+        assert response.status_code == 409
+        assert response.get_json()['current']['version'] == 2
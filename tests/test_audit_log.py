@@ -0,0 +1,81 @@
+"""
+Test Suite for Audit Logging
+Tests: synchronous mode, batched background writer, shutdown drain
+"""
+import time as time_module
+import pytest
+from app import db, AuditLog, AuditLogWriter
+from datetime import datetime
+
+
+def _event(action):
+    return {
+        'user_id': 1,
+        'action': action,
+        'entity_type': 'Test',
+        'entity_id': None,
+        'details': None,
+        'ip_address': '127.0.0.1',
+        'timestamp': datetime.utcnow()
+    }
+
+
+class TestSynchronousAuditLog:
+    """Test audit logging inline with the request"""
+    
+    def test_login_writes_audit_row(self, client, init_database, app):
+        """Sync mode commits the audit entry before the response returns"""
+        client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+        
+        with app.app_context():
+            assert AuditLog.query.filter_by(action='Login').count() == 1
+
+
+class TestAuditLogWriter:
+    """Test the queued, batched audit writer"""
+    
+    def test_flush_writes_queued_events(self, app, init_database):
+        """Queued events are written in bulk on flush"""
+        writer = AuditLogWriter(app)
+        for i in range(5):
+            writer.queue.put(_event(f'Event {i}'))
+        
+        writer.flush()
+        
+        with app.app_context():
+            assert AuditLog.query.filter(AuditLog.action.like('Event %')).count() == 5
+    
+    def test_background_thread_flushes_on_batch_size(self, app, init_database):
+        """The writer thread flushes as soon as a full batch is queued"""
+        app.config['AUDIT_LOG_BATCH_SIZE'] = 3
+        app.config['AUDIT_LOG_FLUSH_INTERVAL'] = 30.0
+        writer = AuditLogWriter(app)
+        try:
+            for i in range(3):
+                writer.enqueue(_event(f'Batch {i}'))
+            
+            for _ in range(50):
+                with app.app_context():
+                    if AuditLog.query.filter(AuditLog.action.like('Batch %')).count() == 3:
+                        break
+                time_module.sleep(0.1)
+            
+            with app.app_context():
+                assert AuditLog.query.filter(AuditLog.action.like('Batch %')).count() == 3
+        finally:
+            writer.stop()
+            app.config['AUDIT_LOG_BATCH_SIZE'] = 100
+            app.config['AUDIT_LOG_FLUSH_INTERVAL'] = 2.0
+    
+    def test_stop_drains_queue(self, app, init_database):
+        """Stopping the writer writes everything still queued"""
+        app.config['AUDIT_LOG_FLUSH_INTERVAL'] = 30.0
+        writer = AuditLogWriter(app)
+        try:
+            writer.enqueue(_event('Shutdown'))
+            writer.stop()
+            
+            with app.app_context():
+                assert AuditLog.query.filter_by(action='Shutdown').count() == 1
+        finally:
+            app.config['AUDIT_LOG_FLUSH_INTERVAL'] = 2.0
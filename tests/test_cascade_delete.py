@@ -0,0 +1,202 @@
+"""
+Test Suite for Set-Based Cascade Deletion
+Tests: dependent rows removed, fixed statement count, background jobs, routes
+"""
+import threading
+import pytest
+from sqlalchemy import event, text
+from app import (db, User, Student, Faculty, Course, Class, Enrollment, Attendance, AttendanceSession,
+                 AttendanceRollup, report_cache, cascade_delete, cascade_delete_size,
+                 start_cascade_delete_job, CASCADE_PLANS)
+from datetime import date, time, timedelta
+
+
+def _add_marked_sessions(class_obj, student, count):
+    for offset in range(1, count + 1):
+        session_obj = AttendanceSession(
+            class_id=class_obj.id,
+            date=date.today() - timedelta(days=offset),
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            created_by=2
+        )
+        db.session.add(session_obj)
+        db.session.flush()
+        db.session.add(Attendance(session_id=session_obj.id, student_id=student.id,
+                                  status='present', marked_by=2))
+    db.session.commit()
+
+
+def _count_deletes(fn, *args):
+    """Run fn and return (result, number of DELETE statements it issued)"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('DELETE'):
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        result = fn(*args)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return result, len(statements)
+
+
+class TestCascadeDeleteService:
+    """Test the cascade delete service directly"""
+
+    def test_course_delete_removes_dependents(self, app, init_database):
+        """Deleting a course removes classes, sessions, marks, enrollments and rollups"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            course_id = class_obj.course_id
+            _add_marked_sessions(class_obj, student, 3)
+
+            counts = cascade_delete('course', course_id)
+
+            assert counts['attendance'] == 3
+            assert counts['attendance_sessions'] == 4
+            assert counts['enrollments'] == 1
+            assert counts['attendance_rollups'] == 1
+            assert counts['classes'] == 1
+            assert counts['courses'] == 1
+            assert Course.query.get(course_id) is None
+            assert AttendanceSession.query.count() == 0
+            assert AttendanceRollup.query.count() == 0
+            assert Student.query.count() == 1
+
+    def test_statement_count_is_fixed(self, app, init_database):
+        """The number of DELETE statements does not grow with the session count"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            _add_marked_sessions(class_obj, student, 20)
+
+            course_id = class_obj.course_id
+
+            counts, deletes = _count_deletes(cascade_delete, 'course', course_id)
+
+            assert counts['attendance'] == 20
+            assert deletes == len(CASCADE_PLANS['course'](course_id))
+
+    def test_user_delete_removes_student_records(self, app, init_database):
+        """Deleting a student user removes the profile, marks and enrollments"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            _add_marked_sessions(class_obj, student, 2)
+            user_id = student.user_id
+
+            counts = cascade_delete('user', user_id)
+
+            assert counts['attendance'] == 2
+            assert counts['enrollments'] == 1
+            assert counts['students'] == 1
+            assert counts['users'] == 1
+            assert User.query.get(user_id) is None
+            assert Class.query.count() == 1
+
+    def test_faculty_with_classes_refused(self, app, init_database):
+        """A faculty user who still teaches is not deleted"""
+        with app.app_context():
+            with pytest.raises(ValueError, match='still teaches classes'):
+                cascade_delete('user', 2)
+            assert User.query.get(2) is not None
+
+    def test_faculty_delete_leaves_no_orphans(self, app, init_database):
+        """Marks and sessions a deleted faculty user recorded lose the reference, not the row"""
+        with app.app_context():
+            user = User(username='faculty2', email='f2@test.com', password_hash='x',
+                        role='faculty', full_name='Second Faculty')
+            db.session.add(user)
+            db.session.flush()
+            replacement = Faculty(user_id=user.id, faculty_id='FAC002', department='Computer Science')
+            db.session.add(replacement)
+            db.session.flush()
+            class_obj = Class.query.first()
+            class_obj.faculty_id = replacement.id
+            db.session.commit()
+            _add_marked_sessions(class_obj, Student.query.first(), 2)
+            AttendanceSession.query.update({'finalized_by': 2, 'is_finalized': True})
+            db.session.commit()
+
+            cascade_delete('user', 2)
+
+            assert db.session.execute(text('PRAGMA foreign_key_check')).fetchall() == []
+            assert Attendance.query.count() == 2
+            assert Attendance.query.filter(Attendance.marked_by.isnot(None)).count() == 0
+            assert AttendanceSession.query.filter(db.or_(AttendanceSession.created_by.isnot(None),
+                                                         AttendanceSession.finalized_by.isnot(None))).count() == 0
+
+    def test_size_matches_deleted_rows(self, app, init_database):
+        """cascade_delete_size predicts the rows removed"""
+        with app.app_context():
+            class_id = Class.query.first().id
+            expected = cascade_delete_size('class', class_id)
+
+            counts = cascade_delete('class', class_id)
+
+            assert expected == sum(counts.values())
+
+    def test_clears_report_cache(self, app, init_database):
+        """Cached reports are dropped after a cascade delete"""
+        with app.app_context():
+            report_cache.set(('key',), [{'row': 1}])
+            cascade_delete('class', Class.query.first().id)
+            assert len(report_cache) == 0
+
+    def test_background_job(self, app, init_database):
+        """A background job deletes the object in its own app context"""
+        with app.app_context():
+            course_id = Course.query.first().id
+
+        start_cascade_delete_job('course', course_id).join(timeout=10)
+
+        with app.app_context():
+            assert Course.query.get(course_id) is None
+
+
+class TestCascadeDeleteRoutes:
+    """Test the admin delete routes use the service"""
+
+    def test_delete_class_route(self, admin_client, app):
+        """Admin can delete a class with its sessions"""
+        with app.app_context():
+            class_id = Class.query.first().id
+
+        response = admin_client.post(f'/admin/classes/{class_id}/delete', follow_redirects=True)
+
+        assert response.status_code == 200
+        assert b'deleted successfully' in response.data
+        with app.app_context():
+            assert Class.query.get(class_id) is None
+            assert AttendanceSession.query.filter_by(class_id=class_id).count() == 0
+
+    def test_delete_teaching_faculty_route(self, admin_client, app):
+        """The delete route explains why a teaching faculty user is kept"""
+        response = admin_client.post('/admin/users/2/delete', follow_redirects=True)
+
+        assert b'still teaches classes' in response.data
+        with app.app_context():
+            assert User.query.get(2) is not None
+
+    def test_delete_course_in_background(self, admin_client, app):
+        """Deletes above the size threshold are handed to a background job"""
+        with app.app_context():
+            course_id = Course.query.first().id
+
+        app.config['CASCADE_DELETE_BACKGROUND_ROWS'] = 1
+        try:
+            response = admin_client.post(f'/admin/courses/{course_id}/delete', follow_redirects=True)
+        finally:
+            app.config['CASCADE_DELETE_BACKGROUND_ROWS'] = 50000
+
+        assert response.status_code == 200
+        assert b'being deleted in the background' in response.data
+        for thread in threading.enumerate():
+            if thread.name == f'cascade-delete-course-{course_id}':
+                thread.join(timeout=10)
+        with app.app_context():
+            assert Course.query.get(course_id) is None
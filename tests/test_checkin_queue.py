@@ -0,0 +1,141 @@
+"""
+Test Suite for the Check-in Ingestion Queue
+Tests: coalesced batch writes, check-in states, status API
+"""
+import pytest
+from sqlalchemy import event
+from app import (db, User, Student, Enrollment, Attendance, AttendanceSession, CheckinQueue,
+                 make_checkin_token, CHECKIN_PENDING, CHECKIN_COMMITTED, CHECKIN_ALREADY_MARKED,
+                 CHECKIN_REJECTED)
+
+
+def _enroll_students(class_id, count):
+    """Add count students to the class and return their ids"""
+    ids = []
+    for i in range(count):
+        user = User(username=f'queue{i}', email=f'queue{i}@test.com', password_hash='x',
+                    role='student', full_name=f'Queue Student {i}')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, student_id=f'QS{i:03d}', department='Computer Science',
+                          year=1, section='A')
+        db.session.add(student)
+        db.session.flush()
+        db.session.add(Enrollment(student_id=student.id, class_id=class_id))
+        ids.append(student.id)
+    db.session.commit()
+    return ids
+
+
+class TestCheckinQueue:
+    """Test queueing and coalescing check-ins"""
+
+    def test_sync_submit_commits(self, app, init_database):
+        """Without the background thread a submit is written immediately"""
+        with app.app_context():
+            writer = CheckinQueue(app)
+            session_obj = AttendanceSession.query.first()
+            student = Student.query.first()
+            args = (session_obj.id, session_obj.class_id, session_obj.date, student.id)
+
+            assert writer.submit(*args) == CHECKIN_COMMITTED
+            assert writer.submit(*args) == CHECKIN_ALREADY_MARKED
+            assert Attendance.query.filter_by(session_id=session_obj.id, method='qr').count() == 1
+
+    def test_unenrolled_rejected(self, app, init_database):
+        """A student outside the class is rejected"""
+        with app.app_context():
+            writer = CheckinQueue(app)
+            session_obj = AttendanceSession.query.first()
+            assert writer.submit(session_obj.id, session_obj.class_id, session_obj.date, 9999) == CHECKIN_REJECTED
+
+    def test_async_batch_is_coalesced(self, app, init_database):
+        """Queued check-ins are pending until the writer runs, then land in one insert"""
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            student_ids = _enroll_students(session_obj.class_id, 25)
+            writer = CheckinQueue(app)
+            inserts = []
+
+            def record(conn, cursor, statement, parameters, context, executemany):
+                if statement.startswith('INSERT INTO attendance '):
+                    inserts.append(statement)
+
+            # Hold the background thread back so the whole burst is drained as one batch
+            writer.start = lambda: None
+            app.config['CHECKIN_QUEUE_ASYNC'] = True
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                states = [writer.submit(session_obj.id, session_obj.class_id, session_obj.date, student_id)
+                          for student_id in student_ids]
+                assert set(states) == {CHECKIN_PENDING}
+                writer.flush()
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+                app.config['CHECKIN_QUEUE_ASYNC'] = False
+
+            assert len(inserts) == 1
+            assert {writer.state(session_obj.id, sid) for sid in student_ids} == {CHECKIN_COMMITTED}
+            assert Attendance.query.filter_by(session_id=session_obj.id).count() == 25
+
+    def test_background_writer_commits(self, app, init_database):
+        """The writer thread commits queued check-ins on stop"""
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            student = Student.query.first()
+            writer = CheckinQueue(app)
+            app.config['CHECKIN_QUEUE_ASYNC'] = True
+            try:
+                writer.submit(session_obj.id, session_obj.class_id, session_obj.date, student.id)
+                writer.stop()
+            finally:
+                app.config['CHECKIN_QUEUE_ASYNC'] = False
+
+            assert writer.state(session_obj.id, student.id) == CHECKIN_COMMITTED
+
+    def test_state_falls_back_to_database(self, app, init_database):
+        """States evicted from memory are answered from the attendance table"""
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            student = Student.query.first()
+            CheckinQueue(app).submit(session_obj.id, session_obj.class_id, session_obj.date, student.id)
+
+            fresh = CheckinQueue(app)
+            assert fresh.state(session_obj.id, student.id) == CHECKIN_COMMITTED
+            assert fresh.state(session_obj.id, 9999) is None
+
+    def test_state_memory_is_bounded(self, app, init_database):
+        """Only the most recent states are kept"""
+        with app.app_context():
+            writer = CheckinQueue(app)
+            app.config['CHECKIN_STATUS_MAX_ENTRIES'] = 2
+            try:
+                for student_id in (1, 2, 3):
+                    writer._remember((1, student_id), CHECKIN_PENDING)
+            finally:
+                app.config['CHECKIN_STATUS_MAX_ENTRIES'] = 20000
+            assert list(writer._states) == [(1, 2), (1, 3)]
+
+
+class TestCheckinApi:
+    """Test the JSON check-in and status endpoints"""
+
+    def test_api_checkin_and_status(self, student_client, app):
+        """The API accepts a token and reports the check-in state"""
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            token = make_checkin_token(session_obj)
+            session_id = session_obj.id
+
+        response = student_client.post('/api/checkin', json={'token': token})
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['state'] == CHECKIN_COMMITTED
+
+        status = student_client.get(data['status_url']).get_json()
+        assert status == {'success': True, 'session_id': session_id, 'state': CHECKIN_COMMITTED}
+
+    def test_api_rejects_bad_token(self, student_client):
+        """An invalid token is a 400"""
+        response = student_client.post('/api/checkin', json={'token': 'nope'})
+        assert response.status_code == 400
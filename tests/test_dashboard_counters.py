@@ -0,0 +1,81 @@
+"""
+Test Suite for the Admin Dashboard Counters
+Tests: counters follow ORM and bulk writes and cascade deletes, rebuild, constant-query dashboard
+"""
+from sqlalchemy import event, text
+from app import db, Course, Faculty, entity_counts, rebuild_entity_counts, cascade_delete
+
+
+def _add_course(code='CS201'):
+    course = Course(course_code=code, course_name='Data Structures', department='Computer Science', credits=3)
+    db.session.add(course)
+    db.session.commit()
+    return course.id
+
+
+class TestEntityCounts:
+    """Test that the stored totals match the tables"""
+
+    def test_fixture_totals(self, app, init_database):
+        with app.app_context():
+            assert entity_counts() == {'students': 1, 'faculty': 1, 'courses': 1, 'classes': 1}
+
+    def test_orm_insert_and_delete(self, app, init_database):
+        with app.app_context():
+            course_id = _add_course()
+            assert entity_counts()['courses'] == 2
+            db.session.delete(db.session.get(Course, course_id))
+            db.session.commit()
+            assert entity_counts()['courses'] == 1
+
+    def test_rolled_back_insert_not_counted(self, app, init_database):
+        with app.app_context():
+            db.session.add(Course(course_code='CS999', course_name='Draft', department='CS', credits=1))
+            db.session.flush()
+            db.session.rollback()
+            assert entity_counts()['courses'] == 1
+
+    def test_bulk_delete(self, app, init_database):
+        with app.app_context():
+            Faculty.query.delete()
+            db.session.commit()
+            assert entity_counts()['faculty'] == 0
+
+    def test_cascade_delete(self, app, init_database):
+        with app.app_context():
+            cascade_delete('course', Course.query.first().id)
+            assert entity_counts() == {'students': 1, 'faculty': 1, 'courses': 0, 'classes': 0}
+
+    def test_rebuild_fixes_drift(self, app, init_database):
+        """Raw SQL bypasses the counters until a rebuild"""
+        with app.app_context():
+            db.session.execute(text('DELETE FROM enrollments'))
+            db.session.execute(text('DELETE FROM students'))
+            db.session.commit()
+            assert entity_counts()['students'] == 1
+            assert rebuild_entity_counts()['students'] == 0
+            assert entity_counts()['students'] == 0
+
+
+class TestDashboard:
+    """Test the dashboard renders from the counters"""
+
+    def test_no_count_queries(self, admin_client, app):
+        with app.app_context():
+            _add_course()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = admin_client.get('/admin/dashboard')
+        finally:
+            with app.app_context():
+                event.remove(db.engine, 'before_cursor_execute', record)
+
+        assert response.status_code == 200
+        assert not any('count(' in s.lower() for s in statements)
+        assert any('FROM entity_counts' in s for s in statements)
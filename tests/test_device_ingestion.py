@@ -0,0 +1,209 @@
+"""
+Test Suite for Device Event Ingestion
+Tests: room/time session matching, idempotent re-sends, batching, device API and NDJSON streaming
+"""
+import json
+import pytest
+from datetime import date, datetime, time
+from app import (db, Class, Attendance, AttendanceSession, AttendanceDevice, AttendanceRollup,
+                 DeviceEventIngestor, register_device, parse_device_event)
+
+
+def _setup_room(app):
+    """Put the fixture class in Lab 101 and register a reader there"""
+    with app.app_context():
+        class_obj = Class.query.first()
+        class_obj.room = 'Lab 101'
+        db.session.commit()
+        return register_device('DOOR-1', 'Lab 101')
+
+
+def _event(minute, identifier='ST001', reader_id='DOOR-1', hour=9):
+    stamp = datetime.combine(date.today(), time(hour, minute)).isoformat()
+    return {'reader_id': reader_id, 'card_or_student_id': identifier, 'timestamp': stamp}
+
+
+class TestDeviceEventMatching:
+    """Test matching swipes to sessions by room and time"""
+
+    def test_swipe_marks_present(self, app, init_database):
+        """A swipe inside the session window marks the student with the device method"""
+        _setup_room(app)
+        with app.app_context():
+            counts = DeviceEventIngestor().ingest([_event(5)])
+            assert counts['marked'] == 1
+            mark = Attendance.query.one()
+            assert (mark.status, mark.method) == ('present', 'rfid')
+            assert AttendanceRollup.query.one().present == 1
+
+    def test_early_and_late_swipes(self, app, init_database):
+        """Swipes shortly before the start count; swipes well after it are late"""
+        _setup_room(app)
+        with app.app_context():
+            early = DeviceEventIngestor().ingest([_event(50, hour=8)])
+            assert early['marked'] == 1
+            Attendance.query.delete()
+            db.session.commit()
+
+            DeviceEventIngestor().ingest([_event(30)])
+            assert Attendance.query.one().status == 'late'
+
+    def test_swipe_outside_any_session(self, app, init_database):
+        """Swipes too early, or in another room, match nothing"""
+        _setup_room(app)
+        with app.app_context():
+            register_device('DOOR-2', 'Lab 202')
+            counts = DeviceEventIngestor().ingest([_event(0, hour=8), _event(5, reader_id='DOOR-2')])
+            assert counts['no_session'] == 2
+            assert Attendance.query.count() == 0
+
+    def test_unknown_reader_student_and_bad_events(self, app, init_database):
+        """Unknown readers, unknown students and malformed events are counted, not raised"""
+        _setup_room(app)
+        with app.app_context():
+            counts = DeviceEventIngestor().ingest([
+                _event(5, reader_id='NOPE'),
+                _event(5, identifier='ST999'),
+                {'reader_id': 'DOOR-1', 'card_or_student_id': 'ST001', 'timestamp': 'yesterday'},
+                {'reader_id': 'DOOR-1'},
+            ])
+            assert counts['unknown_reader'] == 1
+            assert counts['unknown_student'] == 1
+            assert counts['invalid'] == 2
+            assert counts['received'] == 4
+
+    def test_resend_is_idempotent(self, app, init_database):
+        """Repeated swipes and re-sent batches never mark a student twice"""
+        _setup_room(app)
+        with app.app_context():
+            first = DeviceEventIngestor().ingest([_event(5), _event(6)])
+            assert (first['marked'], first['duplicate']) == (1, 1)
+            again = DeviceEventIngestor().ingest([_event(5), _event(6)])
+            assert (again['marked'], again['duplicate']) == (0, 2)
+            assert Attendance.query.count() == 1
+            assert AttendanceRollup.query.one().total == 1
+
+    def test_finalized_session_rejects(self, app, init_database):
+        """Swipes for a finalized session are rejected"""
+        _setup_room(app)
+        with app.app_context():
+            AttendanceSession.query.first().is_finalized = True
+            db.session.commit()
+            counts = DeviceEventIngestor().ingest([_event(5)])
+            assert counts['rejected'] == 1
+            assert Attendance.query.count() == 0
+
+    def test_small_batches(self, app, init_database):
+        """Events spanning several batches are all processed"""
+        _setup_room(app)
+        app.config['DEVICE_BATCH_SIZE'] = 2
+        try:
+            with app.app_context():
+                counts = DeviceEventIngestor().ingest(_event(minute) for minute in range(5))
+                assert counts['received'] == 5
+                assert (counts['marked'], counts['duplicate']) == (1, 4)
+        finally:
+            app.config['DEVICE_BATCH_SIZE'] = 1000
+
+    def test_timezone_aware_timestamp(self, app, init_database):
+        """Offset timestamps are converted to local time"""
+        parsed = parse_device_event({'reader_id': 'R', 'card_or_student_id': 'S',
+                                     'timestamp': '2025-01-01T09:00:00+00:00'})
+        assert parsed[2].tzinfo is None
+
+
+class TestDeviceEventsApi:
+    """Test the device ingestion endpoint"""
+
+    def test_requires_device_key(self, client, init_database, app):
+        """Requests without a valid key are refused"""
+        _setup_room(app)
+        response = client.post('/api/devices/events', json={'events': [_event(5)]})
+        assert response.status_code == 401
+        response = client.post('/api/devices/events', json={'events': []},
+                               headers={'X-Device-Key': 'wrong'})
+        assert response.status_code == 401
+
+    def test_json_batch(self, client, init_database, app):
+        """A JSON batch is ingested and the device is marked as seen"""
+        key = _setup_room(app)
+        response = client.post('/api/devices/events', json={'events': [_event(5)]},
+                               headers={'X-Device-Key': key})
+        assert response.status_code == 200
+        assert response.get_json()['results']['marked'] == 1
+        with app.app_context():
+            assert AttendanceDevice.query.one().last_seen_at is not None
+
+    def test_device_cannot_post_for_other_reader(self, client, init_database, app):
+        """Events naming another reader are not trusted"""
+        key = _setup_room(app)
+        with app.app_context():
+            register_device('DOOR-2', 'Lab 101')
+        response = client.post('/api/devices/events', json={'events': [_event(5, reader_id='DOOR-2')]},
+                               headers={'X-Device-Key': key})
+        assert response.get_json()['results']['unknown_reader'] == 1
+
+    def test_ndjson_stream(self, client, init_database, app):
+        """NDJSON bodies are read line by line"""
+        key = _setup_room(app)
+        body = '\n'.join(json.dumps(_event(minute)) for minute in (5, 6)) + '\n'
+        response = client.post('/api/devices/events', data=body, content_type='application/x-ndjson',
+                               headers={'X-Device-Key': key})
+        results = response.get_json()['results']
+        assert (results['marked'], results['duplicate']) == (1, 1)
+
+    def test_malformed_body(self, client, init_database, app):
+        """Bodies that are not an event list are rejected"""
+        key = _setup_room(app)
+        response = client.post('/api/devices/events', json={'events': 'nope'},
+                               headers={'X-Device-Key': key})
+        assert response.status_code == 400
+        response = client.post('/api/devices/events', data='{not json\n', content_type='application/x-ndjson',
+                               headers={'X-Device-Key': key})
+        assert response.status_code == 400
+
+    def test_malformed_line_reports_applied_batches(self, client, init_database, app):
+        """Batches committed before a bad NDJSON line are reported with the error"""
+        key = _setup_room(app)
+        app.config['DEVICE_BATCH_SIZE'] = 1
+        try:
+            body = json.dumps(_event(5)) + '\n{not json\n' + json.dumps(_event(6)) + '\n'
+            response = client.post('/api/devices/events', data=body, content_type='application/x-ndjson',
+                                   headers={'X-Device-Key': key})
+        finally:
+            app.config['DEVICE_BATCH_SIZE'] = 1000
+        assert response.status_code == 400
+        data = response.get_json()
+        assert 'line 2' in data['message']
+        assert data['partial'] is True and data['results']['marked'] == 1
+        with app.app_context():
+            assert Attendance.query.count() == 1
+
+    def test_large_json_body_rejected(self, client, init_database, app):
+        """Large uploads must be streamed as NDJSON"""
+        key = _setup_room(app)
+        app.config['DEVICE_JSON_MAX_BYTES'] = 64
+        try:
+            response = client.post('/api/devices/events', json={'events': [_event(5), _event(6)]},
+                                   headers={'X-Device-Key': key})
+        finally:
+            app.config['DEVICE_JSON_MAX_BYTES'] = 1024 * 1024
+        assert response.status_code == 413
+
+
+class TestRegisterDevice:
+    """Test registering readers"""
+
+    def test_rekey_replaces_old_key(self, app, init_database):
+        """Registering a reader again issues a new key and keeps one row"""
+        with app.app_context():
+            first = register_device('DOOR-9', 'Lab 101')
+            second = register_device('DOOR-9', 'Lab 101', kind='biometric')
+            assert first != second
+            device = AttendanceDevice.query.one()
+            assert device.kind == 'biometric'
+
+    def test_bad_kind(self, app, init_database):
+        with app.app_context():
+            with pytest.raises(ValueError):
+                register_device('DOOR-9', 'Lab 101', kind='nfc')
@@ -4,7 +4,7 @@ Tests: Session creation, attendance marking, reports
 """
 import pytest
 from app import db, User, Faculty, Student, Course, Class, AttendanceSession, Attendance, Enrollment
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timedelta
 
 
 class TestFacultyAuthentication:
@@ -138,3 +138,78 @@ class TestFacultyReports:
         """Faculty can access reports page"""
         response = faculty_client.get('/faculty/reports')
         assert response.status_code == 200
+
+
+class TestFacultyBulkMarking:
+    """Test marking a whole roster in one request"""
+    
+    def test_bulk_mark_creates_and_updates(self, faculty_client, app):
+        """Bulk marking upserts every student's row in one call"""
+        with app.app_context():
+            session = AttendanceSession.query.first()
+            student = Student.query.first()
+            session_id, student_id = session.id, student.id
+        
+        response = faculty_client.post('/api/attendance/bulk', json={
+            'session_id': session_id,
+            'records': [{'student_id': student_id, 'status': 'present'}]
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['success'] == True
+        assert data['marked'] == 1
+        first_id = data['attendance_ids'][str(student_id)]
+        
+        response = faculty_client.post('/api/attendance/bulk', json={
+            'session_id': session_id,
+            'records': [{'student_id': student_id, 'status': 'late'}]
+        })
+        assert response.get_json()['attendance_ids'][str(student_id)] == first_id
+        
+        with app.app_context():
+            records = Attendance.query.filter_by(session_id=session_id).all()
+            assert len(records) == 1
+            assert records[0].status == 'late'
+    
+    def test_bulk_mark_rejects_invalid_status(self, faculty_client, app):
+        """Unknown statuses reject the whole batch"""
+        with app.app_context():
+            session = AttendanceSession.query.first()
+            student = Student.query.first()
+            session_id, student_id = session.id, student.id
+        
+        response = faculty_client.post('/api/attendance/bulk', json={
+            'session_id': session_id,
+            'records': [{'student_id': student_id, 'status': 'sleeping'}]
+        })
+        assert response.status_code == 400
+        
+        with app.app_context():
+            assert Attendance.query.filter_by(session_id=session_id).count() == 0
+    
+    def test_bulk_mark_rejects_unenrolled_student(self, faculty_client, app):
+        """Students outside the class roster are reported back"""
+        with app.app_context():
+            session_id = AttendanceSession.query.first().id
+        
+        response = faculty_client.post('/api/attendance/bulk', json={
+            'session_id': session_id,
+            'records': [{'student_id': 9999, 'status': 'present'}]
+        })
+        assert response.status_code == 400
+        assert response.get_json()['student_ids'] == [9999]
+    
+    def test_bulk_mark_expired_session(self, faculty_client, app):
+        """Sessions past the 24-hour window cannot be bulk marked"""
+        with app.app_context():
+            session = AttendanceSession.query.first()
+            session.date = date.today() - timedelta(days=3)
+            db.session.commit()
+            session_id = session.id
+            student_id = Student.query.first().id
+        
+        response = faculty_client.post('/api/attendance/bulk', json={
+            'session_id': session_id,
+            'records': [{'student_id': student_id, 'status': 'present'}]
+        })
+        assert response.status_code == 400
@@ -175,6 +175,8 @@ class TestAPIAttendanceUpdate:
             # Create a fresh session
             class_obj = Class.query.first()
             if class_obj:
+                # Only one session per class per day is allowed
+                AttendanceSession.query.filter_by(class_id=class_obj.id, date=datetime.now().date()).delete()
                 new_session = AttendanceSession(
                     class_id=class_obj.id,
                     date=datetime.now().date(),
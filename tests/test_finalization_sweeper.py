@@ -0,0 +1,118 @@
+"""
+Test Suite for the Finalization Sweeper
+Tests: bulk finalization of expired sessions, window boundaries, background thread, lock checks
+"""
+import time as time_module
+from datetime import date, datetime, time, timedelta
+from app import (db, Class, AttendanceSession, AuditLog, Student, can_edit_attendance,
+                 finalize_expired_sessions, FinalizationSweeper, report_cache)
+
+
+def _add_session(days_ago, end=time(10, 0)):
+    session_obj = AttendanceSession(class_id=Class.query.first().id, date=date.today() - timedelta(days=days_ago),
+                                    start_time=time(9, 0), end_time=end, created_by=2)
+    db.session.add(session_obj)
+    db.session.commit()
+    return session_obj.id
+
+
+class TestFinalizeExpiredSessions:
+    """Test the bulk finalization query"""
+
+    def test_finalizes_only_expired(self, app, init_database):
+        with app.app_context():
+            old_id = _add_session(3)
+            today_id = AttendanceSession.query.filter_by(date=date.today()).one().id
+
+            assert finalize_expired_sessions() == 1
+            old = db.session.get(AttendanceSession, old_id)
+            assert old.is_finalized and not old.is_active and old.finalized_at is not None
+            assert not db.session.get(AttendanceSession, today_id).is_finalized
+
+    def test_window_boundary(self, app, init_database):
+        """A session locks exactly when its end time plus the window has passed"""
+        with app.app_context():
+            session_id = _add_session(1)
+            deadline = datetime.combine(date.today() - timedelta(days=1), time(10, 0)) + timedelta(hours=24)
+
+            assert finalize_expired_sessions(now=deadline) == 0
+            assert finalize_expired_sessions(now=deadline + timedelta(seconds=1)) == 1
+            assert db.session.get(AttendanceSession, session_id).is_finalized
+
+    def test_repeat_sweep_is_noop(self, app, init_database):
+        """Finalized sessions are not touched again and the sweep is audited once"""
+        with app.app_context():
+            _add_session(5)
+            _add_session(6)
+            assert finalize_expired_sessions() == 2
+            assert finalize_expired_sessions() == 0
+            assert AuditLog.query.filter_by(action='Auto-finalize Sessions').count() == 1
+
+    def test_idle_sweep_keeps_report_cache(self, app, init_database):
+        """A sweep that finalizes nothing leaves cached reports in place"""
+        with app.app_context():
+            report_cache.set(('key',), [{'row': 1}])
+            assert finalize_expired_sessions() == 0
+            assert report_cache.get(('key',)) == [{'row': 1}]
+
+            _add_session(3)
+            report_cache.set(('key',), [{'row': 1}])
+            assert finalize_expired_sessions() == 1
+            assert report_cache.get(('key',)) is None
+
+    def test_null_flag_counts_as_open(self, app, init_database):
+        with app.app_context():
+            session_id = _add_session(4)
+            db.session.get(AttendanceSession, session_id).is_finalized = None
+            db.session.commit()
+            assert finalize_expired_sessions() == 1
+
+
+class TestLockChecks:
+    """Test that edit checks agree with the sweeper"""
+
+    def test_can_edit_until_deadline(self, app, init_database):
+        with app.app_context():
+            assert can_edit_attendance(AttendanceSession.query.first())
+            expired = db.session.get(AttendanceSession, _add_session(2))
+            assert not can_edit_attendance(expired)
+
+    def test_mark_rejected_on_finalized_session(self, faculty_client, app):
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            session_obj.is_finalized = True
+            db.session.commit()
+            session_id, student_id = session_obj.id, Student.query.first().id
+        response = faculty_client.post('/faculty/attendance/mark', data={
+            'session_id': session_id, 'student_id': student_id, 'status': 'present'})
+        assert response.status_code == 400
+        assert b'finalized' in response.data
+
+
+class TestSweeperThread:
+    """Test the background sweeper"""
+
+    def test_thread_sweeps_and_stops(self, app, init_database):
+        with app.app_context():
+            session_id = _add_session(3)
+
+        sweeper = FinalizationSweeper(app)
+        sweeper.start()
+        try:
+            deadline = time_module.time() + 5
+            while time_module.time() < deadline:
+                with app.app_context():
+                    if db.session.get(AttendanceSession, session_id).is_finalized:
+                        break
+                time_module.sleep(0.05)
+        finally:
+            sweeper.stop()
+
+        with app.app_context():
+            assert db.session.get(AttendanceSession, session_id).is_finalized
+        assert sweeper._thread is None
+
+    def test_not_started_when_disabled(self, client, app):
+        from app import finalization_sweeper
+        client.get('/login')
+        assert finalization_sweeper._thread is None
@@ -0,0 +1,136 @@
+"""
+Test Suite for the Finalized Session Cache
+Tests: cached mark vectors, current rosters, open-tail queries, LRU bound, id reuse and delete safety
+"""
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import event, text
+from app import (db, Class, Student, Attendance, AttendanceSession, finalized_session_cache,
+                 FinalizedSessionCache, cascade_delete)
+
+
+def _finalized_session(status='late', days_ago=3):
+    session_obj = AttendanceSession(class_id=Class.query.first().id, date=date.today() - timedelta(days=days_ago),
+                                    start_time=time(9, 0), end_time=time(10, 0), created_by=2,
+                                    is_finalized=True, finalized_at=datetime.utcnow())
+    db.session.add(session_obj)
+    db.session.flush()
+    db.session.add(Attendance(session_id=session_obj.id, student_id=Student.query.first().id,
+                              status=status, marked_by=2))
+    db.session.commit()
+    return session_obj.id
+
+
+def _count_statements(app, fn):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = fn()
+    finally:
+        with app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return response, statements
+
+
+class TestFinalizedSessionCache:
+    """Test the cache itself"""
+
+    def test_marks_loaded_once(self, app, init_database):
+        with app.app_context():
+            finalized_session_cache.clear()
+            session_obj = db.session.get(AttendanceSession, _finalized_session())
+            first = finalized_session_cache.marks([session_obj])
+            student_id = Student.query.first().id
+            assert first[session_obj.id][student_id].status == 'late'
+
+            # The cache is authoritative: a change behind its back is not seen
+            db.session.execute(text("UPDATE attendance SET status = 'absent'"))
+            db.session.commit()
+            assert finalized_session_cache.marks([session_obj])[session_obj.id][student_id].status == 'late'
+
+    def test_lru_bound(self, app, init_database):
+        app.config['FINALIZED_CACHE_MAX_ENTRIES'] = 2
+        try:
+            with app.app_context():
+                cache = FinalizedSessionCache(app)
+                sessions = [db.session.get(AttendanceSession, _finalized_session(days_ago=days))
+                            for days in (3, 4, 5)]
+                cache.marks(sessions)
+                assert len(cache) == 2
+        finally:
+            app.config['FINALIZED_CACHE_MAX_ENTRIES'] = 5000
+
+    def test_reused_id_misses(self, app, init_database):
+        """A new session with an old id does not see the old entry"""
+        with app.app_context():
+            cache = FinalizedSessionCache(app)
+            session_obj = db.session.get(AttendanceSession, _finalized_session())
+            cache.marks([session_obj])
+            replacement = AttendanceSession(id=session_obj.id, class_id=session_obj.class_id,
+                                            date=session_obj.date, start_time=time(9, 0), end_time=time(10, 0),
+                                            created_at=session_obj.created_at + timedelta(seconds=1))
+            assert cache.key(replacement) != cache.key(session_obj)
+
+    def test_cascade_delete_clears(self, app, init_database):
+        with app.app_context():
+            session_obj = db.session.get(AttendanceSession, _finalized_session())
+            finalized_session_cache.marks([session_obj])
+            assert len(finalized_session_cache) > 0
+            cascade_delete('class', session_obj.class_id)
+            assert len(finalized_session_cache) == 0
+
+
+class TestCachedPages:
+    """Test pages that read finalized sessions through the cache"""
+
+    def test_student_page_queries_only_open_tail(self, student_client, app):
+        with app.app_context():
+            finalized_session_cache.clear()
+            _finalized_session('late')
+            class_id = Class.query.first().id
+
+        response, _ = _count_statements(app, lambda: student_client.get(f'/student/attendance/{class_id}'))
+        assert response.status_code == 200
+        assert b'Late' in response.data
+
+        response, statements = _count_statements(app, lambda: student_client.get(f'/student/attendance/{class_id}'))
+        assert b'Late' in response.data
+        attendance_reads = [s for s in statements if 'FROM attendance ' in s and 'attendance.session_id IN' in s]
+        assert len(attendance_reads) == 1  # The open session only
+
+    def test_faculty_detail_marks_cached(self, faculty_client, app):
+        with app.app_context():
+            finalized_session_cache.clear()
+            session_id = _finalized_session('present')
+
+        first, _ = _count_statements(app, lambda: faculty_client.get(f'/faculty/session/{session_id}'))
+        second, statements = _count_statements(app, lambda: faculty_client.get(f'/faculty/session/{session_id}'))
+        assert first.status_code == second.status_code == 200
+        assert b'ST001' in second.data and b'Present' in second.data
+        assert not any('FROM attendance ' in s for s in statements)
+
+    def test_faculty_detail_shows_current_roster(self, faculty_client, app):
+        """Name changes after finalization show up on the cached page"""
+        with app.app_context():
+            finalized_session_cache.clear()
+            session_id = _finalized_session('present')
+        faculty_client.get(f'/faculty/session/{session_id}')
+
+        with app.app_context():
+            Student.query.first().user.full_name = 'Renamed Student'
+            db.session.commit()
+        response = faculty_client.get(f'/faculty/session/{session_id}')
+        assert b'Renamed Student' in response.data and b'Present' in response.data
+
+    def test_open_session_not_cached(self, faculty_client, app):
+        with app.app_context():
+            finalized_session_cache.clear()
+            session_id = AttendanceSession.query.first().id
+        response = faculty_client.get(f'/faculty/session/{session_id}')
+        assert response.status_code == 200
+        assert b'Not Marked' in response.data
+        assert len(finalized_session_cache) == 0
@@ -0,0 +1,64 @@
+"""
+Test Suite for Request-Scoped Identity Loading
+Tests: one joined query per request, profile helpers, stale sessions
+"""
+import pytest
+from flask import session
+from sqlalchemy import event
+from app import db, load_current_identity, get_current_user, get_current_faculty, get_current_student
+
+
+def _count_queries(app, func):
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            func()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return statements
+
+
+class TestIdentityCache:
+    """Test the identity loader memoized on flask.g"""
+    
+    def test_faculty_identity_single_query(self, app, init_database):
+        """User and faculty profile resolve with one query, then come from g"""
+        def resolve():
+            with app.test_request_context():
+                session['user_id'] = 2
+                user = get_current_user()
+                faculty = get_current_faculty()
+                load_current_identity()
+                assert user.username == 'faculty1'
+                assert faculty.faculty_id == 'FAC001'
+        
+        assert len(_count_queries(app, resolve)) == 1
+    
+    def test_student_identity(self, app, init_database):
+        """Student users resolve to their student profile"""
+        with app.test_request_context():
+            session['user_id'] = 3
+            assert get_current_student().student_id == 'ST001'
+            assert load_current_identity()['faculty'] is None
+    
+    def test_identity_follows_session_user(self, app, init_database):
+        """A cached identity is discarded when the session user changes"""
+        with app.test_request_context():
+            session['user_id'] = 2
+            assert get_current_user().username == 'faculty1'
+            session['user_id'] = 1
+            assert get_current_user().username == 'admin'
+    
+    def test_deleted_user_redirects_to_login(self, client, init_database):
+        """A session pointing at a missing user is logged out"""
+        with client.session_transaction() as sess:
+            sess['user_id'] = 9999
+        
+        response = client.get('/faculty/dashboard')
+        assert response.status_code == 302
+        assert '/login' in response.headers['Location']
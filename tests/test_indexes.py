@@ -0,0 +1,134 @@
+"""
+Test Suite for Database Indexes
+Tests: hot queries use indexes, index migration, composite uniqueness
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+from app import db, Attendance, AttendanceSession, Student, EntityCount, entity_counts, search_users
+from migrate_indexes import (HOT_QUERIES, apply_indexes, apply_tables, explain_hot_queries, unindexed_queries,
+                             remove_duplicate_attendance, rebuild_derived_tables)
+from datetime import date, time
+
+
+class TestQueryPlans:
+    """Test that each hot query is served by an index"""
+    
+    def test_hot_queries_use_indexes(self, app, init_database):
+        """EXPLAIN QUERY PLAN shows no full table scans"""
+        with app.app_context():
+            with db.engine.connect() as conn:
+                assert unindexed_queries(conn) == {}
+    
+    def test_every_hot_query_is_explained(self, app, init_database):
+        """Each hot query produces a plan"""
+        with app.app_context():
+            with db.engine.connect() as conn:
+                plans = explain_hot_queries(conn)
+        assert set(plans) == set(HOT_QUERIES)
+        assert all(plans.values())
+
+
+class TestIndexMigration:
+    """Test applying the managed index set to an existing database"""
+    
+    def test_apply_indexes_recreates_missing(self, app, init_database):
+        """Indexes dropped from an old database are recreated"""
+        with app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(text("DROP INDEX ix_attendance_student_id"))
+                conn.execute(text("DROP INDEX uq_attendance_session_student"))
+                assert 'attendance for a student' in unindexed_queries(conn)
+                
+                created = apply_indexes(conn)
+                
+                assert set(created) == {'ix_attendance_student_id', 'uq_attendance_session_student'}
+                assert unindexed_queries(conn) == {}
+                assert apply_indexes(conn) == []
+    
+    def test_missing_tables_created_before_indexes(self, tmp_path):
+        """Tables added since the database was created exist before their indexes are applied"""
+        engine = create_engine(f'sqlite:///{tmp_path / "old.db"}')
+        with engine.begin() as conn:
+            db.metadata.create_all(bind=conn)
+            for name in ('report_jobs', 'entity_counts', 'attendance_rollups', 'user_search'):
+                conn.execute(text(f"DROP TABLE {name}"))
+            
+            assert set(apply_tables(conn)) == {'report_jobs', 'entity_counts', 'attendance_rollups', 'user_search'}
+            assert apply_indexes(conn) == []
+            assert apply_tables(conn) == []
+    
+    def test_rebuild_derived_tables(self, app, init_database):
+        """Derived tables emptied by an upgrade are filled from the source data"""
+        with app.app_context():
+            db.session.query(EntityCount).delete()
+            db.session.execute(text("DELETE FROM user_search"))
+            db.session.commit()
+            
+            rows = rebuild_derived_tables()
+            
+            assert rows['user_search'] == 3
+            assert entity_counts()['students'] == 1
+            assert [user['username'] for user in search_users('admin')] == ['admin']
+    
+    def test_remove_duplicate_attendance_keeps_latest(self, app, init_database):
+        """Duplicate marks are collapsed before the unique index is added"""
+        with app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(text("DROP INDEX uq_attendance_session_student"))
+                for status in ['absent', 'present']:
+                    conn.execute(text(
+                        "INSERT INTO attendance (session_id, student_id, status) VALUES (1, 1, :status)"
+                    ), {'status': status})
+                
+                assert remove_duplicate_attendance(conn) == 1
+                apply_indexes(conn)
+            
+            assert Attendance.query.one().status == 'present'
+
+
+class TestCompositeUniqueness:
+    """Test the unique composites on attendance and sessions"""
+    
+    def test_duplicate_attendance_rejected(self, app, init_database):
+        """A student can only have one mark per session"""
+        with app.app_context():
+            session = AttendanceSession.query.first()
+            student = Student.query.first()
+            for status in ['present', 'absent']:
+                db.session.add(Attendance(session_id=session.id, student_id=student.id, status=status))
+            with pytest.raises(IntegrityError):
+                db.session.commit()
+            db.session.rollback()
+    
+    def test_duplicate_session_rejected(self, app, init_database):
+        """A class can only have one session per date"""
+        with app.app_context():
+            session = AttendanceSession.query.first()
+            db.session.add(AttendanceSession(
+                class_id=session.class_id,
+                date=session.date,
+                start_time=time(11, 0),
+                end_time=time(12, 0)
+            ))
+            with pytest.raises(IntegrityError):
+                db.session.commit()
+            db.session.rollback()
+    
+    def test_create_session_twice_redirects_to_existing(self, faculty_client, app):
+        """Creating a second session for the same date reuses the first"""
+        with app.app_context():
+            session = AttendanceSession.query.first()
+            class_id, session_id = session.class_id, session.id
+        
+        response = faculty_client.post('/faculty/attendance/create', data={
+            'class_id': str(class_id),
+            'date': date.today().strftime('%Y-%m-%d'),
+            'start_time': '09:00',
+            'end_time': '10:00'
+        })
+        
+        assert response.status_code == 302
+        assert f'/faculty/session/{session_id}/mark' in response.headers['Location']
+        with app.app_context():
+            assert AttendanceSession.query.filter_by(class_id=class_id).count() == 1
@@ -0,0 +1,152 @@
+"""
+Test Suite for the Offline Sync API
+Tests: idempotent replays, last-writer-wins by marked_at, permission checks, one-transaction apply
+"""
+from datetime import datetime, timedelta
+from app import (db, Student, Attendance, AttendanceSession, AttendanceSyncOp, AttendanceRollup,
+                 Faculty, Course, Class, apply_sync_changes, prune_sync_ops)
+
+
+def _ids(app):
+    with app.app_context():
+        return AttendanceSession.query.first().id, Student.query.first().id
+
+
+def _change(key, session_id, student_id, status, minutes_ago=0):
+    stamp = datetime.utcnow() - timedelta(minutes=minutes_ago)
+    return {'key': key, 'session_id': session_id, 'student_id': student_id,
+            'status': status, 'marked_at': stamp.isoformat() + 'Z'}
+
+
+def _sync(client, changes):
+    return client.post('/api/attendance/sync', json={'changes': changes})
+
+
+class TestSyncApply:
+    """Test applying an outbox of changes"""
+
+    def test_applies_changes(self, faculty_client, app):
+        """A new change creates the mark with the client's timestamp"""
+        session_id, student_id = _ids(app)
+        response = _sync(faculty_client, [_change('k1', session_id, student_id, 'late', minutes_ago=5)])
+        assert response.status_code == 200
+        assert response.get_json()['results'] == {'k1': 'applied'}
+        with app.app_context():
+            mark = Attendance.query.one()
+            assert (mark.status, mark.method) == ('late', 'manual')
+            assert datetime.utcnow() - mark.marked_at > timedelta(minutes=4)
+            assert AttendanceRollup.query.one().late == 1
+
+    def test_replay_is_noop(self, faculty_client, app):
+        """Resending an outbox returns the stored results and changes nothing"""
+        session_id, student_id = _ids(app)
+        changes = [_change('k1', session_id, student_id, 'present', minutes_ago=2)]
+        _sync(faculty_client, changes)
+        _sync(faculty_client, [_change('k2', session_id, student_id, 'absent', minutes_ago=1)])
+
+        response = _sync(faculty_client, changes)
+        assert response.get_json()['results'] == {'k1': 'applied'}
+        with app.app_context():
+            assert Attendance.query.one().status == 'absent'
+            assert AttendanceSyncOp.query.count() == 2
+
+    def test_last_writer_wins(self, faculty_client, app):
+        """Within a batch and across batches the newest marked_at wins"""
+        session_id, student_id = _ids(app)
+        response = _sync(faculty_client, [
+            _change('new', session_id, student_id, 'absent', minutes_ago=1),
+            _change('old', session_id, student_id, 'present', minutes_ago=3),
+        ])
+        assert response.get_json()['results'] == {'new': 'applied', 'old': 'applied'}
+        response = _sync(faculty_client, [_change('older', session_id, student_id, 'late', minutes_ago=10)])
+        assert response.get_json()['results'] == {'older': 'stale'}
+        assert response.get_json()['current'][f'{session_id}:{student_id}']['status'] == 'absent'
+        with app.app_context():
+            assert Attendance.query.one().status == 'absent'
+
+    def test_future_timestamps_clamped(self, faculty_client, app):
+        """A client clock running ahead cannot lock out later edits"""
+        session_id, student_id = _ids(app)
+        _sync(faculty_client, [_change('ahead', session_id, student_id, 'present', minutes_ago=-60)])
+        response = _sync(faculty_client, [_change('now', session_id, student_id, 'absent')])
+        assert response.get_json()['results'] == {'now': 'applied'}
+
+    def test_invalid_and_keyless_changes(self, faculty_client, app):
+        """Malformed changes are reported, keyless ones are skipped"""
+        session_id, student_id = _ids(app)
+        response = _sync(faculty_client, [
+            _change('bad-status', session_id, student_id, 'excused'),
+            {'key': 'no-time', 'session_id': session_id, 'student_id': student_id, 'status': 'present'},
+            {'session_id': session_id, 'student_id': student_id, 'status': 'present'},
+        ])
+        assert response.get_json()['results'] == {'bad-status': 'invalid', 'no-time': 'invalid'}
+        with app.app_context():
+            assert Attendance.query.count() == 0
+
+    def test_body_must_be_change_list(self, faculty_client):
+        response = faculty_client.post('/api/attendance/sync', json={'changes': 'nope'})
+        assert response.status_code == 400
+
+
+class TestSyncOpRetention:
+    """Test pruning of idempotency keys"""
+
+    def test_prunes_only_expired_keys(self, app, init_database):
+        with app.app_context():
+            now = datetime.utcnow()
+            old = now - timedelta(days=app.config['SYNC_OP_RETENTION_DAYS'], minutes=1)
+            db.session.add_all([AttendanceSyncOp(user_id=2, key='old', result='applied', created_at=old),
+                                AttendanceSyncOp(user_id=2, key='new', result='applied', created_at=now)])
+            db.session.commit()
+            assert prune_sync_ops(now=now) == 1
+            assert [op.key for op in AttendanceSyncOp.query.all()] == ['new']
+
+
+class TestSyncPermissions:
+    """Test that sync respects session ownership and edit windows"""
+
+    def test_finalized_session_rejected(self, faculty_client, app):
+        session_id, student_id = _ids(app)
+        with app.app_context():
+            db.session.get(AttendanceSession, session_id).is_finalized = True
+            db.session.commit()
+        response = _sync(faculty_client, [_change('k1', session_id, student_id, 'present')])
+        assert response.get_json()['results'] == {'k1': 'rejected'}
+
+    def test_other_faculty_session_rejected(self, faculty_client, app):
+        """Changes for sessions of another faculty member's class are rejected"""
+        session_id, student_id = _ids(app)
+        with app.app_context():
+            from app import User
+            other_user = User(username='other', password_hash='x', email='o@test.com',
+                              role='faculty', full_name='Other')
+            db.session.add(other_user)
+            db.session.flush()
+            other = Faculty(user_id=other_user.id, faculty_id='FAC002', department='CS')
+            db.session.add(other)
+            db.session.flush()
+            class_obj = Class(course_id=Course.query.first().id, faculty_id=other.id, section='B')
+            db.session.add(class_obj)
+            db.session.flush()
+            other_session = AttendanceSession(class_id=class_obj.id, date=datetime.now().date(),
+                                              start_time=datetime.now().time(), end_time=datetime.now().time())
+            db.session.add(other_session)
+            db.session.commit()
+            other_session_id = other_session.id
+        response = _sync(faculty_client, [_change('k1', other_session_id, student_id, 'present')])
+        assert response.get_json()['results'] == {'k1': 'rejected'}
+
+    def test_student_cannot_sync(self, student_client):
+        response = student_client.post('/api/attendance/sync', json={'changes': []})
+        assert response.status_code in (302, 403)
+
+    def test_keys_scoped_per_user(self, app, init_database):
+        """The same key from two users is treated as two changes"""
+        session_id, student_id = _ids(app)
+        with app.app_context():
+            faculty = Faculty.query.first()
+            first, _ = apply_sync_changes(faculty, faculty.user_id, [_change('k1', session_id, student_id, 'present')])
+            second, current = apply_sync_changes(faculty, 1, [_change('k1', session_id, student_id, 'absent')])
+            assert first == second == {'k1': 'applied'}
+            assert current[f'{session_id}:{student_id}']['status'] == 'absent'
+            assert Attendance.query.one().marked_by == 1
@@ -0,0 +1,168 @@
+"""
+Test Suite for QR Self Check-in
+Tests: signed time-boxed tokens, set-based check-in writes, faculty and student routes
+"""
+import pytest
+from sqlalchemy import event
+from app import (db, Student, Class, Attendance, AttendanceSession, AttendanceRollup,
+                 make_checkin_token, verify_checkin_token, current_qr_window, record_checkins)
+
+
+def _count_statements(fn, *args):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        result = fn(*args)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return result, len(statements)
+
+
+class TestCheckinTokens:
+    """Test signing and verifying check-in tokens"""
+
+    def test_round_trip(self, app, init_database):
+        """A fresh token verifies to its session, class and date"""
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            token = make_checkin_token(session_obj)
+            assert verify_checkin_token(token) == (session_obj.id, session_obj.class_id, session_obj.date)
+
+    def test_verification_reads_nothing(self, app, init_database):
+        """Verifying a token issues no SQL"""
+        with app.app_context():
+            token = make_checkin_token(AttendanceSession.query.first())
+            _, statements = _count_statements(verify_checkin_token, token)
+            assert statements == 0
+
+    def test_tampered_token_rejected(self, app, init_database):
+        """Changing the session id breaks the signature"""
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            token = make_checkin_token(session_obj)
+            forged = f'{session_obj.id + 1}' + token[len(str(session_obj.id)):]
+            with pytest.raises(ValueError, match='Invalid'):
+                verify_checkin_token(forged)
+            with pytest.raises(ValueError, match='Invalid'):
+                verify_checkin_token('garbage')
+
+    def test_window_expiry(self, app, init_database):
+        """Tokens last for their own window and the next one only"""
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            ttl = app.config['QR_TOKEN_TTL']
+            window = current_qr_window()
+            token = make_checkin_token(session_obj, window)
+            now = window * ttl
+
+            assert verify_checkin_token(token, now=now + ttl)
+            with pytest.raises(ValueError, match='expired'):
+                verify_checkin_token(token, now=now + 2 * ttl)
+            with pytest.raises(ValueError, match='expired'):
+                verify_checkin_token(token, now=now - ttl)
+
+
+class TestRecordCheckins:
+    """Test the set-based check-in insert"""
+
+    def test_marks_enrolled_student(self, app, init_database):
+        """An enrolled student is marked present by themselves via QR"""
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            student = Student.query.first()
+
+            marked = record_checkins(session_obj.id, session_obj.class_id, session_obj.date, [student.id])
+
+            assert marked == [student.id]
+            mark = Attendance.query.filter_by(session_id=session_obj.id, student_id=student.id).one()
+            assert (mark.status, mark.method, mark.marked_by) == ('present', 'qr', student.user_id)
+            rollup = db.session.get(AttendanceRollup, (student.id, session_obj.class_id))
+            assert (rollup.total, rollup.present) == (1, 1)
+
+    def test_existing_mark_kept(self, app, init_database):
+        """A student already marked by faculty is not overwritten"""
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            student = Student.query.first()
+            db.session.add(Attendance(session_id=session_obj.id, student_id=student.id,
+                                      status='absent', marked_by=2, method='manual'))
+            db.session.commit()
+
+            assert record_checkins(session_obj.id, session_obj.class_id, session_obj.date, [student.id]) == []
+            assert Attendance.query.filter_by(session_id=session_obj.id).one().status == 'absent'
+
+    def test_finalized_or_unenrolled_ignored(self, app, init_database):
+        """Finalized sessions and students outside the class get no mark"""
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            student = Student.query.first()
+
+            assert record_checkins(session_obj.id, session_obj.class_id, session_obj.date, [student.id + 100]) == []
+            session_obj.is_finalized = True
+            db.session.commit()
+            assert record_checkins(session_obj.id, session_obj.class_id, session_obj.date, [student.id]) == []
+            assert Attendance.query.count() == 0
+
+    def test_fixed_statement_count(self, app, init_database):
+        """A check-in costs one insert and one rollup upsert"""
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            student = Student.query.first()
+            args = (session_obj.id, session_obj.class_id, session_obj.date, [student.id])
+
+            _, statements = _count_statements(record_checkins, *args)
+            assert statements == 2
+
+
+class TestCheckinRoutes:
+    """Test the QR display and student check-in pages"""
+
+    def test_faculty_qr_page_and_token(self, faculty_client, app):
+        """Faculty get a QR page and a rotating token with an image"""
+        with app.app_context():
+            session_id = AttendanceSession.query.first().id
+
+        page = faculty_client.get(f'/faculty/session/{session_id}/qr')
+        assert page.status_code == 200
+        assert b'Scan to Check In' in page.data
+
+        data = faculty_client.get(f'/faculty/session/{session_id}/qr/token').get_json()
+        assert data['success'] is True
+        assert data['image'].startswith('data:image/png;base64,')
+        assert '/student/checkin?token=' in data['url']
+
+    def test_finalized_session_has_no_qr(self, faculty_client, app):
+        """Tokens are not issued for finalized sessions"""
+        with app.app_context():
+            session_obj = AttendanceSession.query.first()
+            session_obj.is_finalized = True
+            db.session.commit()
+            session_id = session_obj.id
+
+        response = faculty_client.get(f'/faculty/session/{session_id}/qr/token')
+        assert response.status_code == 400
+
+    def test_student_checks_in(self, student_client, app):
+        """Scanning shows a confirmation page and posting marks the student"""
+        with app.app_context():
+            token = make_checkin_token(AttendanceSession.query.first())
+
+        page = student_client.get(f'/student/checkin?token={token}')
+        assert page.status_code == 200
+        assert b'Mark Me Present' in page.data
+
+        response = student_client.post('/student/checkin', data={'token': token}, follow_redirects=True)
+        assert b'Checked in' in response.data
+
+        again = student_client.post('/student/checkin', data={'token': token}, follow_redirects=True)
+        assert b'already checked in' in again.data
+
+    def test_student_invalid_token(self, student_client):
+        """A bad token is rejected without marking"""
+        response = student_client.post('/student/checkin', data={'token': '1.1.20260101.1.bad'},
+                                       follow_redirects=True)
+        assert b'Invalid check-in code' in response.data
@@ -231,8 +231,9 @@ class TestMarkAllButtonsRegression:
         html = response.data.decode('utf-8')
         
         # Verify Mark All buttons don't filter by "Not Marked" status
-        # They should trigger clicks on ALL edit-attendance buttons with matching status
-        assert 'edit-attendance[data-status="present"]' in html
+        # They should send EVERY student row to the bulk marking endpoint
+        assert '[id^="student-row-"]' in html
+        assert '/api/attendance/bulk' in html
         assert 'Mark ALL students as PRESENT' in html or 'Mark all' in html
 
 
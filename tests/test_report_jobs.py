@@ -0,0 +1,171 @@
+"""
+Test Suite for Background Report Jobs
+Tests: in-flight dedupe, atomic claims, PDF generation, failure and crash recovery, status and download endpoints
+"""
+import time as time_module
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from app import (db, Class, ReportJob, ReportWorker, enqueue_report_job, claim_report_job, run_report_job,
+                 process_report_jobs, recover_report_jobs, cascade_delete)
+
+
+def _class_id():
+    return Class.query.first().id
+
+
+class TestEnqueue:
+    """Test queueing and dedupe"""
+
+    def test_identical_requests_share_job(self, app, init_database):
+        with app.app_context():
+            first = enqueue_report_job('class_pdf', {'class_id': _class_id()}, 2)
+            second = enqueue_report_job('class_pdf', {'class_id': _class_id()}, 2)
+            other = enqueue_report_job('class_pdf', {'class_id': _class_id() + 1}, 2)
+            assert first.id == second.id != other.id
+            assert ReportJob.query.count() == 2
+
+    def test_finished_job_not_reused(self, app, init_database):
+        with app.app_context():
+            first_id = enqueue_report_job('class_pdf', {'class_id': _class_id()}).id
+            process_report_jobs('test')
+            assert enqueue_report_job('class_pdf', {'class_id': _class_id()}).id != first_id
+
+    def test_index_rejects_second_in_flight_row(self, app, init_database):
+        """The partial unique index is the backstop for concurrent enqueues"""
+        with app.app_context():
+            job = enqueue_report_job('class_pdf', {'class_id': _class_id()})
+            db.session.add(ReportJob(kind=job.kind, params=job.params, dedupe_key=job.dedupe_key))
+            with pytest.raises(IntegrityError):
+                db.session.commit()
+            db.session.rollback()
+
+
+class TestWorker:
+    """Test claiming and running jobs"""
+
+    def test_builds_pdf(self, app, init_database):
+        with app.app_context():
+            job_id = enqueue_report_job('class_pdf', {'class_id': _class_id()}).id
+            assert process_report_jobs('test') == 1
+            job = db.session.get(ReportJob, job_id)
+            assert job.status == 'done' and job.attempts == 1
+            assert job.result.startswith(b'%PDF')
+            assert job.filename == 'attendance_report_CS101_SectionA.pdf'
+
+    def test_claim_is_exclusive(self, app, init_database):
+        with app.app_context():
+            enqueue_report_job('class_pdf', {'class_id': _class_id()})
+            assert claim_report_job('one').worker == 'one'
+            assert claim_report_job('two') is None
+
+    def test_failure_is_recorded(self, app, init_database):
+        with app.app_context():
+            class_id = _class_id()
+            job_id = enqueue_report_job('class_pdf', {'class_id': class_id}).id
+            cascade_delete('class', class_id)
+            run_report_job(claim_report_job('test'))
+            job = db.session.get(ReportJob, job_id)
+            assert job.status == 'failed' and 'no longer exists' in job.error
+
+    def test_recover_stale_and_expired(self, app, init_database):
+        with app.app_context():
+            job = enqueue_report_job('class_pdf', {'class_id': _class_id()})
+            claim_report_job('crashed')
+            later = datetime.utcnow() + timedelta(seconds=app.config['REPORT_JOB_TIMEOUT'] + 1)
+            recover_report_jobs(now=later)
+            assert db.session.get(ReportJob, job.id, populate_existing=True).status == 'queued'
+
+            db.session.get(ReportJob, job.id).attempts = app.config['REPORT_JOB_MAX_ATTEMPTS']
+            db.session.commit()
+            claim_report_job('crashed')
+            recover_report_jobs(now=later + timedelta(seconds=app.config['REPORT_JOB_TIMEOUT'] + 1))
+            assert db.session.get(ReportJob, job.id, populate_existing=True).status == 'failed'
+
+            recover_report_jobs(now=later + timedelta(hours=app.config['REPORT_JOB_RETENTION_HOURS'] + 1))
+            assert ReportJob.query.count() == 0
+
+    def test_idle_recovery_only_reads(self, app, init_database):
+        """With nothing stale or expired, recovery takes no write lock"""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split()[0].upper())
+
+        with app.app_context():
+            job_id = enqueue_report_job('class_pdf', {'class_id': _class_id()}).id
+            process_report_jobs('test')
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                assert recover_report_jobs() is False
+                assert process_report_jobs('test') == 0
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+            assert set(statements) == {'SELECT'}
+            assert db.session.get(ReportJob, job_id).status == 'done'
+
+    def test_thread_drains_queue(self, app, init_database):
+        with app.app_context():
+            job_id = enqueue_report_job('class_pdf', {'class_id': _class_id()}).id
+
+        worker = ReportWorker(app)
+        worker.start()
+        try:
+            worker.notify()
+            deadline = time_module.time() + 10
+            while time_module.time() < deadline:
+                with app.app_context():
+                    if db.session.get(ReportJob, job_id).status == 'done':
+                        break
+                time_module.sleep(0.05)
+        finally:
+            worker.stop()
+
+        with app.app_context():
+            assert db.session.get(ReportJob, job_id).status == 'done'
+
+
+class TestReportJobRoutes:
+    """Test the export, status and download endpoints"""
+
+    def test_export_queues_instead_of_building(self, faculty_client, app):
+        with app.app_context():
+            class_id = _class_id()
+        response = faculty_client.get(f'/faculty/export/pdf/{class_id}')
+        assert response.status_code == 200
+        assert b'Generating the report' in response.data
+        with app.app_context():
+            assert ReportJob.query.one().status == 'queued'
+
+    def test_status_then_download(self, faculty_client, app):
+        with app.app_context():
+            job_id = enqueue_report_job('class_pdf', {'class_id': _class_id()}).id
+
+        data = faculty_client.get(f'/faculty/reports/jobs/{job_id}').get_json()
+        assert data['status'] == 'queued' and data['download_url'] is None
+        assert faculty_client.get(f'/faculty/reports/jobs/{job_id}/download').status_code == 409
+
+        with app.app_context():
+            process_report_jobs('test')
+        data = faculty_client.get(f'/faculty/reports/jobs/{job_id}').get_json()
+        assert data['status'] == 'done'
+        response = faculty_client.get(data['download_url'])
+        assert response.status_code == 200
+        assert response.mimetype == 'application/pdf'
+        assert response.data.startswith(b'%PDF')
+
+    def test_unknown_or_foreign_job(self, faculty_client, app):
+        assert faculty_client.get('/faculty/reports/jobs/999').status_code == 404
+        with app.app_context():
+            class_obj = Class.query.first()
+            class_obj.faculty_id += 100  # Another faculty member's class
+            db.session.commit()
+            job_id = enqueue_report_job('class_pdf', {'class_id': class_obj.id}).id
+        assert faculty_client.get(f'/faculty/reports/jobs/{job_id}').status_code == 404
+
+    def test_requires_faculty(self, student_client, app):
+        with app.app_context():
+            job_id = enqueue_report_job('class_pdf', {'class_id': _class_id()}).id
+        response = student_client.get(f'/faculty/reports/jobs/{job_id}/download')
+        assert response.status_code in (302, 403)
@@ -0,0 +1,151 @@
+"""
+Test Suite for the Attendance Report Service
+Tests: filter normalization, caching, eviction, invalidation
+"""
+import pytest
+from werkzeug.datastructures import MultiDict
+from app import (db, Student, Attendance, AttendanceSession, ReportCache, report_cache,
+                 normalize_report_filters, get_attendance_report, iter_attendance_report)
+from datetime import date, time, timedelta
+
+
+def _filters(**kwargs):
+    return normalize_report_filters(MultiDict(kwargs))
+
+
+def _mark(session_id, student_id, status='present'):
+    db.session.add(Attendance(session_id=session_id, student_id=student_id, status=status, marked_by=2))
+    db.session.commit()
+
+
+class TestReportFilters:
+    """Test filter key normalization"""
+    
+    def test_equivalent_filters_share_a_key(self):
+        """Blank values and whitespace normalize to the same key"""
+        assert _filters(course_id='', department=' ', start_date='') == _filters()
+        assert _filters(start_date='2025-01-05') == (None, None, date(2025, 1, 5), None)
+    
+    def test_invalid_dates_are_ignored(self):
+        """Malformed dates do not become filters"""
+        assert _filters(start_date='not-a-date') == (None, None, None, None)
+
+
+class TestReportCaching:
+    """Test that report rows are computed once and reused"""
+    
+    def test_view_then_download_hits_cache(self, admin_client, app):
+        """Downloading a report that was just viewed reuses the cached rows"""
+        with app.app_context():
+            session = AttendanceSession.query.first()
+            _mark(session.id, Student.query.first().id)
+        
+        admin_client.get('/admin/reports/attendance')
+        assert report_cache.get(_filters()) is not None
+        
+        with app.app_context():
+            # Remove the source rows without going through the ORM
+            db.session.execute(Attendance.__table__.delete())
+            db.session.commit()
+        
+        response = admin_client.get('/admin/reports/attendance/download')
+        assert 'ST001' in response.get_data(as_text=True)
+    
+    def test_marking_attendance_invalidates_covering_ranges(self, app, init_database):
+        """A new mark drops cached reports whose range covers its session date"""
+        with app.app_context():
+            session = AttendanceSession.query.first()
+            student_id = Student.query.first().id
+            today = session.date
+            
+            covering = _filters(start_date=str(today - timedelta(days=1)))
+            outside = _filters(end_date=str(today - timedelta(days=10)))
+            assert get_attendance_report(covering) == []
+            assert get_attendance_report(outside) == []
+            
+            _mark(session.id, student_id)
+            
+            assert report_cache.get(covering) is None
+            assert report_cache.get(outside) == []
+            assert get_attendance_report(covering)[0]['percentage'] == 100.0
+    
+    def test_streamed_report_is_cached(self, app, init_database):
+        """Streaming a small report stores it for the next request"""
+        with app.app_context():
+            session = AttendanceSession.query.first()
+            _mark(session.id, Student.query.first().id)
+            
+            rows = list(iter_attendance_report(_filters()))
+            assert report_cache.get(_filters()) == rows
+
+
+class TestReportCacheCommitInvalidation:
+    """Test that writes invalidate the cache only once they commit"""
+    
+    def test_flush_waits_for_commit(self, app, init_database):
+        """A flushed but uncommitted mark leaves the cached report in place"""
+        with app.app_context():
+            session = AttendanceSession.query.first()
+            get_attendance_report(_filters())
+            
+            db.session.add(Attendance(session_id=session.id, student_id=Student.query.first().id,
+                                      status='present', marked_by=2))
+            db.session.flush()
+            assert report_cache.get(_filters()) == []
+            
+            db.session.commit()
+            assert report_cache.get(_filters()) is None
+    
+    def test_rolled_back_flush_keeps_cache(self, app, init_database):
+        """A flush that is rolled back does not invalidate anything"""
+        with app.app_context():
+            session = AttendanceSession.query.first()
+            get_attendance_report(_filters())
+            
+            db.session.add(Attendance(session_id=session.id, student_id=Student.query.first().id,
+                                      status='present', marked_by=2))
+            db.session.flush()
+            db.session.rollback()
+            assert report_cache.get(_filters()) == []
+            
+            db.session.commit()
+            assert report_cache.get(_filters()) == []
+    
+    def test_rows_read_before_invalidation_are_not_cached(self, app):
+        """Rows computed under an older generation are dropped by set()"""
+        cache = ReportCache(app)
+        generation = cache.generation
+        cache.invalidate_dates([date(2025, 1, 5)])
+        cache.set('a', [1], generation)
+        assert cache.get('a') is None
+        cache.set('a', [1], cache.generation)
+        assert cache.get('a') == [1]
+
+
+class TestReportCacheEviction:
+    """Test the TTL and size bound"""
+    
+    def test_lru_eviction(self, app):
+        """The least recently used entry is evicted past the size bound"""
+        cache = ReportCache(app)
+        app.config['REPORT_CACHE_MAX_ENTRIES'] = 2
+        try:
+            cache.set('a', [1])
+            cache.set('b', [2])
+            cache.get('a')
+            cache.set('c', [3])
+            assert cache.get('b') is None
+            assert cache.get('a') == [1]
+            assert len(cache) == 2
+        finally:
+            app.config['REPORT_CACHE_MAX_ENTRIES'] = 32
+    
+    def test_ttl_expiry(self, app):
+        """Entries older than the TTL are not returned"""
+        cache = ReportCache(app)
+        app.config['REPORT_CACHE_TTL'] = -1
+        try:
+            cache.set('a', [1])
+            assert cache.get('a') is None
+        finally:
+            app.config['REPORT_CACHE_TTL'] = 300
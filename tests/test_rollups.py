@@ -0,0 +1,208 @@
+"""
+Test Suite for Incrementally Maintained Attendance Rollups
+Tests: flush-time counter updates, bulk write recompute, full rebuild, routes
+"""
+import pytest
+from app import (db, Student, Class, Attendance, AttendanceSession, AttendanceRollup,
+                 rebuild_attendance_rollups)
+from datetime import date, time, timedelta
+
+
+def _new_session(class_obj, days_ago):
+    session_obj = AttendanceSession(
+        class_id=class_obj.id,
+        date=date.today() - timedelta(days=days_ago),
+        start_time=time(9, 0),
+        end_time=time(10, 0),
+        created_by=2
+    )
+    db.session.add(session_obj)
+    db.session.flush()
+    return session_obj
+
+
+def _counters(student_id, class_id):
+    """Return (total, present, late, absent) for one rollup row, or None"""
+    rollup = db.session.get(AttendanceRollup, (student_id, class_id))
+    if rollup is None:
+        return None
+    db.session.refresh(rollup)
+    return (rollup.total, rollup.present, rollup.late, rollup.absent)
+
+
+class TestIncrementalRollups:
+    """Test that ORM writes keep the rollup counters in step"""
+
+    def test_insert_increments_counters(self, app, init_database):
+        """Each new mark adds to total and its status bucket"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            for offset, status in enumerate(['present', 'late', 'absent'], 1):
+                session_obj = _new_session(class_obj, offset)
+                db.session.add(Attendance(session_id=session_obj.id, student_id=student.id,
+                                          status=status, marked_by=2))
+            db.session.commit()
+
+            assert _counters(student.id, class_obj.id) == (3, 1, 1, 1)
+
+    def test_status_change_moves_bucket(self, app, init_database):
+        """Updating a status moves the count without changing the total"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            session_obj = AttendanceSession.query.first()
+            mark = Attendance(session_id=session_obj.id, student_id=student.id,
+                              status='absent', marked_by=2)
+            db.session.add(mark)
+            db.session.commit()
+
+            mark.status = 'present'
+            db.session.commit()
+
+            assert _counters(student.id, class_obj.id) == (1, 1, 0, 0)
+
+    def test_delete_decrements_counters(self, app, init_database):
+        """Deleting a mark through the session removes it from the rollup"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            session_obj = AttendanceSession.query.first()
+            mark = Attendance(session_id=session_obj.id, student_id=student.id,
+                              status='late', marked_by=2)
+            db.session.add(mark)
+            db.session.commit()
+
+            db.session.delete(mark)
+            db.session.commit()
+
+            assert _counters(student.id, class_obj.id) == (0, 0, 0, 0)
+
+    def test_rolled_back_marks_are_not_counted(self, app, init_database):
+        """Counters written during a flush roll back with the transaction"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            session_obj = AttendanceSession.query.first()
+            db.session.add(Attendance(session_id=session_obj.id, student_id=student.id,
+                                      status='present', marked_by=2))
+            db.session.flush()
+            db.session.rollback()
+
+            assert _counters(student.id, class_obj.id) is None
+
+
+class TestBulkWriteRollups:
+    """Test that bulk query writes recompute the affected rollups"""
+
+    def test_bulk_delete_recomputes(self, app, init_database):
+        """Query.delete() on attendance drops the affected counters"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            for offset in (1, 2):
+                session_obj = _new_session(class_obj, offset)
+                db.session.add(Attendance(session_id=session_obj.id, student_id=student.id,
+                                          status='present', marked_by=2))
+            db.session.commit()
+            first_session_id = AttendanceSession.query.filter_by(
+                date=date.today() - timedelta(days=1)).first().id
+
+            Attendance.query.filter_by(session_id=first_session_id).delete()
+            db.session.commit()
+
+            assert _counters(student.id, class_obj.id) == (1, 1, 0, 0)
+
+    def test_bulk_update_recomputes(self, app, init_database):
+        """Query.update() on attendance status is reflected in the buckets"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            session_obj = AttendanceSession.query.first()
+            db.session.add(Attendance(session_id=session_obj.id, student_id=student.id,
+                                      status='present', marked_by=2))
+            db.session.commit()
+
+            Attendance.query.filter_by(student_id=student.id).update({'status': 'absent'})
+            db.session.commit()
+
+            assert _counters(student.id, class_obj.id) == (1, 0, 0, 1)
+
+    def test_rebuild_matches_incremental(self, app, init_database):
+        """A full rebuild produces the same counters as incremental upkeep"""
+        with app.app_context():
+            student = Student.query.first()
+            class_obj = Class.query.first()
+            for offset, status in enumerate(['present', 'present', 'late', 'absent'], 1):
+                session_obj = _new_session(class_obj, offset)
+                db.session.add(Attendance(session_id=session_obj.id, student_id=student.id,
+                                          status=status, marked_by=2))
+            db.session.commit()
+            incremental = _counters(student.id, class_obj.id)
+
+            assert rebuild_attendance_rollups() == 1
+            assert _counters(student.id, class_obj.id) == incremental == (4, 2, 1, 1)
+
+
+class TestRollupRoutes:
+    """Test that route writes keep the rollups current"""
+
+    def test_marking_via_api_updates_rollup(self, faculty_client, app):
+        """Marking then remarking through the faculty API updates the counters"""
+        with app.app_context():
+            session_id = AttendanceSession.query.first().id
+            student = Student.query.first()
+            student_id = student.id
+            class_id = Class.query.first().id
+
+        for status in ('absent', 'present'):
+            response = faculty_client.post('/faculty/attendance/mark', data={
+                'session_id': str(session_id),
+                'student_id': str(student_id),
+                'status': status
+            })
+            assert response.status_code == 200
+
+        with app.app_context():
+            assert _counters(student_id, class_id) == (1, 1, 0, 0)
+
+        response = faculty_client.get(f'/faculty/reports/class/{class_id}')
+        assert response.status_code == 200
+        assert b'100.0%' in response.data
+
+
+class TestReportConsistency:
+    """Test that dated and undated reports agree"""
+
+    def test_full_range_matches_rollups(self, app, init_database):
+        """Each student's row counts only their own marks, with or without a date range"""
+        from werkzeug.security import generate_password_hash
+        from app import User, Enrollment, build_attendance_report_query
+        with app.app_context():
+            class_obj = Class.query.first()
+            first = Student.query.first()
+            user = User(username='student2', password_hash=generate_password_hash('x', method='pbkdf2:sha256:1'),
+                        email='student2@test.com', role='student', full_name='Second Student')
+            db.session.add(user)
+            db.session.flush()
+            second = Student(user_id=user.id, student_id='ST002', department='Computer Science', year=1, section='A')
+            db.session.add(second)
+            db.session.flush()
+            db.session.add(Enrollment(student_id=second.id, class_id=class_obj.id))
+            for days_ago, first_status, second_status in ((3, 'present', 'absent'), (2, 'late', 'absent'),
+                                                          (1, 'absent', 'present')):
+                session_obj = _new_session(class_obj, days_ago)
+                db.session.add(Attendance(session_id=session_obj.id, student_id=first.id,
+                                          status=first_status, marked_by=2))
+                db.session.add(Attendance(session_id=session_obj.id, student_id=second.id,
+                                          status=second_status, marked_by=2))
+            db.session.commit()
+
+            def rows(start_date, end_date):
+                query = build_attendance_report_query((None, None, start_date, end_date))
+                return sorted(tuple(row) for row in query.all())
+
+            undated = rows(None, None)
+            dated = rows(date.today() - timedelta(days=30), date.today() + timedelta(days=1))
+            assert dated == undated
+            assert [(row[0], row[5], row[6]) for row in undated] == [('ST001', 3, 2), ('ST002', 3, 1)]
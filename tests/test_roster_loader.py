@@ -0,0 +1,95 @@
+"""
+Test Suite for the Roster Loader
+Tests: eager loading of enrollments, students and users; constant query counts on roster pages
+"""
+import pytest
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+from app import db, User, Student, Class, Enrollment, Attendance, AttendanceSession, load_class_roster
+
+
+def _enroll_students(count):
+    class_obj = Class.query.first()
+    for i in range(count):
+        user = User(username=f'roster{i}', password_hash=generate_password_hash('x', method='pbkdf2:sha256:1'),
+                    email=f'roster{i}@test.com', role='student', full_name=f'Roster Student {i}')
+        db.session.add(user)
+        db.session.flush()
+        student = Student(user_id=user.id, student_id=f'RS{i:03d}', department='Computer Science',
+                          year=1, section='A')
+        db.session.add(student)
+        db.session.flush()
+        db.session.add(Enrollment(student_id=student.id, class_id=class_obj.id))
+    db.session.commit()
+
+
+def _count_statements(app, fn):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = fn()
+    finally:
+        with app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return response, len(statements)
+
+
+class TestLoadClassRoster:
+    """Test the loader on its own"""
+
+    def test_two_queries_and_no_lazy_loads(self, app, init_database):
+        with app.app_context():
+            _enroll_students(3)
+            class_id = Class.query.first().id
+            session_id = AttendanceSession.query.first().id
+            first_student_id = Student.query.first().id
+            db.session.add(Attendance(session_id=session_id, student_id=first_student_id,
+                                      status='present', marked_by=2))
+            db.session.commit()
+            db.session.expunge_all()
+
+            def load_and_walk():
+                enrollments, records = load_class_roster(class_id, session_id)
+                names = [e.student.user.full_name for e in enrollments]
+                return enrollments, records, names
+
+            (enrollments, records, names), statements = _count_statements(app, load_and_walk)
+            assert statements == 2
+            assert len(enrollments) == 4 and len(names) == 4
+            assert list(records) == [first_student_id]
+
+    def test_without_session_is_one_query(self, app, init_database):
+        with app.app_context():
+            class_id = Class.query.first().id
+            db.session.expunge_all()
+            (enrollments, records), statements = _count_statements(app, lambda: load_class_roster(class_id))
+            assert statements == 1
+            assert records == {}
+
+
+class TestRosterPageQueryCounts:
+    """Roster pages issue the same number of queries whatever the roster size"""
+
+    @pytest.mark.parametrize('path', [
+        '/faculty/class/{class_id}',
+        '/faculty/session/{session_id}/mark',
+        '/faculty/session/{session_id}',
+        '/faculty/reports/class/{class_id}',
+    ])
+    def test_constant_queries(self, faculty_client, app, path):
+        with app.app_context():
+            url = path.format(class_id=Class.query.first().id, session_id=AttendanceSession.query.first().id)
+
+        small, small_count = _count_statements(app, lambda: faculty_client.get(url))
+        with app.app_context():
+            _enroll_students(5)
+        large, large_count = _count_statements(app, lambda: faculty_client.get(url))
+
+        assert small.status_code == large.status_code == 200
+        assert b'Roster Student 4' in large.data
+        assert large_count == small_count
@@ -0,0 +1,145 @@
+"""
+Test Suite for the Structured Schedule Index
+Tests: schedule parsing, meeting rows kept in sync, conflict lookups, add class route
+"""
+import pytest
+from app import (db, Class, ClassMeeting, Course, Faculty, parse_schedule,
+                 find_schedule_conflict, rebuild_schedule_index)
+
+
+class TestParseSchedule:
+    """Test parsing schedule strings into weekdays and minutes"""
+
+    def test_parse_mwf(self):
+        """MWF maps to Monday, Wednesday and Friday"""
+        assert parse_schedule('MWF 10:00-11:00') == ((0, 2, 4), 600, 660)
+
+    def test_parse_tuesday_thursday_variants(self):
+        """TTH, TR and TTS all include Tuesday and Thursday"""
+        assert parse_schedule('TTH 14:00-15:30')[0] == (1, 3)
+        assert parse_schedule('TR 14:00-15:30')[0] == (1, 3)
+        assert parse_schedule('TTS 09:00-10:00')[0] == (1, 3, 5)
+
+    def test_parse_rejects_bad_input(self):
+        """Unknown days, bad times and missing schedules raise ValueError"""
+        for schedule in ('XYZ 10:00-11:00', 'MWF 25:00-26:00', 'MWF', None):
+            with pytest.raises(ValueError):
+                parse_schedule(schedule)
+
+
+class TestScheduleIndex:
+    """Test that class meetings follow the class schedule"""
+
+    def test_meetings_created_with_class(self, app, init_database):
+        """Adding a class writes one meeting per weekday"""
+        with app.app_context():
+            existing = Class.query.first()
+            class_obj = Class(course_id=existing.course_id, faculty_id=existing.faculty_id,
+                              section='B', schedule='MWF 10:00-11:00', room='Lab 101')
+            db.session.add(class_obj)
+            db.session.commit()
+
+            meetings = ClassMeeting.query.filter_by(class_id=class_obj.id).all()
+            assert sorted(m.weekday for m in meetings) == [0, 2, 4]
+            assert {(m.section, m.room, m.faculty_id) for m in meetings} == {('B', 'Lab 101', existing.faculty_id)}
+
+    def test_meetings_follow_schedule_change(self, app, init_database):
+        """Changing the schedule replaces the meetings"""
+        with app.app_context():
+            class_obj = Class.query.first()
+            class_obj.schedule = 'TTH 09:00-10:00'
+            db.session.commit()
+
+            meetings = ClassMeeting.query.filter_by(class_id=class_obj.id).all()
+            assert sorted(m.weekday for m in meetings) == [1, 3]
+            assert {m.start_minute for m in meetings} == {540}
+
+    def test_rebuild_matches_schedules(self, app, init_database):
+        """A rebuild derives meetings for classes inserted without the ORM"""
+        with app.app_context():
+            existing = Class.query.first()
+            db.session.execute(Class.__table__.insert(), [{
+                'course_id': existing.course_id, 'faculty_id': existing.faculty_id,
+                'section': 'C', 'schedule': 'MWF 09:00-10:00', 'room': 'Room 201'
+            }])
+            db.session.commit()
+
+            assert rebuild_schedule_index() == 3
+            assert ClassMeeting.query.filter_by(section='C').count() == 3
+
+
+class TestConflictLookup:
+    """Test interval lookups on the section, room and faculty indexes"""
+
+    def _add_class(self, section, schedule, room):
+        existing = Class.query.first()
+        class_obj = Class(course_id=existing.course_id, faculty_id=existing.faculty_id,
+                          section=section, schedule=schedule, room=room)
+        db.session.add(class_obj)
+        db.session.commit()
+        return class_obj
+
+    def test_overlap_detected_per_dimension(self, app, init_database):
+        """Overlapping slots are found by section, room or faculty"""
+        with app.app_context():
+            class_obj = self._add_class('B', 'MWF 10:00-11:00', 'Lab 101')
+            weekdays, start, end = parse_schedule('W 10:30-11:30')
+
+            key, meeting = find_schedule_conflict(weekdays, start, end, section='B')
+            assert key == 'section' and meeting.class_id == class_obj.id
+            assert find_schedule_conflict(weekdays, start, end, room='Lab 101')[0] == 'room'
+            assert find_schedule_conflict(weekdays, start, end, faculty_id=class_obj.faculty_id)[0] == 'faculty_id'
+
+    def test_adjacent_and_other_days_do_not_conflict(self, app, init_database):
+        """Back-to-back slots and different days are free"""
+        with app.app_context():
+            self._add_class('B', 'MWF 10:00-11:00', 'Lab 101')
+
+            assert find_schedule_conflict(*parse_schedule('MWF 11:00-12:00'), section='B') is None
+            assert find_schedule_conflict(*parse_schedule('TTH 10:00-11:00'), section='B') is None
+
+    def test_exclude_class(self, app, init_database):
+        """A class does not conflict with itself"""
+        with app.app_context():
+            class_obj = self._add_class('B', 'MWF 10:00-11:00', 'Lab 101')
+            weekdays, start, end = parse_schedule('MWF 10:00-11:00')
+            assert find_schedule_conflict(weekdays, start, end, exclude_class_id=class_obj.id, section='B') is None
+
+
+class TestAddClassConflicts:
+    """Test the add class route against the schedule index"""
+
+    def _post(self, admin_client, app, **overrides):
+        with app.app_context():
+            data = {
+                'course_id': str(Course.query.first().id),
+                'faculty_id': str(Faculty.query.first().id),
+                'section': 'A',
+                'schedule': 'MWF 10:00-11:00',
+                'room': 'Lab 101'
+            }
+        data.update(overrides)
+        return admin_client.post('/admin/classes/add', data=data, follow_redirects=True)
+
+    def test_section_conflict_blocked(self, admin_client, app):
+        """A second class for the section at an overlapping time is rejected"""
+        assert b'Class created successfully' in self._post(admin_client, app).data
+
+        response = self._post(admin_client, app, schedule='MWF 10:30-11:30', room='Room 202')
+        assert b'Section A already has' in response.data
+
+    def test_room_conflict_blocked(self, admin_client, app):
+        """A room cannot be booked twice for the same slot"""
+        with app.app_context():
+            existing = Class.query.first()
+            db.session.add(Class(course_id=existing.course_id, faculty_id=existing.faculty_id,
+                                 section='Q', schedule='MWF 10:00-11:00', room='Lab 101'))
+            db.session.commit()
+
+        response = self._post(admin_client, app, faculty_id='999')
+        assert b'Room Lab 101 is already booked' in response.data
+
+    def test_unknown_day_rejected(self, admin_client, app):
+        """Schedules with unknown day letters are rejected"""
+        response = self._post(admin_client, app, schedule='XYZ 10:00-11:00')
+        assert b'Unknown day' in response.data
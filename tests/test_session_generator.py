@@ -0,0 +1,130 @@
+"""
+Test Suite for the Term Session Generator
+Tests: date expansion, holidays, idempotency, admin-wide and faculty routes
+"""
+import pytest
+from app import (db, Class, AttendanceSession, parse_term_dates, term_meeting_dates,
+                 generate_term_sessions)
+from datetime import date, time
+
+TERM_START = date(2026, 1, 5)  # a Monday
+TERM_END = date(2026, 1, 18)
+
+
+def _schedule_first_class(schedule='MWF 09:00-10:00'):
+    class_obj = Class.query.first()
+    class_obj.schedule = schedule
+    db.session.commit()
+    return class_obj
+
+
+class TestTermDates:
+    """Test expanding weekdays over a term"""
+
+    def test_weekday_dates(self):
+        """Every Wednesday in the range is produced"""
+        assert list(term_meeting_dates(2, TERM_START, TERM_END)) == [date(2026, 1, 7), date(2026, 1, 14)]
+
+    def test_holidays_skipped(self):
+        """Holiday dates are left out"""
+        assert list(term_meeting_dates(0, TERM_START, TERM_END, {date(2026, 1, 12)})) == [date(2026, 1, 5)]
+
+    def test_parse_term_dates(self):
+        """Holidays may be separated by commas or whitespace"""
+        start, end, holidays = parse_term_dates('2026-01-05', '2026-01-18', '2026-01-07, 2026-01-09\n2026-01-12')
+        assert (start, end) == (TERM_START, TERM_END)
+        assert holidays == {date(2026, 1, 7), date(2026, 1, 9), date(2026, 1, 12)}
+
+    def test_parse_term_dates_rejects_bad_ranges(self):
+        """Reversed, overlong and malformed terms are rejected"""
+        for args in (('2026-02-01', '2026-01-01'), ('2026-01-01', '2027-06-01'), ('01/05/2026', '2026-01-18')):
+            with pytest.raises(ValueError):
+                parse_term_dates(*args)
+
+
+class TestGenerateTermSessions:
+    """Test bulk session creation from class schedules"""
+
+    def test_sessions_follow_schedule(self, app, init_database):
+        """One session per scheduled meeting, with the scheduled times"""
+        with app.app_context():
+            class_obj = _schedule_first_class()
+
+            created = generate_term_sessions(TERM_START, TERM_END, {date(2026, 1, 9)}, created_by=2)
+
+            assert created == {class_obj.id: 5}
+            sessions = AttendanceSession.query.filter(AttendanceSession.date.between(TERM_START, TERM_END)).all()
+            assert sorted(s.date.day for s in sessions) == [5, 7, 12, 14, 16]
+            assert {(s.start_time, s.end_time, s.created_by) for s in sessions} == {(time(9, 0), time(10, 0), 2)}
+
+    def test_rerun_is_idempotent(self, app, init_database):
+        """Running again over the same term creates nothing new"""
+        with app.app_context():
+            class_obj = _schedule_first_class()
+            generate_term_sessions(TERM_START, TERM_END)
+
+            assert generate_term_sessions(TERM_START, TERM_END) == {class_obj.id: 0}
+            assert AttendanceSession.query.filter(AttendanceSession.date.between(TERM_START, TERM_END)).count() == 6
+
+    def test_existing_session_kept(self, app, init_database):
+        """A hand-made session on a meeting day is not duplicated or changed"""
+        with app.app_context():
+            class_obj = _schedule_first_class()
+            db.session.add(AttendanceSession(class_id=class_obj.id, date=TERM_START,
+                                             start_time=time(13, 0), end_time=time(14, 0), created_by=2))
+            db.session.commit()
+
+            assert generate_term_sessions(TERM_START, TERM_END) == {class_obj.id: 5}
+            kept = AttendanceSession.query.filter_by(class_id=class_obj.id, date=TERM_START).one()
+            assert kept.start_time == time(13, 0)
+
+    def test_unscheduled_classes_skipped(self, app, init_database):
+        """Classes without a schedule produce no sessions"""
+        with app.app_context():
+            assert generate_term_sessions(TERM_START, TERM_END) == {}
+
+
+class TestGenerateRoutes:
+    """Test the faculty and admin generator routes"""
+
+    def test_faculty_generates_for_own_class(self, faculty_client, app):
+        """Faculty can generate the term for a class they teach"""
+        with app.app_context():
+            class_id = _schedule_first_class('TTH 11:00-12:00').id
+
+        response = faculty_client.post('/faculty/sessions/generate', data={
+            'class_id': str(class_id), 'term_start': '2026-01-05', 'term_end': '2026-01-18', 'holidays': ''
+        }, follow_redirects=True)
+
+        assert response.status_code == 200
+        assert b'Generated 4 sessions for the term' in response.data
+
+    def test_faculty_without_schedule_warned(self, faculty_client, app):
+        """A class without a schedule gets a warning"""
+        with app.app_context():
+            class_id = Class.query.first().id
+
+        response = faculty_client.post('/faculty/sessions/generate', data={
+            'class_id': str(class_id), 'term_start': '2026-01-05', 'term_end': '2026-01-18'
+        }, follow_redirects=True)
+
+        assert b'no schedule to generate sessions from' in response.data
+
+    def test_admin_generates_for_all_classes(self, admin_client, app):
+        """Admin-wide mode covers every scheduled class"""
+        with app.app_context():
+            _schedule_first_class()
+
+        response = admin_client.post('/admin/sessions/generate', data={
+            'term_start': '2026-01-05', 'term_end': '2026-01-18', 'holidays': '2026-01-05'
+        }, follow_redirects=True)
+
+        assert response.status_code == 200
+        assert b'Generated 5 sessions for 1 scheduled classes' in response.data
+
+    def test_admin_invalid_range(self, admin_client):
+        """Invalid term dates are reported on the form"""
+        response = admin_client.post('/admin/sessions/generate', data={
+            'term_start': '2026-02-01', 'term_end': '2026-01-01'
+        })
+        assert b'Term end date must be on or after the start date' in response.data
@@ -0,0 +1,198 @@
+"""
+Test Suite for Bulk Timetable Import
+Tests: sweep-line conflict detection, batch validation, CSV upload route
+"""
+import io
+import pytest
+from app import (db, Class, ClassMeeting, Faculty, import_timetable, parse_timetable_csv,
+                 sweep_schedule_conflicts)
+
+
+def _row(schedule, room='Lab 101', section='A', course_code='CS101', faculty_id='FAC001'):
+    return {'course_code': course_code, 'section': section, 'schedule': schedule,
+            'room': room, 'faculty_id': faculty_id}
+
+
+def _second_faculty():
+    """Add another faculty member so rows can differ by teacher"""
+    from app import User
+    user = User(username='faculty2', email='f2@test.com', password_hash='x',
+                role='faculty', full_name='Second Faculty')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Faculty(user_id=user.id, faculty_id='FAC002',
+                           department='Computer Science', designation='Lecturer'))
+    db.session.commit()
+
+
+def _student_in_section(section):
+    from app import User, Student
+    user = User(username=f'student_{section}', email=f'{section}@test.com', password_hash='x',
+                role='student', full_name=f'Section {section} Student')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Student(user_id=user.id, student_id=f'ST{section}01', department='Computer Science',
+                           year=1, section=section))
+    db.session.commit()
+
+
+class TestSweepConflicts:
+    """Test the sweep over sorted intervals"""
+
+    def test_finds_overlaps_within_group(self):
+        """Overlaps are reported only for the same key and weekday"""
+        intervals = [
+            (('room', 'Lab 101'), 0, 600, 660, 'a'),
+            (('room', 'Lab 101'), 0, 630, 690, 'b'),
+            (('room', 'Lab 101'), 0, 660, 720, 'c'),
+            (('room', 'Lab 102'), 0, 600, 660, 'd'),
+            (('room', 'Lab 101'), 2, 600, 660, 'e'),
+        ]
+        pairs = {(a[4], b[4]) for a, b in sweep_schedule_conflicts(intervals)}
+        assert pairs == {('a', 'b'), ('b', 'c')}
+
+    def test_long_interval_covers_later_ones(self):
+        """An interval reaching furthest is compared with every later start"""
+        intervals = [
+            (('section', 'A'), 0, 480, 720, 'long'),
+            (('section', 'A'), 0, 540, 600, 'x'),
+            (('section', 'A'), 0, 660, 690, 'y'),
+        ]
+        pairs = {(a[4], b[4]) for a, b in sweep_schedule_conflicts(intervals)}
+        assert pairs == {('long', 'x'), ('long', 'y')}
+
+
+    def test_triple_overlap_yields_every_pair(self):
+        """An interval overlapping several earlier ones is paired with each"""
+        intervals = [
+            (('room', 'Lab 101'), 0, 600, 720, 'a'),
+            (('room', 'Lab 101'), 0, 610, 700, 'b'),
+            (('room', 'Lab 101'), 0, 620, 640, 'c'),
+        ]
+        pairs = {(a[4], b[4]) for a, b in sweep_schedule_conflicts(intervals)}
+        assert pairs == {('a', 'b'), ('a', 'c'), ('b', 'c')}
+
+
+class TestImportTimetable:
+    """Test validating and importing a batch of classes"""
+
+    def test_valid_batch_created(self, app, init_database):
+        """Non-overlapping rows are all created with their meetings"""
+        with app.app_context():
+            _second_faculty()
+            result = import_timetable([
+                _row('MWF 09:00-10:00'),
+                _row('TTH 09:00-10:00', room='Lab 102', faculty_id='FAC002'),
+            ])
+
+            assert result == {'created': 2, 'valid': 2, 'problems': []}
+            assert Class.query.count() == 3
+            assert ClassMeeting.query.count() == 5
+
+    def test_every_conflict_reported(self, app, init_database):
+        """Section, room and faculty clashes in the batch are all reported"""
+        with app.app_context():
+            _second_faculty()
+            _student_in_section('B')
+            result = import_timetable([
+                _row('MWF 09:00-10:00'),
+                _row('MWF 09:30-10:30', room='Lab 102', faculty_id='FAC002'),
+                _row('TTH 11:00-12:00'),
+                _row('TTH 11:00-12:00', room='Lab 101', section='B', faculty_id='FAC002'),
+            ])
+
+            messages = [(p['line'], p['message']) for p in result['problems']]
+            assert (2, 'Section A clashes with line 3 (CS101 MWF 09:30-10:30).') in messages
+            assert (3, 'Section A clashes with line 2 (CS101 MWF 09:00-10:00).') in messages
+            assert (4, 'Room Lab 101 clashes with line 5 (CS101 TTH 11:00-12:00).') in messages
+            assert (5, 'Room Lab 101 clashes with line 4 (CS101 TTH 11:00-12:00).') in messages
+            assert not any('Faculty' in message for line, message in messages if line in (4, 5))
+            assert result['created'] == 0
+            assert Class.query.count() == 1
+
+    def test_triple_overlap_reports_every_partner(self, app, init_database):
+        """A line clashing with two earlier lines names both of them"""
+        with app.app_context():
+            _student_in_section('B')
+            result = import_timetable([
+                _row('TTH 13:00-16:00', section='B', room='Room 201'),
+                _row('TTH 13:30-15:00', section='B', room='Room 202'),
+                _row('TTH 14:00-14:30', section='B', room='Room 203'),
+            ])
+
+            messages = [(p['line'], p['message']) for p in result['problems']]
+            assert (4, 'Section B clashes with line 2 (CS101 TTH 13:00-16:00).') in messages
+            assert (4, 'Section B clashes with line 3 (CS101 TTH 13:30-15:00).') in messages
+            assert (2, 'Section B clashes with line 4 (CS101 TTH 14:00-14:30).') in messages
+            assert result['created'] == 0
+
+    def test_conflict_with_existing_class(self, app, init_database):
+        """Rows clashing with stored classes are skipped, others are created"""
+        with app.app_context():
+            existing = Class.query.first()
+            existing.schedule = 'MWF 10:00-11:00'
+            existing.room = 'Lab 101'
+            db.session.commit()
+
+            result = import_timetable([
+                _row('MWF 10:30-11:30', room='Room 201'),
+                _row('TTH 10:00-11:00', room='Room 201'),
+            ])
+
+            assert result['created'] == 1
+            assert [p['line'] for p in result['problems']] == [2, 2]
+            assert 'existing class CS101 section A' in result['problems'][0]['message']
+
+    def test_row_validation(self, app, init_database):
+        """Unknown references and malformed values are reported per line"""
+        with app.app_context():
+            result = import_timetable([
+                _row('MWF 09:00-10:00', course_code='NOPE'),
+                _row('MWF 09:00-10:00', faculty_id='FAC999'),
+                _row('MWF 07:00-08:00'),
+                _row('MWF 09:00-10:00', room='Hall 1'),
+                _row(''),
+            ])
+
+            assert [p['line'] for p in result['problems']] == [2, 3, 4, 5, 6]
+            assert result['created'] == 0
+
+    def test_dry_run_creates_nothing(self, app, init_database):
+        """A dry run validates without inserting"""
+        with app.app_context():
+            result = import_timetable([_row('MWF 09:00-10:00')], dry_run=True)
+            assert result == {'created': 0, 'valid': 1, 'problems': []}
+            assert Class.query.count() == 1
+
+    def test_csv_requires_columns(self):
+        """A CSV without the expected header is rejected"""
+        with pytest.raises(ValueError):
+            parse_timetable_csv(io.StringIO('course,section\nCS101,A\n'))
+
+
+class TestImportRoute:
+    """Test the timetable upload page"""
+
+    def test_upload_csv(self, admin_client, app):
+        """Uploading a CSV creates the valid classes and lists problems"""
+        csv_data = ('course_code,section,schedule,room,faculty_id\n'
+                    'CS101,A,MWF 09:00-10:00,Lab 101,FAC001\n'
+                    'CS101,A,MWF 09:30-10:30,Lab 102,FAC001\n')
+        response = admin_client.post('/admin/classes/import', data={
+            'file': (io.BytesIO(csv_data.encode()), 'timetable.csv')
+        }, content_type='multipart/form-data', follow_redirects=True)
+
+        assert response.status_code == 200
+        assert b'0 classes created' in response.data
+        assert b'Section A clashes with line 3' in response.data
+
+    def test_upload_without_file(self, admin_client):
+        """Submitting without a file shows an error"""
+        response = admin_client.post('/admin/classes/import', data={},
+                                     content_type='multipart/form-data')
+        assert b'Please choose a timetable CSV file' in response.data
+
+    def test_import_page_requires_admin(self, faculty_client):
+        """Faculty cannot open the import page"""
+        response = faculty_client.get('/admin/classes/import')
+        assert response.status_code in (302, 403)
@@ -0,0 +1,129 @@
+"""
+Test Suite for the Admin User Directory
+Tests: SQL-grouped section counts, keyset pagination of users and sections, lazy row endpoints
+"""
+import json
+import pytest
+from werkzeug.security import generate_password_hash
+from app import db, User, Student, user_directory_page, student_section_page, user_directory_counts
+
+PASSWORD_HASH = generate_password_hash('x', method='pbkdf2:sha256:1')
+
+
+def _add_students(count, section='A', year=1, department='Computer Science', prefix='SX'):
+    for i in range(count):
+        user = User(username=f'{prefix}{section}{i}', password_hash=PASSWORD_HASH, email=f'{prefix}{section}{i}@test.com',
+                    role='student', full_name=f'Student {prefix}{section}{i}')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Student(user_id=user.id, student_id=f'{prefix}{section}{i:03d}',
+                               department=department, year=year, section=section))
+    db.session.commit()
+
+
+@pytest.fixture
+def small_pages(app):
+    app.config['ADMIN_USERS_PAGE_SIZE'] = 3
+    yield
+    app.config['ADMIN_USERS_PAGE_SIZE'] = 50
+
+
+class TestDirectoryQueries:
+    """Test grouping and keyset pagination"""
+
+    def test_counts_by_role(self, app, init_database):
+        with app.app_context():
+            _add_students(2)
+            assert user_directory_counts() == {'admin': 1, 'faculty': 1, 'student': 3}
+
+    def test_student_pages_cover_section_once(self, app, init_database, small_pages):
+        with app.app_context():
+            _add_students(7)
+            seen, after = [], None
+            while True:
+                rows, after = user_directory_page('student', after, ('Computer Science', 1, 'A'))
+                assert len(rows) <= 3
+                seen.extend(student.student_id for student in rows)
+                if after is None:
+                    break
+            assert len(seen) == 8 and seen == sorted(seen)
+
+    def test_section_groups_paginate(self, app, init_database, small_pages):
+        with app.app_context():
+            for section in 'BCDE':
+                _add_students(2, section=section)
+            first, after = student_section_page()
+            second, last = student_section_page(after)
+            assert [g[2] for g in first] == ['A', 'B', 'C']
+            assert [(g[2], g[3]) for g in second] == [('D', 2), ('E', 2)]
+            assert last is None
+
+    def test_null_section_does_not_hide_later_groups(self, app, init_database):
+        """A cursor ending on a NULL section still continues into the same year"""
+        app.config['ADMIN_USERS_PAGE_SIZE'] = 1
+        try:
+            with app.app_context():
+                _add_students(1, section=None, prefix='NS')
+                first, after = student_section_page()
+                assert first[0][2] is None
+                second, _ = student_section_page(after)
+                assert second[0][2] == 'A'
+        finally:
+            app.config['ADMIN_USERS_PAGE_SIZE'] = 50
+
+
+class TestDirectoryRoutes:
+    """Test the page and its lazy endpoints"""
+
+    def test_page_renders_collapsed_sections(self, admin_client, app):
+        with app.app_context():
+            _add_students(4)
+        response = admin_client.get('/admin/users')
+        assert response.status_code == 200
+        assert b'Computer Science - Year 1 - Section A' in response.data
+        assert b'5 students' in response.data
+        # Student rows are not rendered until a section is expanded
+        assert b'SXA001' not in response.data
+
+    def test_section_rows_endpoint(self, admin_client, app, small_pages):
+        with app.app_context():
+            _add_students(4)
+        response = admin_client.get('/admin/users/rows', query_string={
+            'group': 'student', 'department': 'Computer Science', 'year': 1, 'section': 'A'})
+        data = response.get_json()
+        assert data['html'].count('<tr>') == 3
+        assert data['next_after'] == 'SXA001'
+
+        response = admin_client.get('/admin/users/rows', query_string={
+            'group': 'student', 'department': 'Computer Science', 'year': 1, 'section': 'A',
+            'after': data['next_after']})
+        data = response.get_json()
+        assert data['html'].count('<tr>') == 2
+        assert data['next_after'] is None
+
+    def test_faculty_and_admin_rows(self, admin_client):
+        data = admin_client.get('/admin/users/rows?group=faculty').get_json()
+        assert 'FAC001' in data['html']
+        data = admin_client.get('/admin/users/rows?group=admin').get_json()
+        assert 'admin@test.com' in data['html']
+
+    def test_sections_endpoint(self, admin_client, app, small_pages):
+        with app.app_context():
+            for section in 'BCD':
+                _add_students(1, section=section)
+        page = admin_client.get('/admin/users')
+        assert b'id="more-sections"' in page.data
+        response = admin_client.get('/admin/users/sections',
+                                    query_string={'after': json.dumps(['Computer Science', 1, 'C'])})
+        data = response.get_json()
+        assert 'Section D' in data['html'] and data['next_after'] is None
+
+    def test_bad_requests(self, admin_client):
+        assert admin_client.get('/admin/users/rows?group=root').status_code == 400
+        assert admin_client.get('/admin/users/rows?group=student&year=abc').status_code == 400
+        assert admin_client.get('/admin/users/sections?after=nope').status_code == 400
+        assert admin_client.get('/admin/users/sections?after=[1]').status_code == 400
+
+    def test_requires_admin(self, faculty_client):
+        response = faculty_client.get('/admin/users/rows?group=admin')
+        assert response.status_code in (302, 403)
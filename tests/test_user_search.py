@@ -0,0 +1,111 @@
+"""
+Test Suite for the Admin User Search
+Tests: prefix and token matching, index maintenance on add/edit/delete, bulk writes, rebuild, search endpoint
+"""
+from werkzeug.security import generate_password_hash
+from app import db, User, Student, search_users, rebuild_user_search, cascade_delete, user_search_table
+
+
+def _usernames(query, limit=20):
+    return [result['username'] for result in search_users(query, limit)]
+
+
+class TestSearchUsers:
+    """Test matching against the fixture users"""
+
+    def test_prefix_of_username(self, app, init_database):
+        with app.app_context():
+            assert _usernames('facul') == ['faculty1']
+
+    def test_tokens_match_across_fields(self, app, init_database):
+        """Every token must match, each as a word prefix in any field"""
+        with app.app_context():
+            results = search_users('test stud')
+            assert [r['username'] for r in results] == ['student1']
+            assert results[0]['student_id'] == 'ST001' and results[0]['role'] == 'student'
+            assert _usernames('stud nobody') == []
+
+    def test_student_id_and_email(self, app, init_database):
+        with app.app_context():
+            assert _usernames('st00') == ['student1']
+            assert _usernames('admin@test') == ['admin']
+
+    def test_case_and_punctuation_ignored(self, app, init_database):
+        with app.app_context():
+            assert _usernames('ADMIN') == ['admin']
+            assert _usernames('"adm*') == ['admin']
+            assert _usernames('  ') == []
+
+    def test_limit(self, app, init_database):
+        with app.app_context():
+            assert len(search_users('test', limit=2)) == 2
+
+
+class TestIndexMaintenance:
+    """Test that the index follows writes to users and students"""
+
+    def test_edit_reindexes(self, app, init_database):
+        with app.app_context():
+            user = User.query.filter_by(username='student1').one()
+            user.username, user.full_name, user.email = 'ghopper', 'Grace Hopper', 'grace@test.com'
+            db.session.commit()
+            assert _usernames('hopp') == ['ghopper']
+            assert _usernames('stud') == []
+
+    def test_student_id_change_reindexes(self, app, init_database):
+        with app.app_context():
+            Student.query.first().student_id = 'ZX900'
+            db.session.commit()
+            assert _usernames('zx9') == ['student1']
+            assert _usernames('st001') == []
+
+    def test_bulk_update_reindexes(self, app, init_database):
+        with app.app_context():
+            User.query.filter_by(role='faculty').update({'full_name': 'Ada Lovelace'})
+            db.session.commit()
+            assert _usernames('lovel') == ['faculty1']
+
+    def test_cascade_delete_removes_entry(self, app, init_database):
+        with app.app_context():
+            cascade_delete('user', User.query.filter_by(username='student1').one().id)
+            assert _usernames('st001') == []
+
+    def test_rebuild(self, app, init_database):
+        with app.app_context():
+            db.session.execute(user_search_table.delete())
+            db.session.commit()
+            assert _usernames('admin') == []
+            assert rebuild_user_search() == 3
+            assert _usernames('admin') == ['admin']
+
+
+class TestSearchRoute:
+    """Test the admin search endpoint"""
+
+    def test_add_user_is_searchable(self, admin_client):
+        admin_client.post('/admin/users/add', data={
+            'username': 'jdoe', 'email': 'jane.doe@test.com', 'password': 'secret', 'role': 'student',
+            'full_name': 'Jane Doe', 'student_id': 'ST777', 'department': 'Physics', 'year': 2, 'section': 'B'})
+        data = admin_client.get('/admin/users/search?q=jane+do').get_json()
+        assert [r['username'] for r in data['results']] == ['jdoe']
+        assert data['results'][0]['student_id'] == 'ST777'
+
+    def test_delete_user_removes_result(self, admin_client, app):
+        with app.app_context():
+            user_id = User.query.filter_by(username='student1').one().id
+        admin_client.post(f'/admin/users/{user_id}/delete')
+        assert admin_client.get('/admin/users/search?q=st001').get_json()['results'] == []
+
+    def test_limit_is_capped(self, admin_client, app):
+        with app.app_context():
+            for i in range(60):
+                db.session.add(User(username=f'bulk{i}', email=f'bulk{i}@test.com', role='faculty',
+                                    full_name=f'Bulk {i}',
+                                    password_hash=generate_password_hash('x', method='pbkdf2:sha256:1')))
+            db.session.commit()
+        data = admin_client.get('/admin/users/search?q=bulk&limit=500').get_json()
+        assert len(data['results']) == 50
+
+    def test_requires_admin(self, faculty_client):
+        response = faculty_client.get('/admin/users/search?q=admin')
+        assert response.status_code in (302, 403)